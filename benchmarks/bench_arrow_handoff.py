@@ -0,0 +1,223 @@
+"""
+Compare the NumPy and Arrow handoffs of DuckDB results to pandas on primary_core.
+
+The primary tables are replicated ``--scale`` times (with shifted keys, so the
+joins keep the same fan-out) and core_applicants_jobs_prospects.sql runs over
+them through ``process_sql_to_parquet`` in each configuration below. The
+output is saved with the catalog's save_args for primary_core, then loaded
+back the way the next node gets it, registered in DuckDB and queried.
+
+- ``pipeline``: ``processing.chunk_size`` and ``processing.dtype_backend`` of
+  the configuration and the catalog's load_args: what ``kedro run`` does.
+  With a chunk_size, the result is streamed to Parquet as Arrow batches and
+  the handoff to pandas happens when the next node loads the file.
+- ``numpy load``: the same, with the file loaded as NumPy-backed columns.
+- ``fetched pyarrow`` / ``fetched numpy``: ``chunk_size: null``, the result is
+  fetched as one DataFrame with each ``dtype_backend`` and saved from pandas.
+
+Every configuration runs in a fresh process so that its peak RSS is not
+hidden by the previous one. Run it from the project root after
+``kedro run --pipeline primary_processing``.
+
+Usage:
+    python benchmarks/bench_arrow_handoff.py
+    python benchmarks/bench_arrow_handoff.py --scale 1000
+"""
+
+import argparse
+import logging
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import duckdb
+from kedro.config import OmegaConfigLoader
+
+from fiap_mlops_datathon.datasets import DuckDBParquetDataset
+from fiap_mlops_datathon.pipelines.data_processing import sql_templates
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_sql_to_parquet
+
+logger = logging.getLogger(__name__)
+
+CONF_SOURCE = Path("conf")
+
+CORE_SQL = Path(
+    "src/fiap_mlops_datathon/pipelines/data_processing/materialize_primary/core_applicants_jobs_prospects.sql"
+)
+
+# Key columns of each primary table, shifted by KEY_OFFSET in every copy
+PRIMARY_KEYS = {
+    "vagas": ("vaga_id",),
+    "prospects": ("prospect_id", "codigo"),
+    "applicants": ("prospect_codigo",),
+}
+KEY_OFFSET = 100_000
+
+CONSUMER_SQL = (
+    "SELECT cliente, count(*), sum(target_contratado), avg(length(cv_pt)) "
+    "FROM core GROUP BY cliente"
+)
+
+
+def replicate_primary_tables(directory: Path, scale: int) -> Dict[str, str]:
+    """
+    Write ``scale`` copies of each primary table, with distinct keys per copy,
+    to ``directory`` and return their table expressions by dataset name.
+    """
+    tables = sql_templates.project_tables()
+    replicas = {}
+    con = duckdb.connect(database=":memory:")
+    try:
+        for table, keys in PRIMARY_KEYS.items():
+            dataset_name = f"primary_{table}"
+            shifted = ", ".join(
+                f"({key} + copy * {KEY_OFFSET})::INTEGER AS {key}" for key in keys
+            )
+            con.execute(
+                f"COPY (SELECT * EXCLUDE (copy) REPLACE ({shifted}) "
+                f"FROM {tables[dataset_name]}, range({scale}) copies(copy)) "
+                f"TO '{directory / table}.parquet' (FORMAT parquet)"
+            )
+            replicas[dataset_name] = sql_templates.parquet_table_sql(f"{directory / table}.parquet")
+    finally:
+        con.close()
+    return replicas
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def pipeline_settings(env: str = "local") -> Dict[str, Any]:
+    """Return the processing parameters and the primary_core save and load args of ``env``."""
+    config = OmegaConfigLoader(str(CONF_SOURCE), base_env="base", default_run_env=env)
+    processing = config["parameters"]["processing"]
+    core = config["catalog"]["primary_core"]
+    return {
+        "chunk_size": processing.get("chunk_size"),
+        "dtype_backend": processing.get("dtype_backend", "numpy"),
+        "save_args": dict(core.get("save_args", {})),
+        "load_args": dict(core.get("load_args", {})),
+    }
+
+
+def configurations(settings: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return the configurations to compare, the pipeline's first."""
+    numpy_load_args = {k: v for k, v in settings["load_args"].items() if k != "dtype_backend"}
+    return {
+        "pipeline": {
+            "chunk_size": settings["chunk_size"],
+            "dtype_backend": settings["dtype_backend"],
+            "load_args": settings["load_args"],
+        },
+        "numpy load": {
+            "chunk_size": settings["chunk_size"],
+            "dtype_backend": "numpy",
+            "load_args": numpy_load_args,
+        },
+        "fetched pyarrow": {
+            "chunk_size": None,
+            "dtype_backend": "pyarrow",
+            "load_args": settings["load_args"],
+        },
+        "fetched numpy": {
+            "chunk_size": None,
+            "dtype_backend": "numpy",
+            "load_args": numpy_load_args,
+        },
+    }
+
+
+def run_configuration(
+    sql_query: str,
+    chunk_size: Optional[int],
+    dtype_backend: str,
+    save_args: Dict[str, Any],
+    load_args: Dict[str, Any],
+    output: Path,
+) -> Dict[str, float]:
+    """Build primary_core, save it, then load, register and query it like the next node."""
+    baseline_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    core = process_sql_to_parquet(
+        sql_query, chunk_size=chunk_size, query_name="primary_core", dtype_backend=dtype_backend
+    )
+    produced = time.perf_counter()
+
+    dataset = DuckDBParquetDataset(filepath=str(output), save_args=save_args, load_args=load_args)
+    dataset.save(core)
+    del core
+    saved = time.perf_counter()
+
+    loaded = dataset.load()
+    reloaded = time.perf_counter()
+
+    con = duckdb.connect(database=":memory:")
+    con.register("core", loaded)
+    con.execute(CONSUMER_SQL).fetchall()
+    con.close()
+    consumed = time.perf_counter()
+
+    return {
+        "rows": len(loaded),
+        "produce_s": produced - start,
+        "save_s": saved - produced,
+        "load_s": reloaded - saved,
+        "consume_s": consumed - reloaded,
+        "total_s": consumed - start,
+        "peak_rss_mb": peak_rss_mb() - baseline_mb,
+        "frame_mb": loaded.memory_usage(index=False, deep=True).sum() / 1024**2,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=200, help="copies of each primary table")
+    parser.add_argument("--env", default="local", help="configuration environment of the pipeline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    settings = pipeline_settings(args.env)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        replicas = replicate_primary_tables(directory, args.scale)
+        sql_query = sql_templates.render_sql(CORE_SQL.read_text(encoding="utf-8"), tables=replicas)
+
+        # A new process per configuration: ru_maxrss only ever grows
+        context = multiprocessing.get_context("spawn")
+        results = {}
+        for i, (name, config) in enumerate(configurations(settings).items()):
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(
+                    run_configuration,
+                    (
+                        sql_query, config["chunk_size"], config["dtype_backend"],
+                        settings["save_args"], config["load_args"], directory / f"core_{i}.parquet",
+                    ),
+                )
+
+    logger.info(
+        f"primary_core: {results['pipeline']['rows']} rows (scale {args.scale}), pipeline "
+        f"chunk_size {settings['chunk_size']}, dtype_backend {settings['dtype_backend']}, "
+        f"load_args {settings['load_args']}"
+    )
+    logger.info(
+        f"{'configuration':<16} {'produce':>8} {'save':>8} {'load':>8} {'consume':>8} "
+        f"{'total':>8} {'peak RSS':>10} {'frame':>10}"
+    )
+    for name, result in results.items():
+        logger.info(
+            f"{name:<16} {result['produce_s']:7.2f}s {result['save_s']:7.2f}s "
+            f"{result['load_s']:7.2f}s {result['consume_s']:7.2f}s {result['total_s']:7.2f}s "
+            f"{result['peak_rss_mb']:7.0f} MB {result['frame_mb']:7.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Report the memory saved by dictionary encoding on primary_core.
+
+Runs core_applicants_jobs_prospects.sql over the primary tables twice: fetched
+as plain object columns and through ``process_sql_to_parquet`` with the
+tables loaded as the pipeline does, which keeps their categorical text
+dictionary encoded. Run it from the project root after
+``kedro run --pipeline primary_processing``.
+
+Usage:
+    python benchmarks/bench_categoricals.py
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import duckdb
+
+from fiap_mlops_datathon.pipelines.data_processing import sql_templates
+from fiap_mlops_datathon.pipelines.data_processing.categoricals import categorical_memory_report
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_sql_to_parquet
+
+logger = logging.getLogger(__name__)
+
+CORE_SQL = Path(
+    "src/fiap_mlops_datathon/pipelines/data_processing/materialize_primary/core_applicants_jobs_prospects.sql"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sql", type=Path, default=CORE_SQL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sql_templates.configure(sql_templates.project_tables())
+    sql_query = args.sql.read_text(encoding="utf-8")
+
+    plain = duckdb.connect(database=":memory:").execute(sql_templates.render_sql(sql_query)).df()
+    catalog = sql_templates.project_catalog()
+    inputs = {
+        name: catalog.load(name) for name in sql_templates.referenced_datasets(sql_query)
+    }
+    encoded = process_sql_to_parquet(sql_query, inputs=inputs)
+
+    for column, (object_mb, category_mb) in categorical_memory_report(encoded).items():
+        logger.info(f"{column:<32} {object_mb:8.2f} MB -> {category_mb:8.2f} MB")
+    plain_mb = plain.memory_usage(index=False, deep=True).sum() / 1024**2
+    encoded_mb = encoded.memory_usage(index=False, deep=True).sum() / 1024**2
+    logger.info(
+        f"primary_core: {len(encoded)} rows, {plain_mb:.2f} MB as object -> "
+        f"{encoded_mb:.2f} MB dictionary encoded ({1 - encoded_mb / plain_mb:.0%} saved)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark the per-record dict path against the columnar builders in json_processing.
+
+Usage:
+    python benchmarks/bench_json_processing.py --sizes 100000 1000000
+    python benchmarks/bench_json_processing.py --table prospects --sizes 10000 100000
+"""
+
+import argparse
+import logging
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import pandas as pd
+
+from fiap_mlops_datathon.pipelines.json_processing.nodes import (
+    DEFAULT_BATCH_SIZE,
+    _build_columnar_frame,
+    _build_prospects_frame,
+    clean_empty_values,
+)
+from fiap_mlops_datathon.pipelines.json_processing.record_specs import (
+    APPLICANT_FIELDS,
+    PROSPECT_FIELDS,
+    PROSPECT_LIST_KEY,
+    PROSPECT_PARENT_FIELDS,
+    get_path,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Per-record reference implementation: one dict per record, batched into DataFrames.
+# The pipeline replaced it with the columnar builders; it is kept here as the baseline.
+def process_applicant_record(app_id: str, app_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one applicant record into a dict of cleaned values."""
+    record = {'id': app_id}
+    for column, path in APPLICANT_FIELDS.items():
+        record[column] = clean_empty_values(get_path(app_data, path))
+    return record
+
+
+def process_prospect_record(prospect_id: str, prospect_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten one vaga of prospects.json into one dict per candidate prospect."""
+    parent = {'prospect_id': prospect_id}
+    for column, path in PROSPECT_PARENT_FIELDS.items():
+        parent[column] = clean_empty_values(get_path(prospect_data, path))
+
+    records = []
+    for prospect in prospect_data.get(PROSPECT_LIST_KEY, []):
+        record = dict(parent)
+        for column, path in PROSPECT_FIELDS.items():
+            record[column] = clean_empty_values(get_path(prospect, path))
+        records.append(record)
+    return records
+
+
+def _iter_processed_records(
+    items: Iterable[Tuple[str, Any]], process_record: Callable[[str, Any], Any], record_type: str
+) -> Iterator[Dict[str, Any]]:
+    """Apply a record processor lazily, skipping the records that fail."""
+    for record_id, record_data in items:
+        try:
+            processed = process_record(record_id, record_data)
+        except Exception as e:
+            logger.error(f"Error processing {record_type} {record_id}: {str(e)}")
+            continue
+        if isinstance(processed, list):
+            yield from processed
+        else:
+            yield processed
+
+
+def _records_to_frame(
+    records: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    """Build a DataFrame from a stream of record dicts, one batch at a time."""
+    frames = []
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            frames.append(pd.DataFrame(batch))
+            batch = []
+    if batch or not frames:
+        frames.append(pd.DataFrame(batch))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_applicants(n_records: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate synthetic applicant records shaped like applicants.json."""
+    rng = random.Random(seed)
+    levels = ["Básico", "Intermediário", "Avançado", "Fluente", "Nenhum", ""]
+    records = {}
+    for i in range(n_records):
+        records[str(i)] = {
+            "infos_basicas": {
+                "nome": f"Candidato {i}",
+                "email": f"candidato{i}@example.com",
+                "telefone": f"(11) 9{i:08d}",
+                "telefone_recado": "",
+                "data_criacao": f"{1 + i % 28:02d}-{1 + i % 12:02d}-2021 10:00:00",
+                "data_atualizacao": f"{1 + i % 28:02d}-{1 + i % 12:02d}-2022 10:00:00",
+                "inserido_por": rng.choice(["Luna Correia", "Ana Lívia", " "]),
+                "codigo_profissional": str(i),
+                "objetivo_profissional": rng.choice(["", "Analista", "Desenvolvedor"]),
+            },
+            "informacoes_pessoais": {
+                "cpf": "",
+                "data_nascimento": rng.choice(["0000-00-00", "12-03-1990", ""]),
+                "sexo": rng.choice(["Masculino", "Feminino", ""]),
+                "estado_civil": "",
+                "pcd": rng.choice(["Sim", "Não"]),
+                "endereco": "",
+                "url_linkedin": "",
+                "facebook": "",
+                "skype": "",
+            },
+            "informacoes_profissionais": {
+                "titulo_profissional": "Analista",
+                "area_atuacao": "TI - Desenvolvimento",
+                "conhecimentos_tecnicos": "python, sql",
+                "certificacoes": "",
+                "remuneracao": "",
+                "nivel_profissional": rng.choice(["Júnior", "Pleno", "Sênior", ""]),
+            },
+            "formacao_e_idiomas": {
+                "nivel_academico": "Ensino Superior Completo",
+                "nivel_ingles": rng.choice(levels),
+                "nivel_espanhol": rng.choice(levels),
+                "outro_idioma": "-",
+            },
+            "cv_pt": f"experiência profissional {i} " * rng.randint(1, 20),
+            "cv_en": "",
+        }
+    return records
+
+
+def make_prospects(n_records: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate synthetic vagas with 0-60 candidate prospects each, shaped like prospects.json."""
+    rng = random.Random(seed)
+    status = ["Prospect", "Encaminhado ao Requisitante", "Contratado pela Decision", "Desistiu"]
+    records = {}
+    for i in range(n_records):
+        records[str(i)] = {
+            "titulo": f"Vaga {i}",
+            "modalidade": rng.choice(["", "CLT", "PJ/Autônomo"]),
+            "prospects": [
+                {
+                    "nome": f"Candidato {j}",
+                    "codigo": str(j),
+                    "situacao_candidado": rng.choice(status),
+                    "data_candidatura": f"{1 + j % 28:02d}-{1 + j % 12:02d}-2021",
+                    "ultima_atualizacao": f"{1 + j % 28:02d}-{1 + j % 12:02d}-2022",
+                    "comentario": rng.choice(["", "Encaminhado para o cliente"]),
+                    "recrutador": rng.choice(["Luna Correia", "Ana Lívia"]),
+                }
+                for j in range(rng.randint(0, 60))
+            ],
+        }
+    return records
+
+
+def _per_record(records: Dict[str, Any]) -> pd.DataFrame:
+    return _records_to_frame(
+        _iter_processed_records(records.items(), process_applicant_record, "applicant")
+    )
+
+
+def _columnar(records: Dict[str, Any]) -> pd.DataFrame:
+    frame, _ = _build_columnar_frame(records.items(), APPLICANT_FIELDS, "applicants")
+    return frame
+
+
+def _per_prospect(records: Dict[str, Any]) -> pd.DataFrame:
+    return _records_to_frame(
+        _iter_processed_records(records.items(), process_prospect_record, "prospect")
+    )
+
+
+def _nested(records: Dict[str, Any]) -> pd.DataFrame:
+    frame, _ = _build_prospects_frame(records.items())
+    return frame
+
+
+BENCHMARKS = {
+    "applicants": (make_applicants, [("per-record dicts", _per_record), ("columnar builder", _columnar)]),
+    "prospects": (make_prospects, [("per-child dicts", _per_prospect), ("nested builder", _nested)]),
+}
+
+
+def measure(func: Callable[[Dict[str, Any]], pd.DataFrame], records: Dict[str, Any]) -> Dict[str, float]:
+    """Return wall time of an untraced run and peak memory of a traced run."""
+    start = time.perf_counter()
+    func(records)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(records)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 1024**2}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--table", choices=sorted(BENCHMARKS), default="applicants")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    make_records, candidates = BENCHMARKS[args.table]
+    for size in args.sizes:
+        records = make_records(size)
+        (_, reference), (_, candidate) = candidates
+        pd.testing.assert_frame_equal(reference(records), candidate(records))
+        for name, func in candidates:
+            result = measure(func, records)
+            logger.info(
+                f"{size:>9} records | {name:<17} | {result['seconds']:7.2f}s"
+                f" | peak {result['peak_mb']:8.1f} MB"
+            )
+        del records
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Compare Parquet compression codecs and encodings on the catalog datasets.
+
+Every Parquet dataset configured through ``parquet_save_args`` (see
+conf/base/globals.yml) whose file has been written is re-written with each
+candidate setting: snappy, lz4, zstd at several levels and zstd with
+per-column encodings (dictionary only for low-cardinality text,
+BYTE_STREAM_SPLIT for floating point columns). File size, write time,
+full-read time and projected-read time (the first ``--projected-columns``
+columns) are reported per candidate.
+
+For each dataset the smallest candidate whose full read is at most
+``--max-read-slowdown`` times the snappy one is recommended.
+``--write-profile ENV`` saves the recommendations as ``parquet_save_args`` in
+conf/ENV/globals.yml; run the pipelines with ``kedro run --env ENV`` to use it.
+
+Usage:
+    python benchmarks/bench_parquet_encodings.py
+    python benchmarks/bench_parquet_encodings.py --datasets primary_prospects --write-profile parquet_tuned
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+from kedro.config import OmegaConfigLoader
+
+logger = logging.getLogger(__name__)
+
+CONF_SOURCE = Path("conf")
+
+# Same rule as the dictionary encoding of the json_processing and primary layers
+DICTIONARY_MAX_UNIQUE_RATIO = 0.5
+
+ZSTD_LEVELS = (1, 3, 9)
+
+# save_args set by the candidates, replaced in the profile by the recommended ones
+TUNED_SAVE_ARGS = ("compression", "compression_level", "use_dictionary", "column_encoding")
+
+
+def _dictionary_columns(table: pa.Table) -> List[str]:
+    """Text columns worth dictionary encoding: already dictionary or low cardinality."""
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_dictionary(column.type):
+            columns.append(name)
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            non_null = len(column) - column.null_count
+            if non_null and len(column.unique()) / non_null < DICTIONARY_MAX_UNIQUE_RATIO:
+                columns.append(name)
+    return columns
+
+
+def _byte_stream_split_columns(table: pa.Table) -> List[str]:
+    # pyarrow also splits integers and timestamps, but DuckDB only reads
+    # BYTE_STREAM_SPLIT pages of FLOAT and DOUBLE columns
+    return [field.name for field in table.schema if pa.types.is_floating(field.type)]
+
+
+def candidates(table: pa.Table) -> Dict[str, Dict[str, Any]]:
+    """Build the save_args of every candidate setting for ``table``."""
+    settings: Dict[str, Dict[str, Any]] = {
+        "snappy": {"compression": "snappy"},
+        "lz4": {"compression": "lz4"},
+    }
+    for level in ZSTD_LEVELS:
+        settings[f"zstd-{level}"] = {"compression": "zstd", "compression_level": level}
+
+    encodings: Dict[str, Any] = {"use_dictionary": _dictionary_columns(table)}
+    split_columns = _byte_stream_split_columns(table)
+    if split_columns:
+        encodings["column_encoding"] = {name: "BYTE_STREAM_SPLIT" for name in split_columns}
+    for level in ZSTD_LEVELS[:2]:
+        settings[f"zstd-{level}+encodings"] = {
+            "compression": "zstd", "compression_level": level, **encodings
+        }
+    return settings
+
+
+def measure(
+    table: pa.Table, save_args: Dict[str, Any], path: Path, projected: List[str], repeat: int
+) -> Dict[str, float]:
+    """Return the size and the best write, full-read and projected-read times."""
+    write, read, projected_read = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pq.write_table(table, path, **save_args)
+        write.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        pq.read_table(path)
+        read.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        pq.read_table(path, columns=projected)
+        projected_read.append(time.perf_counter() - start)
+    return {
+        "size_mb": path.stat().st_size / 1024**2,
+        "write_s": min(write),
+        "read_s": min(read),
+        "projected_read_s": min(projected_read),
+    }
+
+
+def recommend(results: Dict[str, Dict[str, float]], max_read_slowdown: float) -> str:
+    """Pick the smallest candidate whose full read stays close to snappy's."""
+    read_budget = results["snappy"]["read_s"] * max_read_slowdown
+    eligible = [name for name, result in results.items() if result["read_s"] <= read_budget]
+    return min(eligible or results, key=lambda name: results[name]["size_mb"])
+
+
+def load_parquet_datasets(env: str) -> Tuple[Dict[str, Path], Dict[str, Dict[str, Any]]]:
+    """Return the filepath of each dataset with Parquet save_args and the current settings."""
+    config = OmegaConfigLoader(str(CONF_SOURCE), base_env="base", default_run_env=env)
+    save_args = dict(config["globals"]["parquet_save_args"])
+    catalog = config["catalog"]
+    filepaths = {name: Path(catalog[name]["filepath"]) for name in save_args if name in catalog}
+    return filepaths, save_args
+
+
+def write_profile(env: str, save_args: Dict[str, Dict[str, Any]]) -> Path:
+    """Save ``parquet_save_args`` to conf/<env>/globals.yml."""
+    path = CONF_SOURCE / env / "globals.yml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = (
+        "# Parquet write settings picked by benchmarks/bench_parquet_encodings.py,\n"
+        f"# used with `kedro run --env {env}`\n"
+    )
+    path.write_text(header + yaml.safe_dump({"parquet_save_args": save_args}, sort_keys=False))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--datasets", nargs="+", help="Catalog datasets to benchmark (default: all)")
+    parser.add_argument("--env", default="local", help="Kedro environment to read the catalog from")
+    parser.add_argument("--projected-columns", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-read-slowdown", type=float, default=1.25)
+    parser.add_argument("--write-profile", metavar="ENV", help="Save the recommendations to conf/ENV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    filepaths, profile = load_parquet_datasets(args.env)
+    names = args.datasets or list(filepaths)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in names:
+            if not filepaths[name].exists():
+                logger.warning(f"Skipping {name}: {filepaths[name]} does not exist, run the pipelines first")
+                continue
+            table = pq.read_table(filepaths[name])
+            projected = table.column_names[:args.projected_columns]
+            logger.info(f"{name}: {table.num_rows} rows, projected read of {projected}")
+
+            results = {}
+            for candidate, save_args in candidates(table).items():
+                results[candidate] = measure(
+                    table, save_args, Path(tmp_dir) / f"{name}.parquet", projected, args.repeat
+                )
+                result = results[candidate]
+                logger.info(
+                    f"  {candidate:<17} | {result['size_mb']:8.2f} MB"
+                    f" | write {result['write_s']:6.3f}s | read {result['read_s']:6.3f}s"
+                    f" | projected {result['projected_read_s']:6.3f}s"
+                )
+
+            best = recommend(results, args.max_read_slowdown)
+            saving = 1 - results[best]["size_mb"] / results["snappy"]["size_mb"]
+            logger.info(f"  recommended: {best} ({saving:.0%} smaller than snappy)")
+            # Options the benchmark does not compare (bloom filters...) are kept
+            kept = {key: value for key, value in profile[name].items() if key not in TUNED_SAVE_ARGS}
+            profile[name] = {**kept, **candidates(table)[best], "engine": "pyarrow"}
+
+    if args.write_profile:
+        path = write_profile(args.write_profile, profile)
+        logger.info(f"Wrote Parquet profile to {path}, run with `kedro run --env {args.write_profile}`")
+
+
+if __name__ == "__main__":
+    main()
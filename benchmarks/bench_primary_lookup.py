@@ -0,0 +1,165 @@
+"""
+Measure point lookup latency on primary_prospects-shaped Parquet files.
+
+A synthetic prospects table is written twice: in the current layout (rows in
+arrival order, no bloom filters) and in the lookup layout (sorted by
+prospect_id and codigo, page indexes and bloom filters on both keys, as set in
+conf/base/globals.yml). Lookups by vaga (prospect_id) and by candidate
+(codigo) are timed three ways: a full scan (``pd.read_parquet`` then filter,
+what the tooling does today), ``lookup_rows`` on the current layout and
+``lookup_rows`` on the lookup layout.
+
+primary_core is sorted by vaga_id then codigo, so its codigo lookups can only
+skip row groups through the bloom filter. A core-shaped copy of the table is
+written with and without the codigo bloom filter; codigo lookups are timed on
+both and ``lookup_bytes_read`` (EXPLAIN ANALYZE) reports the bytes they read.
+
+Usage:
+    python benchmarks/bench_primary_lookup.py
+    python benchmarks/bench_primary_lookup.py --rows 5000000 --lookups 50
+"""
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fiap_mlops_datathon.pipelines.data_processing.lookup import lookup_bytes_read, lookup_rows
+
+logger = logging.getLogger(__name__)
+
+# Same as processing.chunk_size, the row group size of the primary tables
+ROW_GROUP_SIZE = 10000
+
+LOOKUP_KEYS = ("prospect_id", "codigo")
+
+
+def make_prospects(n_rows: int, seed: int = 0) -> pa.Table:
+    """Generate prospects in arrival order: vagas and candidates interleaved."""
+    rng = np.random.default_rng(seed)
+    n_vagas = max(n_rows // 30, 1)
+    n_candidates = max(n_rows // 3, 1)
+    return pa.table({
+        "prospect_id": (rng.integers(0, n_vagas, n_rows) + 1000).astype(str),
+        "nome_candidato": pa.array([f"Candidato {i}" for i in range(n_rows)]),
+        "codigo": (rng.integers(0, n_candidates, n_rows) + 30000).astype(str),
+        "situacao_candidado": pa.array(
+            rng.choice(["Prospect", "Encaminhado ao Requisitante", "Desistiu"], n_rows)
+        ).dictionary_encode(),
+        "data_candidatura": pa.array(
+            np.datetime64("2021-01-01") + rng.integers(0, 1000, n_rows).astype("timedelta64[D]")
+        ),
+        "recrutador": pa.array(rng.choice(["Luna Correia", "Ana Lívia"], n_rows)).dictionary_encode(),
+    })
+
+
+def write_layouts(table: pa.Table, directory: Path) -> Dict[str, Path]:
+    """Write the current and the lookup layout of ``table``."""
+    current = directory / "current.parquet"
+    pq.write_table(table, current, row_group_size=ROW_GROUP_SIZE, compression="snappy")
+
+    lookup = directory / "lookup.parquet"
+    pq.write_table(
+        table.sort_by([(key, "ascending") for key in LOOKUP_KEYS]),
+        lookup,
+        row_group_size=ROW_GROUP_SIZE,
+        compression="snappy",
+        write_page_index=True,
+        bloom_filter_options={key: {"ndv": ROW_GROUP_SIZE, "fpp": 0.01} for key in LOOKUP_KEYS},
+    )
+    return {"current": current, "lookup": lookup}
+
+
+def write_core_layouts(table: pa.Table, directory: Path) -> Dict[str, Path]:
+    """Write ``table`` as primary_core, sorted by vaga_id then codigo, with and without bloom filters."""
+    core = table.rename_columns(
+        ["vaga_id" if name == "prospect_id" else name for name in table.column_names]
+    ).sort_by([("vaga_id", "ascending"), ("codigo", "ascending")])
+    files = {}
+    for name, bloom_filters in (("core, no bloom filters", None), ("core, bloom filters", {
+        key: {"ndv": ROW_GROUP_SIZE, "fpp": 0.01} for key in ("vaga_id", "codigo")
+    })):
+        files[name] = directory / f"{name.replace(', ', '_').replace(' ', '_')}.parquet"
+        pq.write_table(
+            core,
+            files[name],
+            row_group_size=ROW_GROUP_SIZE,
+            compression="snappy",
+            write_page_index=True,
+            bloom_filter_options=bloom_filters,
+        )
+    return files
+
+
+def time_lookups(lookup: Callable[[str], pd.DataFrame], values: List[str]) -> float:
+    """Return the median latency of ``lookup`` over ``values``, in milliseconds."""
+    latencies = []
+    for value in values:
+        start = time.perf_counter()
+        lookup(value)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    table = make_prospects(args.rows)
+    rng = np.random.default_rng(1)
+    con = duckdb.connect(database=":memory:")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = write_layouts(table, Path(tmp_dir))
+        for name, path in files.items():
+            logger.info(f"{name} layout: {path.stat().st_size / 1024**2:.1f} MB")
+
+        for key in LOOKUP_KEYS:
+            values = list(rng.choice(table[key].to_numpy(zero_copy_only=False), args.lookups))
+            methods = {
+                "full scan": lambda value, key=key: (
+                    lambda df: df[df[key] == value]
+                )(pd.read_parquet(files["current"])),
+                "lookup_rows, current layout": lambda value, key=key: lookup_rows(
+                    str(files["current"]), {key: value}, connection=con
+                ),
+                "lookup_rows, lookup layout": lambda value, key=key: lookup_rows(
+                    str(files["lookup"]), {key: value}, connection=con
+                ),
+            }
+            reference = len(methods["full scan"](values[0]))
+            assert all(len(method(values[0])) == reference for method in methods.values())
+            for method_name, method in methods.items():
+                latency = time_lookups(method, values)
+                logger.info(f"{key:<12} | {method_name:<28} | median {latency:8.1f} ms")
+
+        core_files = write_core_layouts(table, Path(tmp_dir))
+        values = list(rng.choice(table["codigo"].to_numpy(zero_copy_only=False), args.lookups))
+        for name, path in core_files.items():
+            latency = time_lookups(
+                lambda value, path=path: lookup_rows(str(path), {"codigo": value}, connection=con),
+                values,
+            )
+            read_kb = statistics.median(
+                lookup_bytes_read(str(path), {"codigo": value}) for value in values
+            ) / 1024
+            logger.info(
+                f"{'codigo':<12} | {name:<28} | median {latency:8.1f} ms, "
+                f"{read_kb:.0f} of {path.stat().st_size / 1024:.0f} KB read"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ from typing import Any
 from kedro.framework.cli.utils import find_run_command
 from kedro.framework.project import configure_project
 
+from fiap_mlops_datathon.cli import cli
+
 
 def main(*args, **kwargs) -> Any:
     package_name = Path(__file__).parent.name
@@ -16,6 +18,11 @@ def main(*args, **kwargs) -> Any:
     interactive = hasattr(sys, 'ps1')
     kwargs["standalone_mode"] = not interactive
 
+    # Project commands (e.g. `fiap-mlops-datathon materialize`), otherwise `kedro run`
+    command_args = kwargs.get("args", args[0] if args else sys.argv[1:])
+    if command_args and command_args[0] in cli.commands:
+        return cli(*args, **kwargs)
+
     run = find_run_command(package_name)
     return run(*args, **kwargs)
 
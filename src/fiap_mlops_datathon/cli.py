@@ -0,0 +1,77 @@
+"""
+Project commands, available as ``fiap-mlops-datathon <command>`` and
+``kedro <command>``.
+
+``fiap-mlops-datathon`` without a project command runs the pipelines like
+``kedro run``; ``run`` is Kedro's, imported here for ``find_run_command``.
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+import click
+from kedro.framework.cli.project import run  # noqa: F401
+from kedro.framework.cli.utils import CONTEXT_SETTINGS
+from kedro.framework.project import pipelines
+from kedro.framework.session import KedroSession
+from kedro.framework.startup import bootstrap_project
+from kedro.runner import ThreadRunner
+
+from fiap_mlops_datathon import materialization, query_profiles
+
+
+@click.group(context_settings=CONTEXT_SETTINGS, name=__file__)
+def cli() -> None:
+    """Project commands of the FIAP MLOps Datathon."""
+
+
+cli.add_command(query_profiles.main)
+
+
+@cli.command()
+@click.argument("tables", nargs=-1)
+@click.option("--pipeline", "pipeline_name", default="full", show_default=True,
+              help="Registered pipeline with the SQL nodes")
+@click.option("--env", "-e", default=None, help="Kedro configuration environment")
+@click.option("--jobs", "-j", type=int, default=None,
+              help="Tables built at once; ThreadRunner's default by default")
+@click.option("--force", is_flag=True, help="Rebuild the tables even if they are fresh")
+@click.option("--dry-run", is_flag=True, help="Only list the tables that would be built")
+def materialize(
+    tables: Tuple[str, ...],
+    pipeline_name: str,
+    env: Optional[str],
+    jobs: Optional[int],
+    force: bool,
+    dry_run: bool,
+) -> None:
+    """
+    Build the silver and primary SQL tables that are out of date.
+
+    TABLES are node or output dataset names (e.g. primary_core); they are
+    built with the tables they depend on. Every table is considered by default.
+    """
+    bootstrap_project(Path.cwd())
+    with KedroSession.create(env=env) as session:
+        catalog = session.load_context().catalog
+        paths = materialization.dataset_paths(catalog)
+        sql_tables = materialization.sql_tables(
+            pipelines[pipeline_name], paths, materialization.discover_sql_files()
+        )
+        try:
+            stale = materialization.stale_tables(sql_tables, paths, tables, force)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="TABLES") from e
+
+        if not stale:
+            click.echo("Every SQL table is up to date")
+            return
+        for name, reason in stale.items():
+            click.echo(f"{', '.join(sql_tables[name]['outputs'])}: {reason}")
+        if dry_run:
+            return
+        session.run(
+            pipeline_name=pipeline_name,
+            node_names=list(stale),
+            runner=ThreadRunner(max_workers=jobs),
+        )
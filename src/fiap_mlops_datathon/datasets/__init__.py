@@ -0,0 +1,16 @@
+"""Custom Kedro datasets for FIAP MLOps Datathon."""
+
+from .cached_parquet import CachedParquet
+from .duckdb_parquet_dataset import DuckDBParquetDataset
+from .optional_parquet_dataset import OptionalParquetDataset
+from .parquet_chunks import ParquetChunks
+from .streaming_json_dataset import JSONRecordStream, StreamingJSONDataset
+
+__all__ = [
+    "CachedParquet",
+    "DuckDBParquetDataset",
+    "JSONRecordStream",
+    "OptionalParquetDataset",
+    "ParquetChunks",
+    "StreamingJSONDataset",
+]
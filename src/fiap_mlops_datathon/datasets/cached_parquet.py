@@ -0,0 +1,22 @@
+"""
+``CachedParquet`` is a node output that was already written to Parquet, saved
+by ``DuckDBParquetDataset`` by linking or copying the existing file.
+"""
+
+from pathlib import Path
+from typing import Union
+
+
+class CachedParquet:
+    """
+    Parquet file to save as is, e.g. a cached result of an unchanged query.
+
+    Args:
+        path: Parquet file holding the output
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self.path)!r})"
@@ -0,0 +1,230 @@
+"""
+``DuckDBParquetDataset`` saves DuckDB relations to Parquet with ``COPY ... TO``
+and ``ParquetChunks`` streams chunk by chunk, one row group per chunk.
+"""
+
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from kedro.io import DatasetError
+from kedro.io.core import get_filepath_str
+from kedro_datasets.pandas import ParquetDataset
+
+from .cached_parquet import CachedParquet
+from .parquet_chunks import ParquetChunks
+
+logger = logging.getLogger(__name__)
+
+# save_args that have no pyarrow.parquet.ParquetWriter equivalent
+_PANDAS_ONLY_SAVE_ARGS = ("engine", "index", "row_group_size", "partition_by")
+
+# pyarrow save_args that DuckDB's COPY TO does not write
+_COPY_IGNORED_SAVE_ARGS = ("bloom_filter_options", "write_page_index")
+
+
+class DuckDBParquetDataset(ParquetDataset):
+    """
+    ``pandas.ParquetDataset`` that also accepts a ``duckdb.DuckDBPyRelation``
+    or ``ParquetChunks`` on save.
+
+    Relations are written by DuckDB itself (``COPY ... TO``), so the result is
+    streamed to Parquet without ever being materialised as a pandas DataFrame.
+    ``ParquetChunks`` are written with a ``pyarrow.parquet.ParquetWriter``, one
+    chunk at a time, with ``chunk_size`` rows per row group; chunks backed by a
+    relation are copied by DuckDB with the same row group size (which DuckDB
+    rounds up to a multiple of its 2048-row vector size). DataFrames are
+    saved exactly like ``pandas.ParquetDataset`` does (``save_args.row_group_size``
+    applies to them and to plain relations), and loading always returns a DataFrame.
+    DuckDB copies honour ``compression`` and ``compression_level`` and pick
+    their own column encodings; the other pyarrow options (``use_dictionary``,
+    ``column_encoding``, ``bloom_filter_options``, ``write_page_index``...)
+    apply to DataFrames and pandas or Arrow chunks. Copying a relation to a
+    dataset with bloom filters or page indexes logs a warning, since the
+    lookups relying on them then scan every row group.
+    With ``save_args.partition_by``, relations are written as a Hive-partitioned
+    directory at ``filepath`` (replaced on every save), loaded back with the
+    partition columns as text. A ``CachedParquet`` is hard linked (or copied
+    across file systems) to ``filepath``; a file that is still linked, e.g.
+    to a cache entry, is unlinked before it is overwritten, so the other
+    copy is never modified. Local relations and chunks are written to a
+    temporary file next to ``filepath`` and renamed over it once complete,
+    so a failed save leaves the previous file intact.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        intermediate_applicants:
+          type: fiap_mlops_datathon.datasets.DuckDBParquetDataset
+          filepath: data/02_intermediate/applicants.parquet
+          save_args:
+            compression: snappy
+            engine: pyarrow
+    """
+
+    def _save(
+        self, data: Union[pd.DataFrame, duckdb.DuckDBPyRelation, ParquetChunks, CachedParquet]
+    ) -> None:
+        if isinstance(data, CachedParquet):
+            self._link_cached(data)
+            self._invalidate_cache()
+            return
+        self._unlink_shared_file()
+
+        is_relation = isinstance(data, duckdb.DuckDBPyRelation) or (
+            isinstance(data, ParquetChunks) and data.relation is not None
+        )
+        if self._save_args.get("partition_by") and not is_relation:
+            raise DatasetError(
+                f"{self.__class__.__name__} can only partition DuckDB relations"
+            )
+
+        if isinstance(data, ParquetChunks) and data.relation is not None:
+            self._copy_relation(data.relation, row_group_size=data.chunk_size)
+        elif isinstance(data, ParquetChunks):
+            self._write_chunks(data)
+        elif isinstance(data, duckdb.DuckDBPyRelation):
+            self._copy_relation(data, row_group_size=self._save_args.get("row_group_size"))
+        else:
+            ParquetDataset.save(self, data)
+            return
+        self._invalidate_cache()
+
+    def _load(self) -> pd.DataFrame:
+        if not self._save_args.get("partition_by") or self._protocol != "file":
+            return ParquetDataset.load(self)
+        # Partition values are kept as text, as written, instead of pyarrow's guessed types
+        load_path = get_filepath_str(self._get_load_path(), self._protocol).replace("'", "''")
+        hive_types = ", ".join(f"'{column}': VARCHAR" for column in self._save_args["partition_by"])
+        con = duckdb.connect(database=":memory:")
+        try:
+            relation = con.sql(
+                f"SELECT * FROM read_parquet('{load_path}/**/*.parquet', "
+                f"hive_partitioning = true, hive_types = {{{hive_types}}})"
+            )
+            # Same column types as pandas.read_parquet with this dtype_backend
+            if self._load_args.get("dtype_backend") == "pyarrow":
+                return relation.to_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
+            return relation.df()
+        finally:
+            con.close()
+
+    def _link_cached(self, data: CachedParquet) -> None:
+        if self._protocol != "file":
+            raise DatasetError(
+                f"{self.__class__.__name__} can only link cached Parquet files to local files"
+            )
+        save_path = get_filepath_str(self._get_save_path(), self._protocol)
+        if not (os.path.exists(save_path) and os.path.samefile(save_path, data.path)):
+            self._fs.makedirs(str(self._filepath.parent), exist_ok=True)
+            if os.path.isfile(save_path):
+                os.remove(save_path)
+            try:
+                os.link(data.path, save_path)
+            except OSError:
+                shutil.copy2(data.path, save_path)
+        # Saved now as far as freshness checks (modification times) go
+        os.utime(save_path)
+
+    def _unlink_shared_file(self) -> None:
+        if self._protocol != "file":
+            return
+        save_path = get_filepath_str(self._get_save_path(), self._protocol)
+        if os.path.isfile(save_path) and os.stat(save_path).st_nlink > 1:
+            os.remove(save_path)
+
+    @contextmanager
+    def _atomic_save_path(self) -> Iterator[str]:
+        """Yield a temporary path to write to, moved over the save path on success."""
+        save_path = get_filepath_str(self._get_save_path(), self._protocol)
+        if self._protocol != "file":
+            # Object stores only publish a file once its upload completes
+            yield save_path
+            return
+        directory, filename = os.path.split(save_path)
+        self._fs.makedirs(directory or ".", exist_ok=True)
+        # Same directory, so the rename stays on one file system and is atomic
+        temp_path = os.path.join(directory, f".{filename}.{uuid.uuid4().hex}.tmp")
+        try:
+            yield temp_path
+            os.replace(temp_path, save_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _copy_relation(self, relation: duckdb.DuckDBPyRelation, row_group_size: Any = None) -> None:
+        if self._protocol != "file":
+            raise DatasetError(
+                f"{self.__class__.__name__} can only write DuckDB relations to local files"
+            )
+        save_path = get_filepath_str(self._get_save_path(), self._protocol)
+        ignored = [arg for arg in _COPY_IGNORED_SAVE_ARGS if self._save_args.get(arg)]
+        if ignored:
+            logger.warning(
+                f"{save_path} is written by DuckDB with COPY TO, which ignores save_args "
+                f"{ignored}; write it with processing.primary_writer: arrow to keep them"
+            )
+        self._fs.makedirs(str(self._filepath.parent), exist_ok=True)
+        copy_options = [
+            "FORMAT parquet",
+            f"COMPRESSION {self._save_args.get('compression', 'snappy')}",
+        ]
+        if self._save_args.get("compression_level") is not None:
+            copy_options.append(f"COMPRESSION_LEVEL {int(self._save_args['compression_level'])}")
+        if row_group_size is not None:
+            copy_options.append(f"ROW_GROUP_SIZE {int(row_group_size)}")
+        if self._save_args.get("partition_by"):
+            columns = ", ".join(self._save_args["partition_by"])
+            copy_options += [f"PARTITION_BY ({columns})", "OVERWRITE true"]
+            self._copy_to(relation, save_path, copy_options)
+            return
+        with self._atomic_save_path() as temp_path:
+            self._copy_to(relation, temp_path, copy_options)
+
+    @staticmethod
+    def _copy_to(relation: duckdb.DuckDBPyRelation, path: str, copy_options: list) -> None:
+        target = path.replace("'", "''")
+        relation.query(
+            "_relation", f"COPY _relation TO '{target}' ({', '.join(copy_options)})"
+        )
+
+    def _write_chunks(self, data: ParquetChunks) -> None:
+        save_path = get_filepath_str(self._get_save_path(), self._protocol)
+        writer_args = {
+            key: value for key, value in self._save_args.items()
+            if key not in _PANDAS_ONLY_SAVE_ARGS
+        }
+
+        with self._atomic_save_path() as temp_path, self._fs.open(temp_path, mode="wb") as fs_file:
+            writer = None
+            try:
+                for chunk in data:
+                    table = _to_arrow_table(chunk, data.schema)
+                    if writer is None:
+                        writer = pq.ParquetWriter(fs_file, table.schema, **writer_args)
+                    writer.write_table(table, row_group_size=data.chunk_size)
+                if writer is None:
+                    raise DatasetError(
+                        f"{self.__class__.__name__} received no chunks to write to {save_path}"
+                    )
+            finally:
+                if writer is not None:
+                    writer.close()
+
+
+def _to_arrow_table(chunk: Any, schema: Optional[pa.Schema]) -> pa.Table:
+    if isinstance(chunk, pd.DataFrame):
+        return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+    if isinstance(chunk, pa.RecordBatch):
+        chunk = pa.Table.from_batches([chunk])
+    if schema is not None and chunk.schema != schema:
+        chunk = chunk.cast(schema)
+    return chunk
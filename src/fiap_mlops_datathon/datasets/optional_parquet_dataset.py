@@ -0,0 +1,29 @@
+"""
+``OptionalParquetDataset`` loads a Parquet file that may not exist yet.
+"""
+
+from typing import Optional
+
+import pandas as pd
+from kedro_datasets.pandas import ParquetDataset
+
+
+class OptionalParquetDataset(ParquetDataset):
+    """
+    ``pandas.ParquetDataset`` that loads ``None`` instead of failing when the
+    file is missing. Used to read the previous run's output of a node, e.g. for
+    incremental processing, where the first run has nothing to read.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        previous_intermediate_applicants:
+          type: fiap_mlops_datathon.datasets.OptionalParquetDataset
+          filepath: data/02_intermediate/applicants.parquet
+    """
+
+    def _load(self) -> Optional[pd.DataFrame]:
+        if not self._exists():
+            return None
+        return ParquetDataset.load(self)
@@ -0,0 +1,119 @@
+"""
+``ParquetChunks`` is a table produced as a stream of chunks, saved by
+``DuckDBParquetDataset`` as one Parquet file with one row group per chunk.
+"""
+
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+Chunk = Union[pd.DataFrame, pa.Table, pa.RecordBatch]
+
+
+class ParquetChunks:
+    """
+    Re-iterable stream of table chunks of at most ``chunk_size`` rows.
+
+    Only one chunk needs to be resident while the table is written, so the
+    peak memory of a save is bounded by ``chunk_size`` instead of the table
+    size. This is deliberately not an ``Iterator``: Kedro saves node outputs
+    that are iterators one item at a time, while a ``ParquetChunks`` output is
+    saved as a whole by its dataset.
+
+    Args:
+        chunks: Callable returning a fresh iterable of chunks (DataFrames,
+            Arrow tables or record batches) every time it is called
+        chunk_size: Maximum number of rows per chunk, used as row group size
+        schema: Arrow schema every chunk is converted to; inferred from the
+            first chunk when omitted
+        relation: DuckDB relation the chunks come from, if any. Datasets that
+            can write relations directly use it instead of the chunks.
+    """
+
+    def __init__(
+        self,
+        chunks: Callable[[], Iterable[Chunk]],
+        chunk_size: int,
+        schema: Optional[pa.Schema] = None,
+        relation: Optional[duckdb.DuckDBPyRelation] = None,
+    ):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}")
+        self._chunks = chunks
+        self.chunk_size = chunk_size
+        self.schema = schema
+        self.relation = relation
+
+    def __iter__(self) -> Iterator[Chunk]:
+        return iter(self._chunks())
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunk_size: int) -> "ParquetChunks":
+        """
+        Split a DataFrame into row slices of ``chunk_size`` rows.
+
+        The schema is taken from the whole DataFrame, so a slice where an
+        object column happens to be all null keeps the column's type.
+
+        Args:
+            df: DataFrame to split
+            chunk_size: Rows per chunk
+
+        Returns:
+            ``ParquetChunks`` over views of ``df`` (nothing is copied up front)
+        """
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+        def chunks() -> Iterator[pd.DataFrame]:
+            # An empty frame still yields one chunk so its schema gets written
+            for start in range(0, max(len(df), 1), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+
+        return cls(chunks, chunk_size, schema=schema)
+
+    @classmethod
+    def from_tables(cls, tables: List[pa.Table], chunk_size: int) -> "ParquetChunks":
+        """
+        Write Arrow tables built one chunk at a time.
+
+        The schema is unified over every table, so a chunk where a column is
+        all null (``null`` type) is written with the column's type. The pandas
+        metadata of the tables is dropped: it describes a single chunk.
+
+        Args:
+            tables: Tables of at most about ``chunk_size`` rows, in order
+            chunk_size: Rows per Parquet row group
+
+        Returns:
+            ``ParquetChunks`` over ``tables``
+        """
+        schema = pa.unify_schemas(
+            [table.schema.remove_metadata() for table in tables], promote_options="permissive"
+        )
+        return cls(lambda: iter(tables), chunk_size, schema=schema)
+
+    @classmethod
+    def from_relation(cls, relation: duckdb.DuckDBPyRelation, chunk_size: int) -> "ParquetChunks":
+        """
+        Stream a DuckDB relation as Arrow record batches of ``chunk_size`` rows.
+
+        Args:
+            relation: Lazy DuckDB relation
+            chunk_size: Rows per record batch
+
+        Returns:
+            ``ParquetChunks`` that executes the relation when iterated
+        """
+
+        def chunks() -> Iterator[pa.RecordBatch]:
+            reader = relation.to_arrow_reader(chunk_size)
+            rows = 0
+            for batch in reader:
+                rows += batch.num_rows
+                yield batch
+            if rows == 0:
+                yield reader.schema.empty_table()
+
+        return cls(chunks, chunk_size, relation=relation)
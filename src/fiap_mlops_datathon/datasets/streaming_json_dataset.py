@@ -0,0 +1,221 @@
+"""
+``StreamingJSONDataset`` exposes the top-level object of a JSON file as a lazy,
+key-by-key stream of records instead of loading the whole document into memory.
+"""
+
+import json
+from copy import deepcopy
+from pathlib import PurePosixPath
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+import fsspec
+from kedro.io import AbstractDataset, DatasetError
+from kedro.io.core import get_filepath_str, get_protocol_and_path
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters read from the file per refill
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",:]}"
+
+
+class _ObjectItemReader:
+    """
+    Incremental parser for a JSON document whose root is an object.
+
+    Only the current record (plus one read chunk) is held in memory: keys and
+    values are decoded one at a time with ``json.JSONDecoder.raw_decode`` over a
+    sliding text buffer that is refilled from the file when a value is incomplete.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop everything already consumed before growing the buffer
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        """Skip whitespace and return the next significant character."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise DatasetError("Unexpected end of JSON document")
+
+    def _expect_end(self) -> None:
+        """Only whitespace may follow the root object."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                raise DatasetError(
+                    f"Unexpected data after the JSON document at offset {self._pos}: "
+                    f"{self._buffer[self._pos:self._pos + 20]!r}"
+                )
+            if not self._fill():
+                return
+
+    def _expect(self, allowed: str) -> str:
+        char = self._next_char()
+        if char not in allowed:
+            raise DatasetError(
+                f"Expected one of {allowed!r} at offset {self._pos}, found {char!r}"
+            )
+        self._pos += 1
+        return char
+
+    def _decode_value(self) -> Any:
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise DatasetError(f"Invalid JSON document: {str(e)}") from e
+            # A number that is not followed by a delimiter may still be truncated
+            truncated = end == len(self._buffer) or self._buffer[end] not in _DELIMITERS
+            if truncated and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        self._expect("{")
+        if self._next_char() == "}":
+            self._pos += 1
+            self._expect_end()
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise DatasetError(f"Expected a string key, found {key!r}")
+            self._expect(":")
+            yield key, self._decode_value()
+            if self._expect(",}") == "}":
+                self._expect_end()
+                return
+
+
+class JSONRecordStream:
+    """
+    Lazy, re-iterable mapping view over the records of a JSON object file.
+
+    It supports the ``items``/``keys``/``values`` protocol used by the processing
+    nodes, so it can be passed wherever a fully loaded ``dict`` was expected.
+    Every iteration re-opens the file and parses it incrementally.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        opener: Callable[[], TextIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.filepath = filepath
+        self._opener = opener
+        self._chunk_size = chunk_size
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        with self._opener() as stream:
+            yield from _ObjectItemReader(stream, self._chunk_size).items()
+
+    def keys(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __repr__(self) -> str:
+        return f"JSONRecordStream(filepath={self.filepath!r})"
+
+
+class StreamingJSONDataset(AbstractDataset[None, JSONRecordStream]):
+    """
+    Read-only dataset that streams the records of a JSON object file.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        raw_applicants:
+          type: fiap_mlops_datathon.datasets.StreamingJSONDataset
+          filepath: data/01_raw/applicants.json
+          chunk_size: 1048576
+    """
+
+    DEFAULT_FS_ARGS: Dict[str, Any] = {"open_args_load": {"mode": "r", "encoding": "utf-8"}}
+
+    def __init__(
+        self,
+        *,
+        filepath: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        credentials: Optional[Dict[str, Any]] = None,
+        fs_args: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Create a streaming view over a JSON file.
+
+        Args:
+            filepath: Path to a JSON file whose root is an object keyed by record id
+            chunk_size: Number of characters read from the file per refill
+            credentials: Credentials for the underlying ``fsspec`` filesystem
+            fs_args: Extra filesystem arguments; ``open_args_load`` is passed to ``open``
+            metadata: Arbitrary metadata, ignored by Kedro
+        """
+        _fs_args = deepcopy(fs_args) or {}
+        self._fs_open_args_load = {
+            **self.DEFAULT_FS_ARGS["open_args_load"],
+            **_fs_args.pop("open_args_load", {}),
+        }
+        protocol, path = get_protocol_and_path(filepath)
+        self._protocol = protocol
+        self._filepath = PurePosixPath(path)
+        self._fs = fsspec.filesystem(protocol, **(deepcopy(credentials) or {}), **_fs_args)
+        self._chunk_size = chunk_size
+        self.metadata = metadata
+
+    def _describe(self) -> Dict[str, Any]:
+        return {
+            "filepath": self._filepath,
+            "protocol": self._protocol,
+            "chunk_size": self._chunk_size,
+        }
+
+    def _load(self) -> JSONRecordStream:
+        load_path = get_filepath_str(self._filepath, self._protocol)
+        if not self._fs.exists(load_path):
+            raise DatasetError(f"JSON file not found: {load_path}")
+        return JSONRecordStream(
+            filepath=load_path,
+            opener=lambda: self._fs.open(load_path, **self._fs_open_args_load),
+            chunk_size=self._chunk_size,
+        )
+
+    def _save(self, data: None) -> None:
+        raise DatasetError(f"{self.__class__.__name__} is a read-only dataset")
+
+    def _exists(self) -> bool:
+        return self._fs.exists(get_filepath_str(self._filepath, self._protocol))
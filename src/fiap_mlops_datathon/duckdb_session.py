@@ -0,0 +1,92 @@
+"""
+Shared DuckDB database for the SQL nodes of a run.
+
+Opening a DuckDB database for every query pays its startup each time and
+throws away its caches. The SQL nodes instead take a cursor on one in-memory
+database, configured from the ``duckdb`` parameters by ``DuckDBHooks``
+(threads, memory_limit, temp_directory, preserve_insertion_order) and closed
+when the run ends. Cursors share the database, its settings and its buffer
+manager, while registered DataFrames and temporary tables and types stay
+private to each cursor, so concurrent nodes do not see each other's objects.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+SETTINGS = ("threads", "memory_limit", "temp_directory", "preserve_insertion_order")
+
+
+class DuckDBSession:
+    """Lazily opened in-memory DuckDB database handing out cursors."""
+
+    def __init__(self, settings: Optional[Mapping[str, Any]] = None):
+        settings = settings or {}
+        unknown = set(settings) - set(SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown DuckDB settings: {sorted(unknown)}")
+        self.settings: Dict[str, Any] = {
+            key: value for key, value in settings.items() if value is not None
+        }
+        self._connection: Optional[duckdb.DuckDBPyConnection] = None
+        self._lock = threading.Lock()
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Return a new cursor on the shared database, opening it on first use."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = duckdb.connect(database=":memory:", config=self.settings)
+                logger.info(f"Opened shared DuckDB database with settings {self.settings}")
+            return self._connection.cursor()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_session = DuckDBSession()
+
+
+def configure(settings: Optional[Mapping[str, Any]]) -> None:
+    """Replace the shared database with one using ``settings`` (opened on first use)."""
+    global _session
+    _session.close()
+    _session = DuckDBSession(settings)
+
+
+def settings() -> Dict[str, Any]:
+    """Return the settings of the shared database (those left to DuckDB are omitted)."""
+    return dict(_session.settings)
+
+
+def cursor() -> duckdb.DuckDBPyConnection:
+    """Return a new cursor on the shared database."""
+    return _session.cursor()
+
+
+def close() -> None:
+    """Close the shared database; the next cursor opens a new one."""
+    _session.close()
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for DuckDB SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+@contextmanager
+def timed_query(description: str) -> Iterator[None]:
+    """Log how long the block running a query took."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info(f"{description} took {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,134 @@
+"""Project hooks."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from kedro.framework.context import KedroContext
+from kedro.framework.hooks import hook_impl
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline
+from kedro.pipeline.node import Node
+
+from fiap_mlops_datathon import duckdb_session, query_profiles, sql_cache
+from fiap_mlops_datathon.node_timing import critical_path
+from fiap_mlops_datathon.pipelines.data_processing import sql_templates
+
+logger = logging.getLogger(__name__)
+
+
+class DuckDBHooks:
+    """Configure the shared DuckDB database from the ``duckdb`` parameters."""
+
+    @hook_impl
+    def after_context_created(self, context: KedroContext) -> None:
+        duckdb_session.configure(context.params.get("duckdb"))
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        duckdb_session.close()
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception, run_params: Dict[str, Any]) -> None:
+        duckdb_session.close()
+
+
+class SQLTemplateHooks:
+    """Resolve ``{{ dataset }}`` references of the SQL files with the run's catalog."""
+
+    @hook_impl
+    def after_catalog_created(self, catalog: DataCatalog) -> None:
+        sql_templates.configure(sql_templates.catalog_tables(catalog))
+
+
+class SQLCacheHooks:
+    """Configure the SQL output cache and store the outputs of cache misses once saved."""
+
+    @hook_impl
+    def after_context_created(self, context: KedroContext) -> None:
+        sql_cache.configure(context.params.get("sql_cache"))
+
+    @hook_impl
+    def after_catalog_created(self, catalog: DataCatalog) -> None:
+        sql_cache.register_catalog(catalog)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str) -> None:
+        sql_cache.saved(dataset_name)
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception, run_params: Dict[str, Any]) -> None:
+        sql_cache.discard_pending()
+
+
+class QueryProfilingHooks:
+    """Save the DuckDB profiles of the SQL queries when ``query_profiling`` is enabled."""
+
+    @hook_impl
+    def after_context_created(self, context: KedroContext) -> None:
+        query_profiles.configure(context.params.get("query_profiling"))
+
+
+class NodeTimingHooks:
+    """
+    Time every node and log the critical path of the run.
+
+    A node is timed from the load of its first input to the save of its last
+    output: outputs streamed from DuckDB are computed while they are saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts: Dict[str, float] = {}
+        self._durations: Dict[str, float] = {}
+        self._run_start = 0.0
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        with self._lock:
+            self._starts.clear()
+            self._durations.clear()
+        self._run_start = time.perf_counter()
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str, node: Node) -> None:
+        self._start(node)
+
+    @hook_impl
+    def before_node_run(self, node: Node) -> None:
+        self._start(node)
+
+    @hook_impl
+    def after_node_run(self, node: Node) -> None:
+        self._stop(node)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        self._stop(node)
+
+    def _start(self, node: Node) -> None:
+        with self._lock:
+            self._starts.setdefault(node.name, time.perf_counter())
+
+    def _stop(self, node: Node) -> None:
+        with self._lock:
+            self._durations[node.name] = time.perf_counter() - self._starts[node.name]
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any], pipeline: Pipeline) -> None:
+        wall_time = time.perf_counter() - self._run_start
+        dependencies = {
+            node.name: [parent.name for parent in parents]
+            for node, parents in pipeline.node_dependencies.items()
+        }
+        with self._lock:
+            durations = dict(self._durations)
+        path, path_time = critical_path(durations, dependencies)
+        if not path:
+            return
+        logger.info(
+            f"Critical path {' -> '.join(path)} took {path_time:.3f}s; "
+            f"{len(durations)} nodes took {sum(durations.values()):.3f}s in total, "
+            f"the run {wall_time:.3f}s"
+        )
@@ -0,0 +1,179 @@
+"""
+Freshness-aware materialization of the SQL tables.
+
+Every SQL file under ``materialize_silver`` and ``materialize_primary`` is
+read by one node of the project pipelines (through its ``sql_*`` catalog
+dataset), which writes the file's table. The tables depend on each other
+through the ``{{ dataset }}`` references of their SQL: a table referencing
+the output of another one is built after it.
+
+A table is stale, and rebuilt, when one of its output files is missing,
+when its SQL file or one of its input files was modified after its oldest
+output, or when a table it depends on is rebuilt. ``fiap-mlops-datathon
+materialize`` (see ``cli``) runs the nodes of the stale tables only, with
+Kedro's ThreadRunner, so every table whose dependencies are built runs
+concurrently with the others.
+"""
+
+import logging
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from kedro.io import DataCatalog
+from kedro.io.core import get_filepath_str
+from kedro.pipeline import Pipeline
+
+from fiap_mlops_datathon.pipelines.data_processing.sql_templates import referenced_datasets
+
+logger = logging.getLogger(__name__)
+
+SQL_ROOT = Path(__file__).parent / "pipelines" / "data_processing"
+SQL_DIRECTORIES = ("materialize_silver", "materialize_primary")
+
+
+def discover_sql_files(root: Path = SQL_ROOT) -> List[Path]:
+    """Return the SQL files of the materialization directories, by layer then name."""
+    return [
+        path for directory in SQL_DIRECTORIES for path in sorted((root / directory).glob("*.sql"))
+    ]
+
+
+def dataset_paths(catalog: DataCatalog) -> Dict[str, Path]:
+    """Return the local file (or directory) of every dataset of ``catalog`` that has one."""
+    paths = {}
+    for name in catalog.list():
+        dataset = catalog._get_dataset(name)
+        if getattr(dataset, "_protocol", None) != "file" or not hasattr(dataset, "_get_load_path"):
+            continue
+        paths[name] = Path(get_filepath_str(dataset._get_load_path(), dataset._protocol))
+    return paths
+
+
+def sql_tables(
+    pipeline: Pipeline, paths: Mapping[str, Path], sql_files: Iterable[Path]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Find the node running each SQL file and the datasets it reads and writes.
+
+    Args:
+        pipeline: Pipeline with the SQL nodes
+        paths: Local file of each catalog dataset, by dataset name
+        sql_files: SQL files to materialize
+
+    Returns:
+        Mapping of node name to its ``sql`` file, its ``inputs`` (the
+        datasets the SQL references, then the other dataset inputs of the
+        node) and its ``outputs``
+    """
+    sql_datasets = {path.resolve(): name for name, path in paths.items()}
+    tables = {}
+    for sql_file in sql_files:
+        dataset = sql_datasets.get(Path(sql_file).resolve())
+        nodes = [node for node in pipeline.nodes if dataset in node.inputs]
+        if dataset is None or not nodes:
+            logger.warning(f"{sql_file} is not read by any node of the pipeline, skipped")
+            continue
+        node = nodes[0]
+        references = referenced_datasets(Path(sql_file).read_text(encoding="utf-8"))
+        inputs = [
+            name for name in node.inputs if name != dataset and not name.startswith("params:")
+        ]
+        tables[node.name] = {
+            "sql": Path(sql_file),
+            "inputs": list(dict.fromkeys([*references, *inputs])),
+            "outputs": sorted(node.outputs),
+        }
+    return tables
+
+
+def table_dependencies(tables: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """Return the tables whose outputs each table reads, by node name."""
+    producers = {output: name for name, table in tables.items() for output in table["outputs"]}
+    return {
+        name: list(dict.fromkeys(
+            producers[dataset] for dataset in table["inputs"]
+            if dataset in producers and producers[dataset] != name
+        ))
+        for name, table in tables.items()
+    }
+
+
+def modified_time(path: Optional[Path]) -> Optional[float]:
+    """Return the modification time of a file, or of the newest file of a directory."""
+    if path is None:
+        return None
+    if path.is_dir():
+        return max((file.stat().st_mtime for file in path.rglob("*") if file.is_file()), default=None)
+    if path.is_file():
+        return path.stat().st_mtime
+    return None
+
+
+def stale_tables(
+    tables: Mapping[str, Mapping[str, Any]],
+    paths: Mapping[str, Path],
+    targets: Iterable[str] = (),
+    force: bool = False,
+) -> Dict[str, str]:
+    """
+    Pick the tables to rebuild.
+
+    Args:
+        tables: SQL tables by node name, as returned by ``sql_tables``
+        paths: Local file of each catalog dataset, by dataset name
+        targets: Node or output dataset names to materialize, with the tables
+            they depend on; every table by default
+        force: Rebuild the tables even if they are fresh
+
+    Returns:
+        Mapping of node name to the reason it is rebuilt, in dependency order
+    """
+    dependencies = table_dependencies(tables)
+    selected = set(tables)
+    targets = set(targets)
+    if targets:
+        wanted = [
+            name for name, table in tables.items()
+            if name in targets or targets.intersection(table["outputs"])
+        ]
+        unknown = targets - set(wanted) - {o for name in wanted for o in tables[name]["outputs"]}
+        if unknown:
+            raise ValueError(f"Unknown SQL tables: {sorted(unknown)}")
+        selected = set()
+        while wanted:
+            name = wanted.pop()
+            if name not in selected:
+                selected.add(name)
+                wanted.extend(dependencies[name])
+
+    stale = {}
+    for name in TopologicalSorter(dependencies).static_order():
+        if name not in selected:
+            continue
+        table = tables[name]
+        output_times = [
+            modified_time(paths.get(output)) for output in table["outputs"] if output in paths
+        ]
+        rebuilt_dependencies = [dependency for dependency in dependencies[name] if dependency in stale]
+        if force:
+            stale[name] = "forced"
+        elif not output_times or None in output_times:
+            stale[name] = "missing output"
+        elif rebuilt_dependencies:
+            stale[name] = f"depends on {', '.join(rebuilt_dependencies)}"
+        else:
+            oldest_output = min(output_times)
+            # Inputs that are the table's own outputs (its previous run) don't count
+            output_paths = {paths[output] for output in table["outputs"] if output in paths}
+            input_paths = [
+                paths[dataset] for dataset in table["inputs"]
+                if dataset in paths and paths[dataset] not in output_paths
+            ]
+            newer = [
+                str(path) for path in [table["sql"], *input_paths]
+                if (modified_time(path) or 0.0) > oldest_output
+            ]
+            if newer:
+                stale[name] = f"{', '.join(newer)} changed"
+    return stale
@@ -0,0 +1,47 @@
+"""
+Node timings of a run and its critical path.
+
+With a concurrent runner (``kedro run --runner ThreadRunner``) a run cannot
+take less than its critical path: the chain of dependent nodes with the
+largest total duration. ``NodeTimingHooks`` logs it after every run, next to
+the sum of all node durations (the time a sequential run needs) and the
+wall time of the run.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+def critical_path(
+    durations: Mapping[str, float], dependencies: Mapping[str, Iterable[str]]
+) -> Tuple[List[str], float]:
+    """
+    Find the chain of dependent nodes with the largest total duration.
+
+    Args:
+        durations: Duration of each node, in seconds
+        dependencies: Names of the nodes each node depends on; nodes without
+            a duration (e.g. not run) count as zero
+
+    Returns:
+        Node names of the critical path, in run order, and its duration
+    """
+    finish: Dict[str, float] = {}
+    previous: Dict[str, str] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            start = 0.0
+            for parent in dependencies.get(name, ()):
+                if finish_time(parent) > start:
+                    start = finish[parent]
+                    previous[name] = parent
+            finish[name] = start + durations.get(name, 0.0)
+        return finish[name]
+
+    if not durations:
+        return [], 0.0
+    last = max(durations, key=finish_time)
+    path = [last]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    return path[::-1], finish[last]
@@ -8,19 +8,34 @@ from kedro.pipeline import Pipeline
 from fiap_mlops_datathon.pipelines.data_processing import (
     create_pipeline as data_processing,
 )
+from fiap_mlops_datathon.pipelines.data_processing.pipeline import (
+    create_partitioned_prospects_pipeline as partitioned_prospects,
+)
+from fiap_mlops_datathon.pipelines.data_processing.pipeline import (
+    create_silver_layer_pipeline as silver_processing,
+)
 from fiap_mlops_datathon.pipelines.json_processing import (
     create_pipeline as json_processing,
 )
+from fiap_mlops_datathon.pipelines.json_processing.pipeline import (
+    create_replay_pipeline as json_replay,
+)
 
 
 def register_pipelines() -> Dict[str, Pipeline]:
     """Register the project's pipelines."""
     json_processing_pipeline = json_processing()
     primary_processing_pipeline = data_processing()
+    primary_partitioned_pipeline = partitioned_prospects()
 
     return {
         "__default__": json_processing_pipeline + primary_processing_pipeline,
         "json_processing": json_processing_pipeline,
+        "silver_processing": silver_processing(),
         "primary_processing": primary_processing_pipeline,
-        "full": json_processing_pipeline + primary_processing_pipeline,
+        "json_replay": json_replay(),
+        "primary_partitioned": primary_partitioned_pipeline,
+        "full": (
+            json_processing_pipeline + primary_processing_pipeline + primary_partitioned_pipeline
+        ),
     }
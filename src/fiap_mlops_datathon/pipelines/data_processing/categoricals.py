@@ -0,0 +1,186 @@
+"""
+Dictionary encoding of low-cardinality text columns in DuckDB query results.
+
+The intermediate layer stores low-cardinality text as ``category`` columns,
+which Parquet keeps as dictionary arrays and Kedro loads back as
+``category`` (or dictionary ``pd.ArrowDtype`` columns). DuckDB passes
+``category`` columns through as ENUM, but it reads Arrow dictionaries as
+VARCHAR, a query that rebuilds a column (``COALESCE``, ``CASE``, a
+``UNION``...) returns VARCHAR, and so do the columns of datasets DuckDB
+scans from their file.
+
+The columns to encode are decided before the query runs, from the dtypes of
+its input DataFrames and the node's explicit ``enum_columns``: a VARCHAR
+result column named like a categorical input column, or listed in
+``enum_columns``, is dictionary encoded batch by batch as the Arrow result
+is fetched. Nothing scans or materialises the result beforehand, so
+streamed queries keep their memory bounded by the batch size. Parquet
+stores the dictionary arrays with their Arrow type, so pandas loads them as
+``category`` again.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+ArrowData = Union[pa.Table, pa.RecordBatch]
+
+# "numpy" converts query results to NumPy-backed columns (DuckDB's ``.df()``),
+# "pyarrow" hands the Arrow result to pandas as ``pd.ArrowDtype`` columns
+DTYPE_BACKENDS = ("numpy", "pyarrow")
+
+
+def _is_categorical(dtype: Any) -> bool:
+    if isinstance(dtype, pd.CategoricalDtype):
+        return True
+    return isinstance(dtype, pd.ArrowDtype) and pa.types.is_dictionary(dtype.pyarrow_dtype)
+
+
+def dictionary_columns(
+    con: duckdb.DuckDBPyConnection,
+    sql_query: str,
+    sources: Iterable[pd.DataFrame] = (),
+    enum_columns: Sequence[str] = (),
+) -> List[str]:
+    """
+    Pick the text columns of a query result to dictionary encode, without running it.
+
+    Args:
+        con: DuckDB connection the query's inputs are registered on
+        sql_query: Rendered SQL query
+        sources: Input DataFrames of the query
+        enum_columns: Text columns always encoded (e.g. statuses)
+
+    Returns:
+        VARCHAR result columns that are categorical in a source or listed in
+        ``enum_columns``, in result order
+    """
+    categorical = set(enum_columns)
+    for source in sources:
+        categorical.update(
+            name for name, dtype in source.dtypes.items() if _is_categorical(dtype)
+        )
+    # Binding the query gives its result types; nothing is executed
+    result = con.sql(sql_query)
+    columns = [
+        name for name, column_type in zip(result.columns, result.types)
+        if column_type.id == "varchar" and name in categorical
+    ]
+    if columns:
+        logger.info(f"Dictionary encoding columns: {columns}")
+    return columns
+
+
+def encode_dictionary_columns(data: ArrowData, columns: Sequence[str]) -> ArrowData:
+    """
+    Dictionary encode text columns of an Arrow table or record batch.
+
+    Args:
+        data: Arrow table or record batch of a query result
+        columns: Names of the columns to encode
+
+    Returns:
+        The same rows, with ``columns`` as dictionary arrays
+    """
+    for name in columns:
+        i = data.schema.get_field_index(name)
+        data = data.set_column(i, name, pc.dictionary_encode(data.column(i)))
+    return data
+
+
+def _arrow_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """``types_mapper`` keeping Arrow buffers except for dictionary (category) columns."""
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def fetch_df(result: duckdb.DuckDBPyConnection, dtype_backend: str) -> pd.DataFrame:
+    """
+    Fetch the result of an executed query as a DataFrame.
+
+    With ``dtype_backend="pyarrow"`` the result is fetched as an Arrow table
+    and wrapped in ``pd.ArrowDtype`` columns without converting it: strings
+    stay Arrow strings instead of becoming Python objects. Dictionary columns
+    still become ``category`` (only their dictionary is converted).
+
+    Args:
+        result: Connection or cursor a query was executed on
+        dtype_backend: One of ``DTYPE_BACKENDS``
+
+    Returns:
+        Query result
+
+    Raises:
+        ValueError: If ``dtype_backend`` is unknown
+    """
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(
+            f"Unknown dtype backend {dtype_backend!r}, expected one of {DTYPE_BACKENDS}"
+        )
+    if dtype_backend == "pyarrow":
+        return arrow_to_pandas(result.to_arrow_table())
+    return result.df()
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Wrap an Arrow table in ``pd.ArrowDtype`` columns, dictionary columns as ``category``."""
+    return table.to_pandas(types_mapper=_arrow_dtype)
+
+
+def categorical_memory_report(df: pd.DataFrame) -> Dict[str, Tuple[float, float]]:
+    """
+    Compare the memory of each ``category`` column with its object equivalent.
+
+    Args:
+        df: DataFrame with categorical columns
+
+    Returns:
+        Mapping of column name to (object MB, category MB)
+    """
+    report = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            as_object = series.astype(object).memory_usage(index=False, deep=True)
+            report[column] = (
+                as_object / 1024**2,
+                series.memory_usage(index=False, deep=True) / 1024**2,
+            )
+    return report
+
+
+def dictionary_memory_report(data: ArrowData) -> Dict[str, Tuple[float, float]]:
+    """
+    Compare the memory of each dictionary column with its plain Arrow equivalent.
+
+    Args:
+        data: Arrow table or record batch with dictionary columns
+
+    Returns:
+        Mapping of column name to (plain MB, dictionary MB)
+    """
+    report = {}
+    for field, column in zip(data.schema, data.columns):
+        if pa.types.is_dictionary(field.type):
+            plain = pc.cast(column, field.type.value_type)
+            report[field.name] = (plain.nbytes / 1024**2, column.nbytes / 1024**2)
+    return report
+
+
+def log_categorical_memory(report: Mapping[str, Tuple[float, float]], plain: str) -> None:
+    """Log the total memory of the encoded columns against their ``plain`` equivalent."""
+    if not report:
+        return
+    plain_mb = sum(before for before, _ in report.values())
+    encoded_mb = sum(after for _, after in report.values())
+    logger.info(
+        f"Categorical columns memory: {plain_mb:.2f} MB as {plain} -> "
+        f"{encoded_mb:.2f} MB dictionary encoded"
+    )
@@ -0,0 +1,141 @@
+"""
+Incremental maintenance of primary_core, the join of vagas, prospects and applicants.
+
+Every row of the core belongs to one vaga, so the core is rebuilt per vaga:
+the rows of the vagas affected since the last run are recomputed with the
+core query, and the rows of every other vaga are copied from the previous
+core. A vaga is affected when:
+
+- one of its prospects was updated after the watermark, the latest
+  ``ultima_atualizacao`` of the previous core;
+- the vaga, one of its prospects or a linked applicant was added, changed or
+  removed in the change set, the JSON ingestion manifest records whose hash
+  differs from the manifest snapshot taken when the core was last built
+  (vagas and applicants carry no update timestamp).
+
+The core manifest also records how the core was built (``core_build``
+entity): the hash of the rendered core query and the ingestion manifest
+version. A previous core built by another query, or compared against
+manifests of another version, is rebuilt instead of merged.
+
+The queries are SQL templates (see ``sql_templates``) over the datasets
+``primary_prospects``, ``previous_primary_core``, ``json_ingestion_manifest``
+and ``previous_primary_core_manifest``.
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from fiap_mlops_datathon.pipelines.json_processing.incremental import (
+    MANIFEST_COLUMNS,
+    MANIFEST_VERSION,
+    manifest_hashes,
+)
+
+CORE_KEYS = ("vaga_id", "codigo")
+
+BUILD_ENTITY = "core_build"
+
+_AFFECTED_VAGAS = """WITH manifest_changes AS (
+    (SELECT entity, key, hash FROM {{ json_ingestion_manifest }}
+     EXCEPT
+     SELECT entity, key, hash FROM {{ previous_primary_core_manifest }})
+    UNION
+    (SELECT entity, key, hash FROM {{ previous_primary_core_manifest }}
+     EXCEPT
+     SELECT entity, key, hash FROM {{ json_ingestion_manifest }})
+),
+changed_applicants AS (
+    SELECT key AS codigo FROM manifest_changes WHERE entity = 'applicants'
+),
+affected_vagas AS (
+    SELECT key AS vaga_id FROM manifest_changes WHERE entity = 'vagas'
+    UNION
+    SELECT split_part(key, '/', 1) FROM manifest_changes WHERE entity = 'prospects'
+    UNION
+    SELECT prospect_id::VARCHAR FROM {{ primary_prospects }}
+    WHERE ultima_atualizacao > (SELECT max(ultima_atualizacao) FROM {{ previous_primary_core }})
+    UNION
+    SELECT prospect_id::VARCHAR FROM {{ primary_prospects }}
+    WHERE codigo::VARCHAR IN (SELECT codigo FROM changed_applicants)
+    UNION
+    SELECT vaga_id::VARCHAR FROM {{ previous_primary_core }}
+    WHERE codigo::VARCHAR IN (SELECT codigo FROM changed_applicants)
+)"""
+
+
+def affected_vagas_query() -> str:
+    """Return the SQL template listing the ``vaga_id`` of the vagas to recompute."""
+    return f"{_AFFECTED_VAGAS}\nSELECT vaga_id FROM affected_vagas WHERE vaga_id IS NOT NULL"
+
+
+def watermark_query() -> str:
+    """Return the SQL template of the watermark: the latest update in the previous core."""
+    return "SELECT max(ultima_atualizacao) FROM {{ previous_primary_core }}"
+
+
+def incremental_core_query(core_sql: str) -> str:
+    """
+    Wrap the core query so that it only recomputes the affected vagas.
+
+    Args:
+        core_sql: SQL template of the full core join
+
+    Returns:
+        SQL template returning the merged core, ordered by ``CORE_KEYS``
+    """
+    order_by = ", ".join(CORE_KEYS)
+    return f"""{_AFFECTED_VAGAS}
+SELECT previous.*
+FROM {{{{ previous_primary_core }}}} previous
+ANTI JOIN affected_vagas ON previous.vaga_id::VARCHAR = affected_vagas.vaga_id
+UNION ALL BY NAME
+SELECT recomputed.*
+FROM ({core_sql.strip()}) recomputed
+SEMI JOIN affected_vagas ON recomputed.vaga_id::VARCHAR = affected_vagas.vaga_id
+ORDER BY {order_by}"""
+
+
+def core_build_hashes(rendered_sql: str) -> Dict[str, str]:
+    """Return the ``core_build`` manifest entries of a core built with ``rendered_sql``."""
+    return {
+        "sql": hashlib.blake2b(rendered_sql.strip().encode("utf-8"), digest_size=16).hexdigest(),
+        "manifest_version": str(MANIFEST_VERSION),
+    }
+
+
+def core_manifest(
+    json_ingestion_manifest: Optional[pd.DataFrame], rendered_sql: str
+) -> pd.DataFrame:
+    """
+    Build the manifest saved with the core.
+
+    Args:
+        json_ingestion_manifest: Record hashes the core was built from, if any
+        rendered_sql: Core query, rendered
+
+    Returns:
+        The ingestion manifest followed by the ``core_build`` entries
+    """
+    build = pd.DataFrame(
+        [(BUILD_ENTITY, key, value) for key, value in core_build_hashes(rendered_sql).items()],
+        columns=MANIFEST_COLUMNS,
+    )
+    if json_ingestion_manifest is None or json_ingestion_manifest.empty:
+        return build
+    return pd.concat([json_ingestion_manifest[MANIFEST_COLUMNS], build], ignore_index=True)
+
+
+def changed_build(previous_core_manifest: pd.DataFrame, rendered_sql: str) -> List[str]:
+    """Return the ``core_build`` entries that differ from those of the previous core."""
+    previous = manifest_hashes(previous_core_manifest, BUILD_ENTITY)
+    return [
+        key for key, value in core_build_hashes(rendered_sql).items() if previous.get(key) != value
+    ]
+
+
+def record_manifest(core_manifest: pd.DataFrame) -> pd.DataFrame:
+    """Return the ingestion record hashes of a core manifest, without its build entries."""
+    return core_manifest[core_manifest["entity"] != BUILD_ENTITY]
@@ -0,0 +1,206 @@
+"""
+Point lookups on the primary Parquet tables.
+
+The primary tables are written sorted by their lookup keys, with page indexes
+and Parquet bloom filters on those keys (see ``parquet_save_args`` in
+conf/base/globals.yml). DuckDB pushes the equality filters of ``lookup_rows``
+into the Parquet scan and skips every row group whose min/max statistics or
+bloom filter exclude the key, so a lookup reads a few row groups instead of
+the whole file. ``primary_core`` is sorted by ``vaga_id`` then ``codigo``,
+so its ``codigo`` lookups only skip row groups through the bloom filter;
+``lookup_bytes_read`` measures how much of the file a lookup actually reads.
+
+The tables are found through the project catalog, so ``env`` picks the same
+files ``kedro run --env`` writes. Rows are returned as Arrow-backed pandas
+columns by default, like the tables the pipeline nodes load
+(``dtype_backend`` of conf/base/globals.yml).
+"""
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Union
+
+import duckdb
+import pandas as pd
+from fsspec.implementations.local import LocalFileOpener, LocalFileSystem
+
+from fiap_mlops_datathon.duckdb_session import quote_identifier
+
+from .categoricals import fetch_df
+from .sql_templates import dataset_filepath, project_catalog
+
+logger = logging.getLogger(__name__)
+
+# Catalog datasets of the primary tables written for lookups
+PRIMARY_PROSPECTS = "primary_prospects"
+PRIMARY_CORE = "primary_core"
+
+# Column holding the vaga id in each table; both key candidates by ``codigo``
+VAGA_COLUMNS = {PRIMARY_PROSPECTS: "prospect_id", PRIMARY_CORE: "vaga_id"}
+
+
+@lru_cache(maxsize=None)
+def table_filepath(dataset: str, conf_source: str = "conf", env: str = "local") -> str:
+    """
+    Return the Parquet file of a catalog dataset.
+
+    Args:
+        dataset: Catalog dataset name, e.g. ``PRIMARY_PROSPECTS``
+        conf_source: Configuration directory of the project
+        env: Configuration environment merged over ``base``
+
+    Returns:
+        Path of the dataset's file
+    """
+    return dataset_filepath(project_catalog(conf_source, env), dataset)
+
+
+def lookup_rows(
+    filepath: str,
+    keys: Mapping[str, Any],
+    columns: Optional[Sequence[str]] = None,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+    dtype_backend: str = "pyarrow",
+) -> pd.DataFrame:
+    """
+    Read the rows of a Parquet file whose columns equal the given keys.
+
+    Args:
+        filepath: Parquet file (or glob) to read
+        keys: Column name to value; values must have the column's type
+            (int for the keys of ``primary_prospects`` and ``primary_core``)
+        columns: Columns to return, all by default
+        connection: DuckDB connection to run the lookup on; a new in-memory
+            one by default, reuse one when doing many lookups
+        dtype_backend: "pyarrow" for ``pd.ArrowDtype`` columns, "numpy" to
+            convert them (text as Python objects)
+
+    Returns:
+        Matching rows, in file order
+    """
+    con = connection or duckdb.connect(database=":memory:")
+    try:
+        con.execute(_lookup_sql(keys, columns), [filepath, *keys.values()])
+        return fetch_df(con, dtype_backend)
+    finally:
+        if connection is None:
+            con.close()
+
+
+class _CountingFileOpener(LocalFileOpener):
+    def read(self, *args, **kwargs) -> bytes:
+        data = super().read(*args, **kwargs)
+        self.fs.bytes_read += len(data)
+        return data
+
+
+class _CountingFileSystem(LocalFileSystem):
+    """Local file system counting the bytes DuckDB reads through it."""
+
+    protocol = "lookupcount"
+    root_marker = "/"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_read = 0
+
+    def _open(self, path, mode="rb", block_size=None, **kwargs):
+        return _CountingFileOpener(self._strip_protocol(path), mode, fs=self, **kwargs)
+
+
+def lookup_bytes_read(filepath: str, keys: Mapping[str, Any]) -> int:
+    """
+    Run a lookup with ``EXPLAIN ANALYZE`` and return the bytes it read from the file.
+
+    Row groups skipped by their statistics or bloom filters are not read, so
+    comparing this with the file size shows how much a lookup prunes. The
+    file is read through a counting file system on a new connection: DuckDB's
+    own ``total_bytes_read`` metric leaves out most column data reads.
+
+    Args:
+        filepath: Local Parquet file to read
+        keys: Column name to value, as for ``lookup_rows``
+
+    Returns:
+        Bytes read from the file, metadata and bloom filters included
+    """
+    fs = _CountingFileSystem(skip_instance_cache=True)
+    con = duckdb.connect(database=":memory:")
+    try:
+        con.register_filesystem(fs)
+        con.execute(
+            f"EXPLAIN ANALYZE {_lookup_sql(keys)}",
+            [f"{fs.protocol}://{Path(filepath).resolve()}", *keys.values()],
+        )
+    finally:
+        con.close()
+    return fs.bytes_read
+
+
+def _lookup_sql(keys: Mapping[str, Any], columns: Optional[Sequence[str]] = None) -> str:
+    if not keys:
+        raise ValueError("lookup_rows needs at least one key column")
+    projection = ", ".join(quote_identifier(column) for column in columns) if columns else "*"
+    condition = " AND ".join(f"{quote_identifier(column)} = ?" for column in keys)
+    return f"SELECT {projection} FROM read_parquet(?) WHERE {condition}"
+
+
+def prospects_for_vaga(
+    vaga_id: Union[str, int],
+    filepath: Optional[str] = None,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+    table: str = PRIMARY_PROSPECTS,
+    dtype_backend: str = "pyarrow",
+) -> pd.DataFrame:
+    """
+    Return the rows of a vaga from ``primary_prospects`` or ``primary_core``.
+
+    Args:
+        vaga_id: Vaga id
+        filepath: Parquet file of ``table``; its catalog file by default
+        connection: DuckDB connection to run the lookup on
+        table: ``PRIMARY_PROSPECTS`` or ``PRIMARY_CORE``
+        dtype_backend: Column types of the result, as for ``lookup_rows``
+
+    Returns:
+        Every prospect of the vaga
+    """
+    _check_table(table)
+    filepath = filepath or table_filepath(table)
+    return lookup_rows(
+        filepath, {VAGA_COLUMNS[table]: int(vaga_id)},
+        connection=connection, dtype_backend=dtype_backend,
+    )
+
+
+def candidate_history(
+    codigo: Union[str, int],
+    filepath: Optional[str] = None,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+    table: str = PRIMARY_PROSPECTS,
+    dtype_backend: str = "pyarrow",
+) -> pd.DataFrame:
+    """
+    Return the applications of a candidate from ``primary_prospects`` or ``primary_core``.
+
+    Args:
+        codigo: Candidate code
+        filepath: Parquet file of ``table``; its catalog file by default
+        connection: DuckDB connection to run the lookup on
+        table: ``PRIMARY_PROSPECTS`` or ``PRIMARY_CORE``
+        dtype_backend: Column types of the result, as for ``lookup_rows``
+
+    Returns:
+        Every application of the candidate
+    """
+    _check_table(table)
+    filepath = filepath or table_filepath(table)
+    return lookup_rows(
+        filepath, {"codigo": int(codigo)}, connection=connection, dtype_backend=dtype_backend
+    )
+
+
+def _check_table(table: str) -> None:
+    if table not in VAGA_COLUMNS:
+        raise ValueError(f"Unknown lookup table {table!r}, expected one of {list(VAGA_COLUMNS)}")
@@ -9,4 +9,5 @@ SELECT
     nivel_espanhol AS nivel_espanhol_candidato,
     conhecimentos_tecnicos,
     cv_pt
-FROM read_parquet('data/02_intermediate/applicants.parquet')
+FROM {{ silver_applicants }}
+ORDER BY prospect_codigo
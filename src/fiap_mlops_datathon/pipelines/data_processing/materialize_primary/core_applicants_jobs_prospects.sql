@@ -1,6 +1,6 @@
 SELECT
     -- Informações da vaga
-    v.vaga_id::INT AS vaga_id,
+    v.vaga_id,
     v.titulo_vaga,
     v.cliente,
     CASE WHEN v.vaga_sap ILIKE 'sim' THEN 1 ELSE 0 END AS vaga_sap,
@@ -15,8 +15,8 @@ SELECT
     v.cidade,
 
     -- Informações da prospecção
-    p.prospect_id::INT AS prospect_id,
-    p.codigo::INT AS codigo,
+    p.prospect_id,
+    p.codigo,
     p.nome_candidato,
     p.situacao_candidado,
     p.data_candidatura,
@@ -26,7 +26,7 @@ SELECT
 
 
     -- Informações do candidato
-    a.prospect_codigo::INT AS prospect_codigo,
+    a.prospect_codigo,
     a.nome,
     a.email,
     a.area_atuacao,
@@ -44,8 +44,10 @@ SELECT
         ELSE 0
     END AS target_contratado
 
-FROM read_parquet('data/03_primary/vagas.parquet') v
-LEFT JOIN read_parquet('data/03_primary/prospects.parquet') p
+FROM {{ primary_vagas }} v
+LEFT JOIN {{ primary_prospects }} p
     ON v.vaga_id = p.prospect_id
-LEFT JOIN read_parquet('data/03_primary/applicants.parquet') a
+LEFT JOIN {{ primary_applicants }} a
     ON p.codigo = a.prospect_codigo
+
+ORDER BY vaga_id, codigo
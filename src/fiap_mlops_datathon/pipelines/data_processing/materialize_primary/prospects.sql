@@ -7,4 +7,5 @@ SELECT
     ultima_atualizacao,
     comentario,
     recrutador
-FROM read_parquet('data/02_intermediate/prospects.parquet')
+FROM {{ silver_prospects }}
+ORDER BY prospect_id, codigo
@@ -0,0 +1,7 @@
+SELECT
+    p.*,
+    v.cliente,
+    strftime(p.data_candidatura, '%Y-%m') AS ano_mes
+FROM {{ primary_prospects }} p
+LEFT JOIN {{ primary_vagas }} v
+    ON v.vaga_id = p.prospect_id
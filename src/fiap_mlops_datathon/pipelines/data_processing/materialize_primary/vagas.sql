@@ -12,4 +12,5 @@ SELECT
     competencias,
     estado,
     cidade
-FROM read_parquet('data/02_intermediate/vagas.parquet')
+FROM {{ silver_vagas }}
+ORDER BY vaga_id
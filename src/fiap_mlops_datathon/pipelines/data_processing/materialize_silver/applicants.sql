@@ -0,0 +1,11 @@
+-- Applicants with typed columns: integer key, birth date as DATE and the
+-- dd-mm-yyyy hh:mm:ss update time parsed to TIMESTAMP. Rows whose id is not
+-- an integer are left out, quarantined by quarantine_malformed_keys.
+SELECT * REPLACE (
+    TRY_CAST(id AS INTEGER) AS id,
+    data_nascimento::DATE AS data_nascimento,
+    try_strptime(data_atualizacao::VARCHAR, '%d-%m-%Y %H:%M:%S') AS data_atualizacao
+)
+FROM {{ intermediate_applicants }}
+WHERE TRY_CAST(id AS INTEGER) IS NOT NULL
+ORDER BY id
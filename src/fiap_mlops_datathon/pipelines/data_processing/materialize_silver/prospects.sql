@@ -0,0 +1,19 @@
+-- Prospects with integer keys and DATE columns, one row per (vaga, codigo):
+-- a candidate prospected twice for the same vaga keeps the latest update.
+-- Remaining ties are broken on the whole record so the pick is deterministic.
+-- Rows whose keys are not integers are left out, quarantined by
+-- quarantine_malformed_keys.
+SELECT * REPLACE (
+    TRY_CAST(prospect_id AS INTEGER) AS prospect_id,
+    TRY_CAST(codigo AS INTEGER) AS codigo,
+    data_candidatura::DATE AS data_candidatura,
+    ultima_atualizacao::DATE AS ultima_atualizacao
+)
+FROM {{ intermediate_prospects }} p
+WHERE TRY_CAST(p.prospect_id AS INTEGER) IS NOT NULL
+    AND TRY_CAST(p.codigo AS INTEGER) IS NOT NULL
+QUALIFY row_number() OVER (
+    PARTITION BY p.prospect_id, p.codigo
+    ORDER BY p.ultima_atualizacao DESC NULLS LAST, p.data_candidatura DESC NULLS LAST, p::VARCHAR
+) = 1
+ORDER BY prospect_id, codigo
@@ -0,0 +1,11 @@
+-- Job positions with typed columns: integer key and the dd-mm-yyyy dates
+-- parsed to DATE (placeholders such as 00-00-0000 become NULL). Rows whose id
+-- is not an integer are left out, quarantined by quarantine_malformed_keys.
+SELECT * REPLACE (
+    TRY_CAST(id AS INTEGER) AS id,
+    try_strptime(data_requicisao::VARCHAR, '%d-%m-%Y')::DATE AS data_requicisao,
+    try_strptime(limite_contratacao::VARCHAR, '%d-%m-%Y')::DATE AS limite_contratacao
+)
+FROM {{ intermediate_vagas }}
+WHERE TRY_CAST(id AS INTEGER) IS NOT NULL
+ORDER BY id
@@ -3,37 +3,150 @@ Nodes for SQL to Parquet processing.
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
+
+from fiap_mlops_datathon import duckdb_session, query_profiles, sql_cache
+from fiap_mlops_datathon.datasets import CachedParquet, ParquetChunks
+from fiap_mlops_datathon.duckdb_session import quote_identifier
+from fiap_mlops_datathon.pipelines.json_processing.dead_letter import (
+    DEAD_LETTER_COLUMNS,
+    log_dead_letter_summary,
+)
+
+from .categoricals import (
+    DTYPE_BACKENDS,
+    arrow_to_pandas,
+    categorical_memory_report,
+    dictionary_columns,
+    dictionary_memory_report,
+    encode_dictionary_columns,
+    log_categorical_memory,
+)
+from .incremental_core import (
+    affected_vagas_query,
+    changed_build,
+    core_manifest,
+    incremental_core_query,
+    record_manifest,
+    watermark_query,
+)
+from .partitions import DEFAULT_MIN_PARTITION_ROWS, partition_prospects
+from .sql_templates import referenced_datasets, render_sql
 
 logger = logging.getLogger(__name__)
 
+# "arrow" fetches query results in Python, "duckdb" writes them with COPY TO
+SQL_WRITERS = ("arrow", "duckdb")
+
+# Status columns, always dictionary encoded, even when rebuilt by the SQL
+PROSPECT_STATUS_COLUMNS = ("situacao_candidado",)
+
+# Integer keys of the silver tables, by entity; the silver SQL leaves out the
+# rows whose keys don't cast and quarantine_malformed_keys quarantines them
+SILVER_KEYS = {
+    "vagas": ("id",),
+    "prospects": ("prospect_id", "codigo"),
+    "applicants": ("id",),
+}
+MALFORMED_KEY_ERROR_CODE = "invalid_key"
+
 
 def process_sql_to_parquet(
-    sql_query: str, intermediate_data: Optional[pd.DataFrame] = None
-) -> pd.DataFrame:
+    sql_query: str,
+    intermediate_data: Optional[pd.DataFrame] = None,
+    chunk_size: Optional[int] = None,
+    query_name: str = "SQL query",
+    writer: str = "arrow",
+    dtype_backend: str = "numpy",
+    inputs: Optional[Mapping[str, Optional[pd.DataFrame]]] = None,
+    enum_columns: Sequence[str] = (),
+) -> Union[pd.DataFrame, ParquetChunks, duckdb.DuckDBPyRelation]:
     """
     Process SQL query and return DataFrame.
 
+    ``{{ dataset_name }}`` references in the query are resolved by
+    ``render_sql``: datasets in ``inputs`` are registered in DuckDB under
+    their name, the others are read from their catalog filepath.
+
+    Low-cardinality text columns of the result are dictionary encoded
+    (``category`` in pandas, dictionary arrays in Arrow and Parquet): the
+    columns that are categorical in the inputs and the ``enum_columns``, see
+    ``categoricals``.
+    With ``writer="duckdb"`` the query is not run here: the relation is
+    returned and ``DuckDBParquetDataset`` writes it with ``COPY ... TO``, so
+    the result never enters Python memory. DuckDB picks its own Parquet
+    dictionary encoding, but pandas then loads text columns as object.
+
+    With ``dtype_backend="pyarrow"`` the result is fetched as an Arrow table
+    and wrapped in ``pd.ArrowDtype`` columns without converting it: strings
+    stay Arrow strings instead of becoming Python objects, and saving the
+    DataFrame or registering it in DuckDB again reads the same Arrow buffers.
+    Dictionary columns still become ``category`` (only their dictionary is
+    converted), which every Parquet reader maps back to dictionary arrays.
+
     Args:
         sql_query: SQL query to execute
         intermediate_data: Optional DataFrame for queries that reference existing data
+        chunk_size: If set, the query runs when the result is saved and is
+            streamed in Arrow record batches of ``chunk_size`` rows instead of
+            being fetched as one DataFrame
+        query_name: Name of the query in the timing log and of its profile
+        writer: "arrow" to fetch the result in Python, "duckdb" to leave the
+            write to DuckDB (``chunk_size`` is then the row group size)
+        dtype_backend: "numpy" or "pyarrow", the column types of the returned
+            DataFrame (streamed chunks are always Arrow record batches)
+        inputs: DataFrames of the datasets the query references, by dataset name
+        enum_columns: Text columns always dictionary encoded, whatever their
+            cardinality (ignored by the ``duckdb`` writer)
 
     Returns:
-        Processed DataFrame
+        Processed DataFrame, ``ParquetChunks`` when ``chunk_size`` is set, or
+        a DuckDB relation (wrapped in ``ParquetChunks`` with ``chunk_size``)
+        with the ``duckdb`` writer
     """
+    if writer not in SQL_WRITERS:
+        raise ValueError(f"Unknown SQL writer {writer!r}, expected one of {SQL_WRITERS}")
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(
+            f"Unknown dtype backend {dtype_backend!r}, expected one of {DTYPE_BACKENDS}"
+        )
+    if writer == "duckdb":
+        return _sql_relation(sql_query, intermediate_data, chunk_size, query_name, inputs)
+    if chunk_size is not None:
+        return ParquetChunks(
+            lambda: _stream_sql(
+                sql_query, intermediate_data, chunk_size, query_name, inputs, enum_columns
+            ),
+            chunk_size,
+        )
+
     con = None
     try:
-        # Create a connection and register intermediate data if provided
-        con = duckdb.connect(database=":memory:")
-        if intermediate_data is not None:
-            con.register("intermediate_data", intermediate_data)
+        # Take a cursor on the shared database and register the input data
+        con = duckdb_session.cursor()
+        query = _register_inputs(con, sql_query, intermediate_data, inputs)
+        sources = _input_frames(intermediate_data, inputs)
+        encoded = dictionary_columns(con, query, sources, enum_columns)
 
         # Execute the query
-        df = con.execute(sql_query).df()
+        with duckdb_session.timed_query(query_name), query_profiles.profiled(con, query_name):
+            result = con.execute(query)
+            if dtype_backend == "pyarrow":
+                table = encode_dictionary_columns(result.to_arrow_table(), encoded)
+                df = arrow_to_pandas(table)
+            else:
+                df = result.df()
+                for column in encoded:
+                    df[column] = df[column].astype("category")
         logger.info(f"Successfully processed SQL query, resulting in {len(df)} rows")
+        if dtype_backend == "pyarrow":
+            logger.info(f"Arrow-backed result: {table.nbytes / 1024**2:.2f} MB")
+
+        log_categorical_memory(categorical_memory_report(df), "object")
         return df
 
     except Exception as e:
@@ -44,44 +157,412 @@ def process_sql_to_parquet(
             con.close()
 
 
-def process_vagas_primary(
-    sql_query: str, intermediate_vagas: pd.DataFrame
+def _register_inputs(
+    con: duckdb.DuckDBPyConnection,
+    sql_query: str,
+    intermediate_data: Optional[pd.DataFrame],
+    inputs: Optional[Mapping[str, Optional[pd.DataFrame]]],
+) -> str:
+    """Register the input DataFrames on ``con`` and return the rendered query."""
+    if intermediate_data is not None:
+        con.register("intermediate_data", intermediate_data)
+    # Missing inputs (e.g. an optional dataset without a file) are not registered
+    registered = {name: data for name, data in (inputs or {}).items() if data is not None}
+    for name, data in registered.items():
+        con.register(name, data)
+    return render_sql(sql_query, relations=registered)
+
+
+def _input_frames(
+    intermediate_data: Optional[pd.DataFrame],
+    inputs: Optional[Mapping[str, Optional[pd.DataFrame]]],
+) -> List[pd.DataFrame]:
+    """The input DataFrames of a query, whose categorical columns it may rebuild."""
+    frames = [data for data in (inputs or {}).values() if data is not None]
+    return frames if intermediate_data is None else [intermediate_data, *frames]
+
+
+def _sql_relation(
+    sql_query: str,
+    intermediate_data: Optional[pd.DataFrame],
+    chunk_size: Optional[int],
+    query_name: str,
+    inputs: Optional[Mapping[str, Optional[pd.DataFrame]]] = None,
+) -> Union[duckdb.DuckDBPyRelation, ParquetChunks]:
+    """Return the lazy relation of a SQL query, run when its dataset copies it to Parquet."""
+    # The cursor stays open with the relation; the shared database is closed after the run
+    con = duckdb_session.cursor()
+    relation = con.sql(_register_inputs(con, sql_query, intermediate_data, inputs))
+    logger.info(f"{query_name} will be written by DuckDB with COPY TO")
+    query_profiles.skipped(query_name, "written by DuckDB with COPY TO when its dataset is saved")
+    if chunk_size is None:
+        return relation
+    return ParquetChunks.from_relation(relation, chunk_size)
+
+
+def _stream_sql(
+    sql_query: str,
+    intermediate_data: Optional[pd.DataFrame],
+    chunk_size: int,
+    query_name: str = "SQL query",
+    inputs: Optional[Mapping[str, Optional[pd.DataFrame]]] = None,
+    enum_columns: Sequence[str] = (),
+) -> Iterator[Union[pa.RecordBatch, pa.Table]]:
+    """Execute a SQL query and yield its result ``chunk_size`` rows at a time."""
+    con = None
+    try:
+        con = duckdb_session.cursor()
+        sql_query = _register_inputs(con, sql_query, intermediate_data, inputs)
+        sources = _input_frames(intermediate_data, inputs)
+        encoded = dictionary_columns(con, sql_query, sources, enum_columns)
+
+        # Timed from the first to the last batch, including the Parquet writes in between
+        memory: Dict[str, Tuple[float, float]] = {}
+        description = f"{query_name} (streamed to Parquet)"
+        with duckdb_session.timed_query(description), query_profiles.profiled(con, query_name):
+            reader = con.execute(sql_query).to_arrow_reader(chunk_size)
+            rows = 0
+            for batch in reader:
+                batch = encode_dictionary_columns(batch, encoded)
+                for column, (plain_mb, encoded_mb) in dictionary_memory_report(batch).items():
+                    total = memory.get(column, (0.0, 0.0))
+                    memory[column] = (total[0] + plain_mb, total[1] + encoded_mb)
+                rows += batch.num_rows
+                yield batch
+            if rows == 0:
+                yield encode_dictionary_columns(reader.schema.empty_table(), encoded)
+        logger.info(f"Successfully processed SQL query, resulting in {rows} rows")
+        log_categorical_memory(memory, "plain Arrow strings")
+
+    except Exception as e:
+        logger.error(f"Error processing SQL: {str(e)}")
+        raise
+    finally:
+        if con is not None:
+            con.close()
+
+
+TableOutput = Union[pd.DataFrame, ParquetChunks, duckdb.DuckDBPyRelation, CachedParquet]
+
+
+def _process_sql_table(
+    sql_query: str,
+    inputs: Mapping[str, Optional[pd.DataFrame]],
+    query_name: str,
+    processing: Optional[Dict[str, Any]] = None,
+    enum_columns: Sequence[str] = (),
+) -> TableOutput:
+    """
+    Run one silver or primary layer SQL query with the ``processing`` parameters.
+
+    When the SQL cache is enabled and neither the query, the settings nor
+    the input files changed since a cached run, the query is not run and
+    the cached output is returned instead.
+
+    Args:
+        sql_query: SQL template of the table
+        inputs: DataFrames of the datasets the template references, by dataset name
+        query_name: Name of the output dataset, also used in the logs
+        processing: ``processing`` parameters; with ``chunk_size`` the table
+            is streamed to Parquet ``chunk_size`` rows per row group, with
+            ``primary_writer: duckdb`` DuckDB writes it itself, and
+            ``dtype_backend`` sets the column types of a fetched DataFrame
+        enum_columns: Text columns always dictionary encoded
+
+    Returns:
+        Processed DataFrame, ``ParquetChunks``, DuckDB relation or ``CachedParquet``
+    """
+    processing = processing or {}
+    chunk_size = processing.get("chunk_size")
+    options = {
+        "chunk_size": None if chunk_size is None else int(chunk_size),
+        "writer": processing.get("primary_writer", "arrow"),
+        "dtype_backend": processing.get("dtype_backend", "numpy"),
+        "enum_columns": list(enum_columns),
+    }
+    key = sql_cache.cache_key(
+        sql_query, [*inputs, *referenced_datasets(sql_query)], query_name, options
+    )
+    cached = sql_cache.lookup(key)
+    if cached is not None:
+        logger.info(f"{query_name} is unchanged, reusing cached {cached.path.name}")
+        query_profiles.skipped(query_name, "reused from the SQL cache")
+        return cached
+
+    output = process_sql_to_parquet(sql_query, query_name=query_name, inputs=inputs, **options)
+    sql_cache.expect(query_name, key)
+    return output
+
+
+def process_vagas_silver(
+    sql_query: str,
+    intermediate_vagas: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
+    """Type job positions data into the silver layer."""
+    return _process_sql_table(
+        sql_query, {"intermediate_vagas": intermediate_vagas}, "silver_vagas", processing
+    )
+
+
+def process_prospects_silver(
+    sql_query: str,
+    intermediate_prospects: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
+    """Type and deduplicate prospects data into the silver layer."""
+    return _process_sql_table(
+        sql_query,
+        {"intermediate_prospects": intermediate_prospects},
+        "silver_prospects",
+        processing,
+        enum_columns=PROSPECT_STATUS_COLUMNS,
+    )
+
+
+def process_applicants_silver(
+    sql_query: str,
+    intermediate_applicants: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
+    """Type applicants data into the silver layer."""
+    return _process_sql_table(
+        sql_query, {"intermediate_applicants": intermediate_applicants}, "silver_applicants", processing
+    )
+
+
+def _malformed_keys_query(entity: str, dataset: str, keys: Sequence[str]) -> str:
+    """Return the SQL template of the dead letters of the rows whose keys don't cast."""
+    columns = [quote_identifier(key) for key in keys]
+    record_id = " || '/' || ".join(f"coalesce({column}::VARCHAR, '')" for column in columns)
+    errors = ", ".join(
+        f"CASE WHEN {column} IS NULL THEN '{key} is missing' "
+        f"WHEN TRY_CAST({column} AS INTEGER) IS NULL "
+        f"THEN '{key} is not an integer: ' || {column}::VARCHAR END"
+        for key, column in zip(keys, columns)
+    )
+    malformed = " OR ".join(f"TRY_CAST({column} AS INTEGER) IS NULL" for column in columns)
+    return f"""SELECT
+    '{entity}' AS entity,
+    {record_id} AS record_id,
+    '{MALFORMED_KEY_ERROR_CODE}' AS error_code,
+    concat_ws('; ', {errors}) AS error,
+    to_json(t)::VARCHAR AS payload
+FROM {{{{ {dataset} }}}} t
+WHERE {malformed}"""
+
+
+def quarantine_malformed_keys(
+    intermediate_vagas: pd.DataFrame,
+    intermediate_prospects: pd.DataFrame,
+    intermediate_applicants: pd.DataFrame,
 ) -> pd.DataFrame:
+    """
+    Collect the intermediate rows the silver layer leaves out for their keys.
+
+    Args:
+        intermediate_vagas: Intermediate job positions table
+        intermediate_prospects: Intermediate prospects table
+        intermediate_applicants: Intermediate applicants table
+
+    Returns:
+        Dead letters with ``DEAD_LETTER_COLUMNS``: the row as JSON payload and
+        the ``invalid_key`` error code
+    """
+    inputs = {
+        "intermediate_vagas": intermediate_vagas,
+        "intermediate_prospects": intermediate_prospects,
+        "intermediate_applicants": intermediate_applicants,
+    }
+    sql_query = "\nUNION ALL\n".join(
+        _malformed_keys_query(entity, f"intermediate_{entity}", keys)
+        for entity, keys in SILVER_KEYS.items()
+    )
+    con = duckdb_session.cursor()
+    try:
+        dead_letters = con.execute(_register_inputs(con, sql_query, None, inputs)).df()
+    finally:
+        con.close()
+    dead_letters = dead_letters[DEAD_LETTER_COLUMNS]
+    log_dead_letter_summary(dead_letters)
+    return dead_letters
+
+
+def process_vagas_primary(
+    sql_query: str,
+    silver_vagas: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
     """Process job positions data to primary layer."""
-    return process_sql_to_parquet(sql_query, intermediate_vagas)
+    return _process_sql_table(
+        sql_query, {"silver_vagas": silver_vagas}, "primary_vagas", processing
+    )
 
 
 def process_prospects_primary(
-    sql_query: str, intermediate_prospects: pd.DataFrame
-) -> pd.DataFrame:
+    sql_query: str,
+    silver_prospects: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
     """Process prospects data to primary layer."""
-    return process_sql_to_parquet(sql_query, intermediate_prospects)
+    return _process_sql_table(
+        sql_query,
+        {"silver_prospects": silver_prospects},
+        "primary_prospects",
+        processing,
+        enum_columns=PROSPECT_STATUS_COLUMNS,
+    )
 
 
-def process_primary_tables(
-    prospects_sql: str,
-    vagas_sql: str,
-    intermediate_prospects: pd.DataFrame,
-    intermediate_vagas: pd.DataFrame,
-) -> Dict[str, pd.DataFrame]:
+def process_applicants_primary(
+    sql_query: str,
+    silver_applicants: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+) -> TableOutput:
+    """Process applicants data to primary layer."""
+    return _process_sql_table(
+        sql_query, {"silver_applicants": silver_applicants}, "primary_applicants", processing
+    )
+
+
+def process_core_primary(
+    sql_query: str,
+    primary_prospects: pd.DataFrame,
+    primary_vagas: pd.DataFrame,
+    primary_applicants: pd.DataFrame,
+    processing: Optional[Dict[str, Any]] = None,
+    previous_primary_core: Optional[pd.DataFrame] = None,
+    json_ingestion_manifest: Optional[pd.DataFrame] = None,
+    previous_core_manifest: Optional[pd.DataFrame] = None,
+) -> Dict[str, Union[TableOutput, pd.DataFrame]]:
     """
-    Process all individual tables to primary layer in a single node.
+    Join job positions, prospects and applicants into the core primary table.
+
+    With ``processing.incremental``, only the vagas changed since the previous
+    core are recomputed and merged into it (see ``incremental_core``). The
+    whole join runs again on the first run, with ``full_rebuild``, or when
+    there is no ingestion manifest to detect changes with (e.g. with the
+    DuckDB JSON engine), when the previous core was built by another version
+    of the query or of the ingestion manifest, and when it has other columns
+    or column types than the query returns.
 
     Args:
-        prospects_sql: SQL query for prospects
-        vagas_sql: SQL query for job positions
-        intermediate_prospects: Intermediate prospects DataFrame
-        intermediate_vagas: Intermediate job positions DataFrame
+        sql_query: SQL template of the core join
+        primary_prospects: Primary prospects table
+        primary_vagas: Primary job positions table
+        primary_applicants: Primary applicants table
+        processing: ``processing`` parameters (``incremental``, ``full_rebuild``
+            and the output settings of ``_process_sql_table``)
+        previous_primary_core: Core written by the last run, if any
+        json_ingestion_manifest: Record hashes of the current intermediate tables
+        previous_core_manifest: Record hashes and build entries of the previous core
 
     Returns:
-        Dictionary containing processed DataFrames
+        Dictionary with the core table and the manifest it was built from
     """
-    logger.info("Processing all tables to primary layer...")
+    processing = processing or {}
+    inputs = {
+        "primary_prospects": primary_prospects,
+        "primary_vagas": primary_vagas,
+        "primary_applicants": primary_applicants,
+    }
+    incremental = (
+        processing.get("incremental", False)
+        and not processing.get("full_rebuild", False)
+        and previous_primary_core is not None
+        and not previous_primary_core.empty
+        and json_ingestion_manifest is not None
+        and not json_ingestion_manifest.empty
+        and previous_core_manifest is not None
+        and not previous_core_manifest.empty
+    )
+
+    rendered_sql = render_sql(sql_query, relations=inputs)
+    changed = changed_build(previous_core_manifest, rendered_sql) if incremental else []
+    if changed:
+        logger.info(
+            f"The previous core was built with another {', '.join(changed)}, "
+            f"rebuilding the whole core join"
+        )
+        incremental = False
+
+    if incremental:
+        incremental_inputs = {
+            **inputs,
+            "previous_primary_core": previous_primary_core,
+            "json_ingestion_manifest": json_ingestion_manifest,
+            "previous_primary_core_manifest": record_manifest(previous_core_manifest),
+        }
+        con = duckdb_session.cursor()
+        try:
+            # A core written before the SQL or its input types changed can't be merged
+            same_schema = _column_types(
+                con, _register_inputs(con, sql_query, None, incremental_inputs)
+            ) == _column_types(
+                con, _register_inputs(con, "SELECT * FROM {{ previous_primary_core }}", None, incremental_inputs)
+            )
+            if same_schema:
+                watermark = con.execute(
+                    _register_inputs(con, watermark_query(), None, incremental_inputs)
+                ).fetchone()[0]
+                affected = con.execute(
+                    f"SELECT count(*) FROM ({_register_inputs(con, affected_vagas_query(), None, incremental_inputs)})"
+                ).fetchone()[0]
+        finally:
+            con.close()
+        if same_schema:
+            logger.info(
+                f"Incremental core: recomputing {affected} vagas changed since {watermark} "
+                f"or in the ingestion manifest"
+            )
+            inputs = incremental_inputs
+            sql_query = incremental_core_query(sql_query)
+        else:
+            logger.info("The previous core has different columns, rebuilding the whole core join")
+    elif not changed:
+        logger.info("Rebuilding the whole core join")
+
+    # The core is listed first: Kedro saves outputs in order, and the manifest
+    # must only be saved once the core it describes is written
+    return {
+        "primary_core": _process_sql_table(sql_query, inputs, "primary_core", processing),
+        "primary_core_manifest": core_manifest(json_ingestion_manifest, rendered_sql),
+    }
+
+
+def _column_types(con: duckdb.DuckDBPyConnection, sql_query: str) -> List[Tuple[str, str]]:
+    """Return the columns of a query and their types, categories (ENUM) as VARCHAR."""
+    return [
+        (name, "VARCHAR" if column_type.startswith("ENUM") else column_type)
+        for name, column_type, *_ in con.execute(f"DESCRIBE {sql_query}").fetchall()
+    ]
 
-    primary_prospects = process_sql_to_parquet(prospects_sql, intermediate_prospects)
-    logger.info(f"Processed prospects: {len(primary_prospects)} rows")
 
-    primary_vagas = process_sql_to_parquet(vagas_sql, intermediate_vagas)
-    logger.info(f"Processed job positions: {len(primary_vagas)} rows")
+def process_prospects_partitioned(
+    sql_query: str,
+    primary_prospects: pd.DataFrame,
+    primary_vagas: pd.DataFrame,
+    partitioning: Optional[Dict[str, Any]] = None,
+) -> duckdb.DuckDBPyRelation:
+    """
+    Build the Hive-partitioned prospects layout (``cliente=.../periodo=...``).
+
+    Args:
+        sql_query: SQL query returning the prospects with ``cliente`` and ``ano_mes``
+        primary_prospects: Primary prospects table
+        primary_vagas: Primary job positions table
+        partitioning: ``partitioning`` parameters (``min_partition_rows``)
 
-    return {"primary_prospects": primary_prospects, "primary_vagas": primary_vagas}
+    Returns:
+        DuckDB relation, written partitioned by ``DuckDBParquetDataset``
+    """
+    min_partition_rows = int(
+        (partitioning or {}).get("min_partition_rows", DEFAULT_MIN_PARTITION_ROWS)
+    )
+    con = duckdb_session.cursor()
+    inputs = {"primary_prospects": primary_prospects, "primary_vagas": primary_vagas}
+    sql_query = _register_inputs(con, sql_query, None, inputs)
+    query_profiles.skipped(
+        "primary_prospects_partitioned", "written by DuckDB with COPY TO when its dataset is saved"
+    )
+    return partition_prospects(sql_query, min_partition_rows, connection=con)
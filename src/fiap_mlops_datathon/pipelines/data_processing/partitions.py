@@ -0,0 +1,318 @@
+"""
+Hive-partitioned layout of the primary prospects.
+
+Prospects are written to ``cliente=<cliente>/periodo=<yyyy-mm>/`` directories
+so that DuckDB only opens the files of the clients and months a query asks
+for. (cliente, month) partitions with fewer than ``min_partition_rows`` rows
+are compacted into one yearly partition per client (``periodo=<yyyy>``), so
+sparse clients do not produce a tiny file per month.
+
+``ano_mes`` stays a column of the files with its monthly value, so a filter
+on ``ano_mes`` returns the same rows whether or not its month was compacted.
+To prune partitions, a date window has to keep the monthly partitions of the
+window and the yearly partitions of its years; ``date_window_predicate``
+builds that ``periodo`` filter together with the exact ``data_candidatura`` one.
+SQL templates reading the layout as ``{{ primary_prospects_partitioned }}``
+do not have to: ``prune_partitioned_scans`` derives the ``periodo`` filter
+from the ``ano_mes`` and ``data_candidatura`` filters of the query itself.
+"""
+
+import datetime
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ("cliente", "periodo")
+
+# Columns whose filters bound the months, hence the ``periodo`` partitions, a query reads
+MONTH_COLUMNS = ("ano_mes", "data_candidatura")
+
+MONTH_VALUE = re.compile(r"^\d{4}-\d{2}")
+
+DEFAULT_MIN_PARTITION_ROWS = 1000
+
+DateLike = Union[str, datetime.date]
+
+
+def compacted_partitions_query(sql_query: str, min_partition_rows: int) -> str:
+    """
+    Wrap a query returning ``cliente`` and ``ano_mes`` with the ``periodo``
+    partition of each row: its month, or its year when the month is small.
+
+    Args:
+        sql_query: Query with ``cliente`` and ``ano_mes`` (``yyyy-mm``) columns
+        min_partition_rows: Monthly partitions below this row count are compacted
+
+    Returns:
+        SQL query returning the same rows and their ``periodo``
+    """
+    return f"""WITH rows AS ({sql_query}),
+partition_rows AS (
+    SELECT cliente, ano_mes, count(*) AS n_rows
+    FROM rows
+    GROUP BY ALL
+)
+SELECT
+    rows.*,
+    CASE WHEN partition_rows.n_rows < {int(min_partition_rows)}
+        THEN left(rows.ano_mes, 4) ELSE rows.ano_mes END AS periodo
+FROM rows
+JOIN partition_rows
+    ON rows.cliente IS NOT DISTINCT FROM partition_rows.cliente
+    AND rows.ano_mes IS NOT DISTINCT FROM partition_rows.ano_mes"""
+
+
+def read_partitioned_sql(path: str) -> str:
+    """
+    Return the ``read_parquet`` call reading a partitioned directory.
+
+    Partition values are always read as text: DuckDB would otherwise cast
+    them by guessing their type (e.g. yearly ``periodo`` partitions as integers).
+
+    Args:
+        path: Directory written with ``PARTITION_COLUMNS``
+
+    Returns:
+        SQL table expression for a FROM clause
+    """
+    hive_types = ", ".join(f"'{column}': VARCHAR" for column in PARTITION_COLUMNS)
+    path = path.rstrip("/").replace("'", "''")
+    return (
+        f"read_parquet('{path}/**/*.parquet', hive_partitioning = true, "
+        f"hive_types = {{{hive_types}}})"
+    )
+
+
+def date_window_predicate(
+    start: DateLike, end: DateLike, date_column: str = "data_candidatura"
+) -> str:
+    """
+    Build a filter on a date window that prunes ``periodo`` partitions.
+
+    Args:
+        start: First day of the window (inclusive)
+        end: Last day of the window (inclusive)
+        date_column: Date column the window applies to
+
+    Returns:
+        SQL predicate on ``periodo`` and ``date_column``
+    """
+    start_date = datetime.date.fromisoformat(str(start)[:10])
+    end_date = datetime.date.fromisoformat(str(end)[:10])
+    return (
+        f"{month_window_predicate(f'{start_date:%Y-%m}', f'{end_date:%Y-%m}')} "
+        f"AND {date_column} >= DATE '{start_date.isoformat()}' "
+        f"AND {date_column} < DATE '{end_date.isoformat()}' + INTERVAL 1 DAY"
+    )
+
+
+def month_window_predicate(first_month: Optional[str], last_month: Optional[str]) -> str:
+    """
+    Build the ``periodo`` filter keeping the partitions of a window of months.
+
+    A yearly partition sorts before the months of its year (``'2021' <
+    '2021-01'``), so ``periodo <= last_month`` keeps the yearly partitions up
+    to the last month's year, and the first month's year is kept explicitly.
+
+    Args:
+        first_month: First month (``yyyy-mm``) of the window; unbounded if None
+        last_month: Last month (``yyyy-mm``) of the window; unbounded if None
+
+    Returns:
+        SQL predicate on ``periodo``
+    """
+    predicates = []
+    if first_month is not None:
+        predicates.append(f"(periodo >= '{first_month}' OR periodo = '{first_month[:4]}')")
+    if last_month is not None:
+        predicates.append(f"periodo <= '{last_month}'")
+    return " AND ".join(predicates) or "true"
+
+
+def prune_partitioned_scans(sql_query: str, table_expressions: Iterable[str]) -> str:
+    """
+    Add the ``periodo`` filter to the partitioned scans of a query.
+
+    Every scan of ``sql_query`` written as one of ``table_expressions`` whose
+    SELECT filters ``ano_mes`` or ``data_candidatura`` with constants (``=``,
+    ``IN``, ``BETWEEN`` or a comparison, in the top-level AND of its WHERE) is
+    replaced by a subquery keeping the ``periodo`` partitions of those months,
+    so ``WHERE ano_mes = '2021-05'`` only opens the files that may hold May
+    2021. The query keeps its own filters and returns the same rows. Filters
+    under an OR, on joins, or on a joined scan without its alias do not prune.
+
+    Args:
+        sql_query: SQL query reading partitioned layouts
+        table_expressions: ``read_partitioned_sql`` expressions to prune
+
+    Returns:
+        SQL query with the prunable scans filtered on ``periodo``
+    """
+    table_expressions = [expression.encode() for expression in table_expressions]
+    serialized = duckdb.execute("SELECT json_serialize_sql(?)", [sql_query]).fetchone()[0]
+    statements = json.loads(serialized)
+    if statements.get("error"):
+        return sql_query
+
+    rewrites = {}
+    for select in _select_nodes(statements["statements"]):
+        qualified = select["from_table"]["type"] == "JOIN"
+        for location, alias in _partitioned_scans(select["from_table"]):
+            window = _month_window(select["where_clause"], alias, qualified)
+            if window != (None, None):
+                rewrites[location] = window
+
+    query = sql_query.encode()
+    for location in sorted(rewrites, reverse=True):
+        expression = next(
+            (table for table in table_expressions if query.startswith(table, location)), None
+        )
+        if expression is None:
+            continue
+        predicate = month_window_predicate(*rewrites[location]).encode()
+        query = (
+            query[:location]
+            + b"(SELECT * FROM " + expression + b" WHERE " + predicate + b")"
+            + query[location + len(expression):]
+        )
+    return query.decode()
+
+
+def _select_nodes(node: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every SELECT node of a serialized statement, subqueries and CTEs included."""
+    if isinstance(node, dict):
+        if node.get("type") == "SELECT_NODE":
+            yield node
+        for child in node.values():
+            yield from _select_nodes(child)
+    elif isinstance(node, list):
+        for child in node:
+            yield from _select_nodes(child)
+
+
+def _partitioned_scans(from_table: Dict[str, Any]) -> List[Tuple[int, str]]:
+    """Return the location and alias of the ``read_parquet`` scans of a FROM clause, joins included."""
+    if from_table["type"] == "JOIN":
+        return _partitioned_scans(from_table["left"]) + _partitioned_scans(from_table["right"])
+    if from_table["type"] == "TABLE_FUNCTION":
+        function = from_table["function"]
+        if function.get("function_name") == "read_parquet":
+            return [(function["query_location"], from_table["alias"])]
+    return []
+
+
+def _month_window(
+    where_clause: Optional[Dict[str, Any]], alias: str, qualified: bool
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Bound the months a WHERE clause keeps from its filters on ``MONTH_COLUMNS``.
+
+    Args:
+        where_clause: Serialized WHERE clause of a SELECT
+        alias: Alias of the scanned table
+        qualified: Whether column references must be qualified with ``alias``
+
+    Returns:
+        First and last month kept, None where unbounded
+    """
+    first_month, last_month = None, None
+    for predicate in _conjuncts(where_clause):
+        for bound, month in _month_bounds(predicate, alias, qualified):
+            if bound != "last":
+                first_month = month if first_month is None else max(first_month, month)
+            if bound != "first":
+                last_month = month if last_month is None else min(last_month, month)
+    return first_month, last_month
+
+
+def _conjuncts(expression: Optional[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield the predicates of the top-level AND of an expression."""
+    if expression is None:
+        return
+    if expression["type"] == "CONJUNCTION_AND":
+        for child in expression["children"]:
+            yield from _conjuncts(child)
+    else:
+        yield expression
+
+
+_COMPARISON_BOUNDS = {
+    "COMPARE_EQUAL": ("both", "both"),
+    "COMPARE_GREATERTHAN": ("first", "last"),
+    "COMPARE_GREATERTHANOREQUALTO": ("first", "last"),
+    "COMPARE_LESSTHAN": ("last", "first"),
+    "COMPARE_LESSTHANOREQUALTO": ("last", "first"),
+}
+
+
+def _month_bounds(
+    predicate: Dict[str, Any], alias: str, qualified: bool
+) -> List[Tuple[str, str]]:
+    """Return the (``first``/``last``/``both``, month) bounds a predicate sets, if any."""
+    def is_month_column(expression: Dict[str, Any]) -> bool:
+        if expression.get("class") != "COLUMN_REF":
+            return False
+        *qualifier, column = [name.lower() for name in expression["column_names"]]
+        if qualifier:
+            return qualifier == [alias.lower()] and column in MONTH_COLUMNS
+        return not qualified and column in MONTH_COLUMNS
+
+    predicate_type = predicate["type"]
+    if predicate_type in _COMPARISON_BOUNDS:
+        left, right = predicate["left"], predicate["right"]
+        column_left, column_right = _COMPARISON_BOUNDS[predicate_type]
+        if is_month_column(left) and _month(right):
+            return [(column_left, _month(right))]
+        if is_month_column(right) and _month(left):
+            return [(column_right, _month(left))]
+    elif predicate_type == "COMPARE_IN" and is_month_column(predicate["children"][0]):
+        months = [_month(value) for value in predicate["children"][1:]]
+        if all(months):
+            return [("first", min(months)), ("last", max(months))]
+    elif predicate_type == "COMPARE_BETWEEN" and is_month_column(predicate["input"]):
+        first_month, last_month = _month(predicate["lower"]), _month(predicate["upper"])
+        if first_month and last_month:
+            return [("first", first_month), ("last", last_month)]
+    return []
+
+
+def _month(expression: Dict[str, Any]) -> Optional[str]:
+    """Return the ``yyyy-mm`` month of a text or date constant, casts included."""
+    if expression.get("class") == "CAST":
+        expression = expression["child"]
+    if expression.get("class") != "CONSTANT" or expression["value"]["is_null"]:
+        return None
+    value = expression["value"]["value"]
+    if not isinstance(value, str) or not MONTH_VALUE.match(value):
+        return None
+    return value[:7]
+
+
+def partition_prospects(
+    sql_query: str,
+    min_partition_rows: int = DEFAULT_MIN_PARTITION_ROWS,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+) -> duckdb.DuckDBPyRelation:
+    """
+    Run the partitioned prospects query with small partitions compacted.
+
+    Args:
+        sql_query: Query returning the prospects with ``cliente`` and ``ano_mes``
+        min_partition_rows: Monthly partitions below this row count are compacted
+        connection: DuckDB connection to use; a new in-memory one by default
+
+    Returns:
+        DuckDB relation, written by ``DuckDBParquetDataset`` with ``partition_by``
+    """
+    con = connection or duckdb.connect(database=":memory:")
+    relation = con.sql(compacted_partitions_query(sql_query, min_partition_rows))
+    logger.info(
+        f"Partitioning prospects by {list(PARTITION_COLUMNS)}, compacting months "
+        f"with fewer than {min_partition_rows} rows"
+    )
+    return relation
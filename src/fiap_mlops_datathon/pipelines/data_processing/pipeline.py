@@ -5,40 +5,175 @@ This pipeline orchestrates the data processing flow.
 
 from kedro.pipeline import Pipeline, node, pipeline
 
-from .nodes import process_primary_tables
+from .nodes import (
+    process_applicants_primary,
+    process_applicants_silver,
+    process_core_primary,
+    process_prospects_partitioned,
+    process_prospects_primary,
+    process_prospects_silver,
+    process_vagas_primary,
+    process_vagas_silver,
+    quarantine_malformed_keys,
+)
+
+
+def create_silver_layer_pipeline(**kwargs) -> Pipeline:
+    """
+    Create the silver layer processing pipeline.
+
+    Every SQL file under ``materialize_silver`` types one intermediate table
+    (integer keys, DATE columns, categorical statuses) and writes it sorted by its
+    key; prospects are also deduplicated per (vaga, codigo). Rows whose keys
+    are not integers are left out and written to ``quarantine_keys``.
+
+    Returns:
+        Kedro pipeline for processing intermediate data to the silver layer
+    """
+    return pipeline([
+        node(
+            func=process_prospects_silver,
+            inputs={
+                "sql_query": "sql_silver_prospects",
+                "intermediate_prospects": "intermediate_prospects",
+                "processing": "params:processing"
+            },
+            outputs="silver_prospects",
+            name="process_prospects_silver_node",
+            tags=["silver", "tables"]
+        ),
+        node(
+            func=process_vagas_silver,
+            inputs={
+                "sql_query": "sql_silver_vagas",
+                "intermediate_vagas": "intermediate_vagas",
+                "processing": "params:processing"
+            },
+            outputs="silver_vagas",
+            name="process_vagas_silver_node",
+            tags=["silver", "tables"]
+        ),
+        node(
+            func=process_applicants_silver,
+            inputs={
+                "sql_query": "sql_silver_applicants",
+                "intermediate_applicants": "intermediate_applicants",
+                "processing": "params:processing"
+            },
+            outputs="silver_applicants",
+            name="process_applicants_silver_node",
+            tags=["silver", "tables"]
+        ),
+        node(
+            func=quarantine_malformed_keys,
+            inputs={
+                "intermediate_vagas": "intermediate_vagas",
+                "intermediate_prospects": "intermediate_prospects",
+                "intermediate_applicants": "intermediate_applicants"
+            },
+            outputs="quarantine_keys",
+            name="quarantine_malformed_keys_node",
+            tags=["silver", "quarantine"]
+        ),
+    ])
 
 
 def create_primary_layer_pipeline(**kwargs) -> Pipeline:
     """
     Create the primary layer processing pipeline.
 
+    Every SQL file under ``materialize_primary`` is its own node. The three
+    tables only depend on their silver inputs and run concurrently with
+    ``kedro run --runner ThreadRunner`` (the threads share one DuckDB
+    database); the core join waits for all three and, run incrementally,
+    only recomputes the vagas changed since its previous output.
+
     Returns:
         Kedro pipeline for processing data to primary layer
     """
     return pipeline([
-        # Process all individual tables in a single node
         node(
-            func=process_primary_tables,
+            func=process_prospects_primary,
             inputs={
-                "prospects_sql": "sql_prospects",
-                "vagas_sql": "sql_vagas",
-                "intermediate_prospects": "intermediate_prospects",
-                "intermediate_vagas": "intermediate_vagas"
+                "sql_query": "sql_prospects",
+                "silver_prospects": "silver_prospects",
+                "processing": "params:processing"
+            },
+            outputs="primary_prospects",
+            name="process_prospects_primary_node",
+            tags=["primary", "tables"]
+        ),
+        node(
+            func=process_vagas_primary,
+            inputs={
+                "sql_query": "sql_vagas",
+                "silver_vagas": "silver_vagas",
+                "processing": "params:processing"
+            },
+            outputs="primary_vagas",
+            name="process_vagas_primary_node",
+            tags=["primary", "tables"]
+        ),
+        node(
+            func=process_applicants_primary,
+            inputs={
+                "sql_query": "sql_applicants",
+                "silver_applicants": "silver_applicants",
+                "processing": "params:processing"
+            },
+            outputs="primary_applicants",
+            name="process_applicants_primary_node",
+            tags=["primary", "tables"]
+        ),
+        node(
+            func=process_core_primary,
+            inputs={
+                "sql_query": "sql_core_join",
+                "primary_prospects": "primary_prospects",
+                "primary_vagas": "primary_vagas",
+                "primary_applicants": "primary_applicants",
+                "processing": "params:processing",
+                "previous_primary_core": "previous_primary_core",
+                "json_ingestion_manifest": "json_ingestion_manifest",
+                "previous_core_manifest": "previous_primary_core_manifest"
             },
             outputs={
+                "primary_core": "primary_core",
+                "primary_core_manifest": "primary_core_manifest"
+            },
+            name="process_core_primary_node",
+            tags=["primary", "core"]
+        ),
+    ])
+
+def create_partitioned_prospects_pipeline(**kwargs) -> Pipeline:
+    """
+    Create the pipeline writing the Hive-partitioned prospects layout.
+
+    Returns:
+        Kedro pipeline partitioning primary prospects by cliente and month
+    """
+    return pipeline([
+        node(
+            func=process_prospects_partitioned,
+            inputs={
+                "sql_query": "sql_prospects_partitioned",
                 "primary_prospects": "primary_prospects",
-                "primary_vagas": "primary_vagas"
+                "primary_vagas": "primary_vagas",
+                "partitioning": "params:partitioning"
             },
-            name="process_primary_tables_node",
-            tags=["primary", "tables"]
+            outputs="primary_prospects_partitioned",
+            name="process_prospects_partitioned_node",
+            tags=["primary", "partitioned"]
         )
     ])
 
+
 def create_pipeline(**kwargs) -> Pipeline:
     """
     Main pipeline creation function.
     
     Returns:
-        Complete pipeline for the project
+        Silver and primary layer pipeline
     """
-    return create_primary_layer_pipeline()
+    return create_silver_layer_pipeline() + create_primary_layer_pipeline()
@@ -0,0 +1,171 @@
+"""
+Catalog-driven SQL templates.
+
+The SQL files under ``materialize_primary`` reference their inputs by catalog
+dataset name, as ``{{ intermediate_prospects }}``, instead of hardcoding
+Parquet paths. ``render_sql`` replaces every reference with the DuckDB
+relation the node registered for that dataset (the DataFrame Kedro already
+loaded) or, for datasets that are not node inputs, with a scan of the
+dataset's file. Each input is therefore read once, and the catalog of the
+environment (``kedro run --env ...``) decides where the files are.
+
+Datasets saved with ``partition_by`` (``primary_prospects_partitioned``) are
+scanned as Hive-partitioned directories, and the ``ano_mes`` and
+``data_candidatura`` filters of the query prune their ``periodo`` partitions
+(see ``partitions.prune_partitioned_scans``).
+
+``SQLTemplateHooks`` records the Parquet datasets of the catalog when a run
+starts; scripts running the SQL outside Kedro call
+``configure(project_tables())``.
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from kedro.config import OmegaConfigLoader
+from kedro.io import DataCatalog
+from kedro.io.core import get_filepath_str
+from kedro_datasets.pandas import ParquetDataset
+
+from fiap_mlops_datathon.duckdb_session import quote_identifier
+
+from .partitions import prune_partitioned_scans, read_partitioned_sql
+
+DATASET_REFERENCE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Table expression (read_parquet call) of every Parquet dataset of the catalog
+_tables: Dict[str, str] = {}
+
+
+def referenced_datasets(sql_query: str) -> List[str]:
+    """Return the dataset names referenced by a SQL template, in order of first use."""
+    return list(dict.fromkeys(DATASET_REFERENCE.findall(sql_query)))
+
+
+def parquet_table_sql(filepath: str, partitioned: bool = False) -> str:
+    """Return the ``read_parquet`` table expression of a Parquet file or partitioned directory."""
+    if partitioned:
+        return read_partitioned_sql(filepath)
+    escaped = filepath.replace("'", "''")
+    return f"read_parquet('{escaped}')"
+
+
+def dataset_filepath(catalog: DataCatalog, name: str) -> str:
+    """
+    Return the file of a catalog dataset, prefixed with its protocol unless it is local.
+
+    Args:
+        catalog: Kedro data catalog
+        name: Name of a file-based dataset of ``catalog``
+
+    Returns:
+        Path DuckDB can read the dataset from
+    """
+    dataset = catalog._get_dataset(name)
+    filepath = get_filepath_str(dataset._get_load_path(), dataset._protocol)
+    if dataset._protocol != "file":
+        filepath = f"{dataset._protocol}://{filepath}"
+    return filepath
+
+
+def catalog_tables(catalog: DataCatalog) -> Dict[str, str]:
+    """
+    Build the table expressions of the Parquet datasets of a catalog.
+
+    Args:
+        catalog: Kedro data catalog
+
+    Returns:
+        Mapping of dataset name to its ``read_parquet`` table expression
+    """
+    tables = {}
+    for name in catalog.list():
+        dataset = catalog._get_dataset(name)
+        if not isinstance(dataset, ParquetDataset):
+            continue
+        tables[name] = parquet_table_sql(
+            dataset_filepath(catalog, name),
+            partitioned=bool(dataset._save_args.get("partition_by")),
+        )
+    return tables
+
+
+def project_catalog(conf_source: str = "conf", env: str = "local") -> DataCatalog:
+    """
+    Build the project catalog without a Kedro session.
+
+    Args:
+        conf_source: Configuration directory of the project
+        env: Configuration environment merged over ``base``
+
+    Returns:
+        Kedro data catalog of the environment
+    """
+    config_loader = OmegaConfigLoader(conf_source, base_env="base", default_run_env=env)
+    return DataCatalog.from_config(config_loader["catalog"])
+
+
+def project_tables(conf_source: str = "conf", env: str = "local") -> Dict[str, str]:
+    """
+    Build the table expressions of the project catalog without a Kedro session.
+
+    Args:
+        conf_source: Configuration directory of the project
+        env: Configuration environment merged over ``base``
+
+    Returns:
+        Mapping of dataset name to its ``read_parquet`` table expression
+    """
+    return catalog_tables(project_catalog(conf_source, env))
+
+
+def configure(tables: Mapping[str, str]) -> None:
+    """Set the table expressions used for datasets that are not registered relations."""
+    global _tables
+    _tables = dict(tables)
+
+
+def render_sql(
+    sql_query: str,
+    relations: Iterable[str] = (),
+    tables: Optional[Mapping[str, str]] = None,
+) -> str:
+    """
+    Resolve the dataset references of a SQL template.
+
+    Scans of partitioned datasets are filtered on the ``periodo`` partitions
+    matching the query's ``ano_mes`` and ``data_candidatura`` filters.
+
+    Args:
+        sql_query: SQL with ``{{ dataset_name }}`` references
+        relations: Datasets registered as DuckDB relations under their own name
+        tables: Table expressions of the other datasets; those set by
+            ``configure`` by default
+
+    Returns:
+        SQL query DuckDB can run
+
+    Raises:
+        ValueError: If a referenced dataset is neither registered nor known
+    """
+    relations = set(relations)
+    tables = _tables if tables is None else tables
+    partitioned = set()
+
+    def resolve(match: re.Match) -> str:
+        name = match.group(1)
+        if name in relations:
+            return quote_identifier(name)
+        if name in tables:
+            if "hive_partitioning" in tables[name]:
+                partitioned.add(tables[name])
+            return tables[name]
+        raise ValueError(
+            f"SQL references dataset {name!r}, which is neither a node input "
+            f"nor a Parquet dataset of the catalog"
+        )
+
+    rendered = DATASET_REFERENCE.sub(resolve, sql_query)
+    if partitioned:
+        rendered = prune_partitioned_scans(rendered, partitioned)
+    return rendered
@@ -0,0 +1,210 @@
+"""
+Columnar builder that turns raw JSON records straight into per-column arrays.
+"""
+
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .record_specs import FieldSpec
+
+logger = logging.getLogger(__name__)
+
+
+def blank_string_mask(column: pd.Series) -> np.ndarray:
+    """
+    Flag empty and whitespace-only strings of an object column.
+
+    ``str.isspace`` is used instead of a regex or ``strip`` so no string copies
+    are allocated; non-string cells are never flagged.
+
+    Args:
+        column: Object Series
+
+    Returns:
+        Boolean array, True where the cell is a blank string
+    """
+    try:
+        is_blank = column.str.isspace()
+    except AttributeError:
+        # No string values at all (e.g. only numbers or booleans)
+        return np.zeros(len(column), dtype=bool)
+    return column.eq('').to_numpy() | is_blank.eq(True).to_numpy()
+
+
+def normalize_empty_column(values: List[Any]) -> np.ndarray:
+    """
+    Replace empty values of a whole column with None in one vectorized pass.
+
+    Empty strings, whitespace-only strings, NaN and empty lists/dicts become None,
+    matching ``clean_empty_values`` applied to every cell.
+
+    Args:
+        values: Raw values of one column
+
+    Returns:
+        Object array with empty values replaced by None
+    """
+    column = pd.Series(values, dtype=object)
+    missing = column.isna().to_numpy()
+    empty = missing | blank_string_mask(column)
+
+    # Only non-string values need the (slower) empty-container check
+    if pd.api.types.infer_dtype(column, skipna=True) not in ('string', 'empty'):
+        non_string = ~missing & column.map(type).ne(str).to_numpy()
+        empty[non_string] = [
+            isinstance(value, (list, dict)) and len(value) == 0
+            for value in column.to_numpy()[non_string]
+        ]
+
+    # The Series owns a fresh array built from ``values``, so edit it in place
+    array = column.to_numpy()
+    array[empty] = None
+    return array
+
+
+class ColumnarFrameBuilder:
+    """
+    Append raw records into per-column lists according to a field spec.
+
+    The spec is compiled once into a plan grouped by the first key of each path,
+    so every nested section of a record is looked up a single time per record.
+    """
+
+    def __init__(self, fields: FieldSpec, id_column: Optional[str] = 'id'):
+        self._id_column = id_column
+        self._columns: Dict[str, List[Any]] = {id_column: []} if id_column else {}
+        self._size = 0
+
+        sections: Dict[Tuple[str, ...], List[Tuple[str, Any]]] = {}
+        for column, path in fields.items():
+            self._columns[column] = []
+            sections.setdefault(path[:-1], []).append((path[-1], self._columns[column].append))
+        self._plan = list(sections.items())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, record_id: Optional[str], record: Mapping[str, Any]) -> None:
+        """
+        Extract one raw record into the column arrays.
+
+        If extraction fails half-way, columns are rolled back so they stay aligned.
+
+        Args:
+            record_id: Record identifier, stored in the id column (ignored without one)
+            record: Raw record dictionary
+        """
+        try:
+            for prefix, getters in self._plan:
+                section = record
+                for key in prefix:
+                    section = section.get(key) or {}
+                for key, append in getters:
+                    append(section.get(key))
+            if self._id_column:
+                self._columns[self._id_column].append(record_id)
+        except Exception:
+            self.truncate(self._size)
+            raise
+        self._size += 1
+
+    def truncate(self, size: int) -> None:
+        """Drop every row after the first ``size`` rows."""
+        for values in self._columns.values():
+            del values[size:]
+        self._size = min(self._size, size)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Build the DataFrame, normalising empty values once per column.
+
+        The builder is consumed by this call.
+
+        Returns:
+            DataFrame with the id column followed by the spec columns, in order
+        """
+        data = {}
+        # The plan's bound ``append`` methods would keep every list alive
+        self._plan = []
+        # Release each list as soon as its array exists to keep peak memory flat
+        for column in list(self._columns):
+            values = self._columns.pop(column)
+            data[column] = values if column == self._id_column else normalize_empty_column(values)
+            del values
+        self._size = 0
+        # copy=False keeps the column arrays instead of consolidating them into a new block
+        return pd.DataFrame(data, copy=False)
+
+
+class NestedFrameBuilder:
+    """
+    Flatten parent records holding a list of children into one row per child.
+
+    Children are appended straight into per-column lists (no per-child dict), and
+    parent fields are extracted once per parent. The per-parent child counts are
+    the list offsets: ``to_frame`` repeats every parent column over its children
+    with ``np.repeat``, so parents without children produce no rows.
+    """
+
+    def __init__(
+        self,
+        parent_fields: FieldSpec,
+        list_key: str,
+        child_fields: FieldSpec,
+        id_column: str = 'id',
+    ):
+        self._parents = ColumnarFrameBuilder(parent_fields, id_column=id_column)
+        self._children = ColumnarFrameBuilder(child_fields, id_column=None)
+        self._list_key = list_key
+        self._counts: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    def append(self, record_id: str, record: Mapping[str, Any]) -> None:
+        """
+        Extract one parent record and all of its children.
+
+        If extraction fails half-way, the children already appended are rolled back.
+
+        Args:
+            record_id: Parent record identifier, stored in the id column
+            record: Raw parent record dictionary
+        """
+        start = len(self._children)
+        children = record.get(self._list_key) or []
+        if not isinstance(children, list):
+            raise TypeError(f"'{self._list_key}' must be a list, got {type(children).__name__}")
+        try:
+            for child in children:
+                # Like ``get_path``, a child that is not an object has only null fields
+                self._children.append(None, child if isinstance(child, Mapping) else {})
+            self._parents.append(record_id, record)
+        except Exception:
+            self._children.truncate(start)
+            raise
+        self._counts.append(len(self._children) - start)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Build the flattened DataFrame. The builder is consumed by this call.
+
+        Returns:
+            DataFrame with the id column, the parent columns and the child columns, in order
+        """
+        counts = np.asarray(self._counts, dtype=np.int64)
+        self._counts = []
+        parents = self._parents.to_frame()
+        data = {
+            column: np.repeat(parents[column].to_numpy(), counts)
+            for column in parents.columns
+        }
+        del parents
+        children = self._children.to_frame()
+        for column in children.columns:
+            data[column] = children[column].to_numpy()
+        del children
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,187 @@
+"""
+Typed date parsing for the intermediate layer.
+
+Date fields arrive as text (``dd-mm-yyyy`` or ``dd-mm-yyyy HH:MM:SS``). The
+dominant format of each column is detected once on a sample and cached, then
+the whole column is parsed with it in a single vectorized ``pd.to_datetime``
+call; only the values it misses get a second pass with the other candidate
+formats. Values no format can parse become NaT and are returned as quarantine
+rows instead of raising.
+"""
+
+import logging
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+import pandas as pd
+
+from .incremental import frame_keys
+
+logger = logging.getLogger(__name__)
+
+# Candidate formats. No two of them can match the same string, so the order
+# in which they are tried never changes the parsed value.
+DATE_FORMATS: Tuple[str, ...] = (
+    '%d-%m-%Y',
+    '%d-%m-%Y %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y',
+)
+
+DATE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'applicants': ('data_criacao', 'data_nascimento'),
+    'prospects': ('data_candidatura', 'ultima_atualizacao'),
+}
+
+QUARANTINE_COLUMNS = ['entity', 'key', 'column', 'value']
+
+FORMAT_SAMPLE_SIZE = 1000
+
+# Detected format per (entity, column), reused while it still fits the data
+_FORMAT_CACHE: Dict[Tuple[str, str], str] = {}
+
+
+def _parse(values: pd.Series, date_format: str) -> pd.Series:
+    return pd.to_datetime(values, format=date_format, errors='coerce')
+
+
+def detect_date_format(
+    values: pd.Series, formats: Tuple[str, ...] = DATE_FORMATS, sample_size: int = FORMAT_SAMPLE_SIZE
+) -> Optional[str]:
+    """
+    Pick the format that parses the most values of a sample of the column.
+
+    Args:
+        values: Text column
+        formats: Candidate formats
+        sample_size: Number of non-null values to try each format on
+
+    Returns:
+        Best format, or None when no format parses any sampled value
+    """
+    sample = values.dropna().head(sample_size)
+    best_format, best_count = None, 0
+    for date_format in formats:
+        count = int(_parse(sample, date_format).notna().sum())
+        if count > best_count:
+            best_format, best_count = date_format, count
+    return best_format
+
+
+def _cached_date_format(entity: str, column: str, values: pd.Series) -> Optional[str]:
+    cache_key = (entity, column)
+    cached = _FORMAT_CACHE.get(cache_key)
+    if cached is not None:
+        sample = values.dropna().head(FORMAT_SAMPLE_SIZE)
+        if sample.empty or _parse(sample, cached).notna().mean() >= 0.5:
+            return cached
+    detected = detect_date_format(values)
+    if detected is not None:
+        _FORMAT_CACHE[cache_key] = detected
+    return detected
+
+
+def parse_date_column(
+    values: pd.Series, date_format: Optional[str], formats: Tuple[str, ...] = DATE_FORMATS
+) -> pd.Series:
+    """
+    Parse a text column into ``datetime64``; unparseable values become NaT.
+
+    Args:
+        values: Text column
+        date_format: Format tried first on the whole column
+        formats: Fallback formats, tried only on the values still missing
+
+    Returns:
+        Datetime Series aligned with ``values``
+    """
+    present = values.notna()
+    # Non-string values (e.g. numbers) are parsed from their text form
+    text = values.where(~present, values.astype(str))
+    if date_format is not None:
+        parsed = _parse(text, date_format)
+    else:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+    for fallback in formats:
+        missed = present & parsed.isna()
+        if not missed.any():
+            break
+        if fallback != date_format:
+            parsed[missed] = _parse(text[missed], fallback)
+    return parsed
+
+
+def parse_date_columns(df: pd.DataFrame, entity: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Parse the date columns of an intermediate DataFrame in place.
+
+    Args:
+        df: Intermediate DataFrame with text date columns
+        entity: Entity name (applicants, vagas or prospects)
+
+    Returns:
+        Tuple of the DataFrame and the quarantine rows (entity, key, column and
+        the raw value) of values that could not be parsed
+    """
+    quarantined: List[pd.DataFrame] = []
+    for column in DATE_COLUMNS.get(entity, ()):
+        if column not in df.columns or pd.api.types.is_datetime64_any_dtype(df[column]):
+            continue
+        values = df[column]
+        date_format = _cached_date_format(entity, column, values)
+        parsed = parse_date_column(values, date_format)
+        bad = values.notna() & parsed.isna()
+        bad_count = int(bad.sum())
+        if bad_count:
+            quarantined.append(pd.DataFrame({
+                'entity': entity,
+                'key': frame_keys(df[bad], entity).to_numpy(),
+                'column': column,
+                'value': values[bad].astype(str).to_numpy(),
+            }))
+        df[column] = parsed
+        logger.info(
+            f"Parsed {entity}.{column} with format {date_format}: "
+            f"{int(parsed.notna().sum())} dates, {bad_count} quarantined"
+        )
+
+    if not quarantined:
+        return df, pd.DataFrame(columns=QUARANTINE_COLUMNS)
+    return df, pd.concat(quarantined, ignore_index=True)
+
+
+def has_typed_dates(df: pd.DataFrame, entity: str) -> bool:
+    """Check that every date column present in ``df`` is already ``datetime64``."""
+    return all(
+        pd.api.types.is_datetime64_any_dtype(df[column])
+        for column in DATE_COLUMNS.get(entity, ())
+        if column in df.columns
+    )
+
+
+def merge_quarantine(
+    previous_df: Optional[pd.DataFrame],
+    delta_df: pd.DataFrame,
+    stale_keys: Mapping[str, Set[str]],
+) -> pd.DataFrame:
+    """
+    Replace quarantine rows of re-processed records with the fresh ones.
+
+    Args:
+        previous_df: Quarantine of the previous run (None for a first run)
+        delta_df: Quarantine rows of the records processed in this run
+        stale_keys: Keys of changed and deleted records, per entity
+
+    Returns:
+        Merged quarantine DataFrame
+    """
+    if previous_df is None or previous_df.empty:
+        return delta_df
+    stale = pd.Series(False, index=previous_df.index)
+    for entity, keys in stale_keys.items():
+        stale |= (previous_df['entity'] == entity) & previous_df['key'].astype(str).isin(keys)
+    kept = previous_df[~stale]
+    if delta_df.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, delta_df], ignore_index=True)
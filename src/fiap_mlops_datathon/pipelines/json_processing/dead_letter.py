@@ -0,0 +1,187 @@
+"""
+Dead-letter handling for raw JSON records that cannot be processed.
+
+Failing records are collected with an error code and their raw payload instead
+of being logged one by one. They are written to the ``quarantine_records``
+dataset and summarised in a single log line per run. Corrected payloads are
+pushed back through ingestion as record fixes (see ``RecordFixes``).
+"""
+
+import json
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from .incremental import record_hash
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_COLUMNS = ['entity', 'record_id', 'error_code', 'error', 'payload']
+RECORD_FIX_COLUMNS = ['entity', 'record_id', 'source_hash', 'payload']
+
+# Checked in order, the first matching exception type gives the error code
+ERROR_CODES: Tuple[Tuple[type, str], ...] = (
+    (AttributeError, 'invalid_structure'),
+    (TypeError, 'invalid_type'),
+    (KeyError, 'missing_field'),
+    (ValueError, 'invalid_value'),
+)
+DEFAULT_ERROR_CODE = 'processing_error'
+
+
+def error_code(error: Exception) -> str:
+    """Map an exception raised while processing a record to a stable error code."""
+    for error_type, code in ERROR_CODES:
+        if isinstance(error, error_type):
+            return code
+    return DEFAULT_ERROR_CODE
+
+
+def encode_payload(record: Any) -> str:
+    """Serialise a raw record so it can be stored and replayed."""
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+class DeadLetters:
+    """Collect records that failed to process for one entity."""
+
+    def __init__(self, entity: str):
+        self.entity = entity
+        self._rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, record_id: str, record: Any, error: Exception) -> None:
+        """
+        Record a failing raw record.
+
+        Args:
+            record_id: Raw record key
+            record: Raw record, stored as JSON text
+            error: Exception raised while processing it
+        """
+        self._rows.append({
+            'entity': self.entity,
+            'record_id': str(record_id),
+            'error_code': error_code(error),
+            'error': str(error),
+            'payload': encode_payload(record),
+        })
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the collected records as a DataFrame with ``DEAD_LETTER_COLUMNS``."""
+        return pd.DataFrame(self._rows, columns=DEAD_LETTER_COLUMNS)
+
+
+def log_dead_letter_summary(dead_letters: pd.DataFrame) -> None:
+    """Log the number of quarantined records per entity and error code in one line."""
+    if dead_letters.empty:
+        return
+    counts = Counter(zip(dead_letters['entity'], dead_letters['error_code']))
+    per_code = ', '.join(f"{entity}/{code}={count}" for (entity, code), count in sorted(counts.items()))
+    logger.warning(f"Quarantined {len(dead_letters)} malformed records: {per_code}")
+
+
+class RecordFixes:
+    """
+    Mapping-like view of raw records with replayed fixes applied.
+
+    A fix replaces a raw record only while the raw record still has the content
+    it was written for (``source_hash``): once the export itself is corrected,
+    the new raw record is used and the fix is ignored.
+    """
+
+    def __init__(self, raw_data: Mapping[str, Any], fixes: Dict[str, Tuple[str, Any]]):
+        self._raw_data = raw_data
+        self._fixes = fixes
+        self.applied = 0
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for record_id, record_data in self._raw_data.items():
+            fix = self._fixes.get(str(record_id))
+            if fix is not None and record_hash(record_data) == fix[0]:
+                self.applied += 1
+                record_data = fix[1]
+            yield record_id, record_data
+
+
+def apply_record_fixes(
+    raw_data: Mapping[str, Any], record_fixes: Optional[pd.DataFrame], entity: str
+) -> Mapping[str, Any]:
+    """
+    Wrap raw records of one entity so that their replayed fixes are used instead.
+
+    Args:
+        raw_data: Raw records (dict or streamed ``JSONRecordStream``)
+        record_fixes: Fixes with ``RECORD_FIX_COLUMNS``, or None
+        entity: Entity name
+
+    Returns:
+        ``raw_data`` itself when there is no fix for the entity, else a ``RecordFixes`` view
+    """
+    if record_fixes is None or record_fixes.empty:
+        return raw_data
+    rows = record_fixes[record_fixes['entity'] == entity]
+    if rows.empty:
+        return raw_data
+    fixes = {
+        str(record_id): (source_hash, json.loads(payload))
+        for record_id, source_hash, payload in zip(rows['record_id'], rows['source_hash'], rows['payload'])
+    }
+    return RecordFixes(raw_data, fixes)
+
+
+def build_record_fixes(
+    fixed_records: pd.DataFrame,
+    quarantine: Optional[pd.DataFrame],
+    previous_fixes: Optional[pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Turn corrected payloads of quarantined records into record fixes.
+
+    Args:
+        fixed_records: Corrected records with ``entity``, ``record_id`` and ``payload``
+            (the payload as JSON text or as the parsed record)
+        quarantine: Current quarantine, used to find the raw payload each fix replaces
+        previous_fixes: Fixes of earlier replays, kept unless replaced
+
+    Returns:
+        All record fixes with ``RECORD_FIX_COLUMNS``
+    """
+    source_hashes: Dict[Tuple[str, str], str] = {}
+    if quarantine is not None:
+        for entity, record_id, payload in zip(
+            quarantine['entity'], quarantine['record_id'], quarantine['payload']
+        ):
+            source_hashes[(entity, str(record_id))] = record_hash(json.loads(payload))
+
+    rows = []
+    skipped = 0
+    for entity, record_id, payload in zip(
+        fixed_records['entity'], fixed_records['record_id'], fixed_records['payload']
+    ):
+        source_hash = source_hashes.get((entity, str(record_id)))
+        if source_hash is None:
+            skipped += 1
+            continue
+        record = json.loads(payload) if isinstance(payload, str) else payload
+        rows.append({
+            'entity': entity,
+            'record_id': str(record_id),
+            'source_hash': source_hash,
+            'payload': encode_payload(record),
+        })
+    if skipped:
+        logger.warning(f"Ignored {skipped} fixed records that are not in the quarantine")
+
+    fixes = pd.DataFrame(rows, columns=RECORD_FIX_COLUMNS)
+    if previous_fixes is not None and not previous_fixes.empty:
+        replaced = pd.MultiIndex.from_frame(previous_fixes[['entity', 'record_id']]).isin(
+            pd.MultiIndex.from_frame(fixes[['entity', 'record_id']])
+        )
+        fixes = pd.concat([previous_fixes[~replaced], fixes], ignore_index=True)
+    logger.info(f"Replaying {len(rows)} fixed records, {len(fixes)} record fixes in total")
+    return fixes
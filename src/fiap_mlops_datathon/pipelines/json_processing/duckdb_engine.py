@@ -0,0 +1,218 @@
+"""
+DuckDB engine for the bronze layer: raw JSON straight to Parquet, without pandas.
+
+The SQL is generated from the same field specs as the pandas path, so both
+engines produce the same column names in the same order.
+
+DuckDB's JSON reader can't split a single JSON value: the raw exports are one
+top-level object, so ``read_json_objects`` loads each file whole before the
+records are unnested. Files must be smaller than ``MAX_JSON_OBJECT_SIZE`` and
+the largest one must fit in DuckDB's memory; bigger exports need the pandas
+engine, which streams the records with ``StreamingJSONDataset``.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import duckdb
+
+from fiap_mlops_datathon import duckdb_session
+from fiap_mlops_datathon.duckdb_session import quote_identifier
+
+from .dates import DATE_COLUMNS, DATE_FORMATS
+from .record_specs import (
+    APPLICANT_FIELDS,
+    PROSPECT_FIELDS,
+    PROSPECT_LIST_KEY,
+    PROSPECT_PARENT_FIELDS,
+    VAGA_FIELDS,
+    FieldSpec,
+)
+
+logger = logging.getLogger(__name__)
+
+# The raw exports are a single top-level JSON object, so the object size limit
+# has to cover the whole file; DuckDB caps it at 2 GiB
+MAX_JSON_OBJECT_SIZE = 2**31 - 1
+
+# Same rule as ``clean_empty_values``: empty and whitespace-only strings are NULL
+_EMPTY_VALUE_PATTERN = r'[\s\p{Z}]*'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _json_path(path: Tuple[str, ...]) -> str:
+    keys = '.'.join('"' + key.replace('"', '\\"') + '"' for key in path)
+    return _quote_literal(f'$.{keys}')
+
+
+def _clean_expression(json_column: str, path: Tuple[str, ...]) -> str:
+    """SQL expression extracting ``path`` as text, with empty values as NULL."""
+    value = f"json_extract_string({json_column}, {_json_path(path)})"
+    return (
+        f"CASE WHEN regexp_full_match({value}, '{_EMPTY_VALUE_PATTERN}') "
+        f"OR {value} IN ('[]', '{{}}') THEN NULL ELSE {value} END"
+    )
+
+
+def _date_expression(value: str) -> str:
+    """SQL expression parsing text with any of the ``DATE_FORMATS`` (NULL if none fits)."""
+    formats = ', '.join(_quote_literal(date_format) for date_format in DATE_FORMATS)
+    # Nanosecond timestamps, like the datetime64[ns] columns of the pandas engine
+    return f"try_strptime({value}, [{formats}])::TIMESTAMP_NS"
+
+
+def _select_fields(json_column: str, fields: FieldSpec, date_columns: Iterable[str] = ()) -> str:
+    date_columns = set(date_columns)
+    expressions = []
+    for column, path in fields.items():
+        expression = _clean_expression(json_column, path)
+        if column in date_columns:
+            expression = _date_expression(expression)
+        expressions.append(f"{expression} AS {quote_identifier(column)}")
+    return ',\n    '.join(expressions)
+
+
+def _records_source(filepath: str) -> str:
+    """Relation with one (record_id, record, record_index) row per top-level record."""
+    return f"""(
+    SELECT entry.key AS record_id, entry.value AS record, record_index
+    FROM (
+        SELECT unnest(entries) AS entry, generate_subscripts(entries, 1) AS record_index
+        FROM (
+            SELECT map_entries(raw.json::MAP(VARCHAR, JSON)) AS entries
+            FROM read_json_objects({_quote_literal(filepath)}, maximum_object_size={MAX_JSON_OBJECT_SIZE}) AS raw
+        )
+    )
+)"""
+
+
+def build_records_sql(
+    filepath: str, fields: FieldSpec, id_column: str = 'id', date_columns: Iterable[str] = ()
+) -> str:
+    """
+    Build the SQL that flattens a JSON object file into one row per record.
+
+    Args:
+        filepath: Path to the raw JSON file
+        fields: Field spec mapping output columns to nested JSON paths
+        id_column: Name of the column holding the record key
+        date_columns: Columns parsed into TIMESTAMP_NS instead of kept as text
+
+    Returns:
+        SQL query string
+    """
+    return f"""SELECT
+    record_id AS {quote_identifier(id_column)},
+    {_select_fields('record', fields, date_columns)}
+FROM {_records_source(filepath)}
+ORDER BY record_index"""
+
+
+def build_prospects_sql(filepath: str, date_columns: Iterable[str] = ()) -> str:
+    """
+    Build the SQL that flattens prospects.json into one row per candidate prospect.
+
+    Args:
+        filepath: Path to the raw prospects JSON file
+        date_columns: Columns parsed into TIMESTAMP_NS instead of kept as text
+
+    Returns:
+        SQL query string
+    """
+    list_path = _quote_literal(f'$."{PROSPECT_LIST_KEY}"')
+    return f"""SELECT
+    record_id AS prospect_id,
+    {_select_fields('record', PROSPECT_PARENT_FIELDS)},
+    {_select_fields('prospect', PROSPECT_FIELDS, date_columns)}
+FROM (
+    SELECT
+        record_id,
+        record,
+        record_index,
+        unnest(children) AS prospect,
+        generate_subscripts(children, 1) AS prospect_index
+    FROM (
+        SELECT *, CAST(json_extract(record, {list_path}) AS JSON[]) AS children
+        FROM {_records_source(filepath)}
+    )
+)
+ORDER BY record_index, prospect_index"""
+
+
+def build_date_quarantine_sql(sources: List[Tuple[str, str, str]]) -> str:
+    """
+    Build the SQL listing the date values that no ``DATE_FORMATS`` entry can parse.
+
+    Args:
+        sources: (entity, untyped table SQL, key expression) per entity; the key
+            expression must match ``frame_keys`` for that entity
+
+    Returns:
+        SQL query string with the ``QUARANTINE_COLUMNS``
+    """
+    selects = []
+    for entity, table_sql, key_expression in sources:
+        for column in DATE_COLUMNS[entity]:
+            value = quote_identifier(column)
+            selects.append(
+                f"SELECT {_quote_literal(entity)} AS entity, {key_expression} AS key, "
+                f"{_quote_literal(column)} AS \"column\", {value} AS value\n"
+                f"FROM ({table_sql})\n"
+                f"WHERE {value} IS NOT NULL AND {_date_expression(value)} IS NULL"
+            )
+    return '\nUNION ALL\n'.join(selects)
+
+
+def process_json_with_duckdb(
+    applicants_path: str,
+    vagas_path: str,
+    prospects_path: str,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+) -> Dict[str, duckdb.DuckDBPyRelation]:
+    """
+    Build lazy DuckDB relations for the three intermediate tables.
+
+    Nothing is executed here: the relations are streamed to Parquet with
+    ``COPY ... TO`` when the ``DuckDBParquetDataset`` outputs are saved. Date
+    columns are parsed with ``try_strptime`` and the values that fail are listed
+    by the ``quarantine_dates`` relation.
+
+    Args:
+        applicants_path: Path to applicants.json
+        vagas_path: Path to vagas.json
+        prospects_path: Path to prospects.json
+        connection: DuckDB connection to use; a cursor on the shared
+            ``duckdb_session`` database by default
+
+    Returns:
+        Dictionary of output dataset name to DuckDB relation
+
+    Raises:
+        ValueError: If a file is larger than ``MAX_JSON_OBJECT_SIZE``
+    """
+    for filepath in (applicants_path, vagas_path, prospects_path):
+        if os.path.isfile(filepath) and os.path.getsize(filepath) > MAX_JSON_OBJECT_SIZE:
+            raise ValueError(
+                f"{filepath} is larger than the {MAX_JSON_OBJECT_SIZE} bytes DuckDB can read "
+                f"as one JSON object; use the pandas engine, which streams the records"
+            )
+    con = connection or duckdb_session.cursor()
+    logger.info("Processing all JSON data with the DuckDB engine...")
+    applicant_dates = DATE_COLUMNS['applicants']
+    prospect_dates = DATE_COLUMNS['prospects']
+    quarantine_sql = build_date_quarantine_sql([
+        ('applicants', build_records_sql(applicants_path, APPLICANT_FIELDS), 'id'),
+        ('prospects', build_prospects_sql(prospects_path), "prospect_id || '/' || coalesce(codigo, '')"),
+    ])
+    return {
+        "intermediate_applicants": con.sql(
+            build_records_sql(applicants_path, APPLICANT_FIELDS, date_columns=applicant_dates)
+        ),
+        "intermediate_vagas": con.sql(build_records_sql(vagas_path, VAGA_FIELDS)),
+        "intermediate_prospects": con.sql(build_prospects_sql(prospects_path, date_columns=prospect_dates)),
+        "quarantine_dates": con.sql(quarantine_sql),
+    }
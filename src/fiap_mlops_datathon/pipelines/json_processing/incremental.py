@@ -0,0 +1,210 @@
+"""
+Change detection for incremental JSON ingestion based on per-record content hashes.
+
+The manifest is a DataFrame with one row per record: ``entity`` (applicants,
+vagas or prospects), ``key`` (applicant id, vaga id or ``prospect_id/codigo``)
+and ``hash`` (digest of the raw record content).
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+import pandas as pd
+
+from .record_specs import get_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_COLUMNS = ['entity', 'key', 'hash']
+
+# Version of the record keys and hashes; bump it when record_hash or the keys change
+MANIFEST_VERSION = 1
+
+
+def record_hash(record: Any) -> str:
+    """
+    Compute a stable digest of a raw JSON record.
+
+    Args:
+        record: Raw record (any JSON-serializable value)
+
+    Returns:
+        Hex digest that only changes when the record content changes
+    """
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def prospect_key(prospect_id: Any, codigo: Any) -> str:
+    """Build the manifest key of a prospect from its vaga id and candidate code."""
+    codigo = '' if codigo is None or (isinstance(codigo, str) and codigo.strip() == '') else codigo
+    return f"{prospect_id}/{codigo}"
+
+
+def manifest_hashes(manifest: Optional[pd.DataFrame], entity: str) -> Dict[str, str]:
+    """
+    Extract the key -> hash mapping of one entity from a manifest.
+
+    Args:
+        manifest: Manifest DataFrame, or None when there is no previous run
+        entity: Entity name
+
+    Returns:
+        Dictionary of record key to content hash
+    """
+    if manifest is None or manifest.empty:
+        return {}
+    rows = manifest[manifest['entity'] == entity]
+    return dict(zip(rows['key'].astype(str), rows['hash'].astype(str)))
+
+
+def build_manifest(hashes: Mapping[str, Mapping[str, str]]) -> pd.DataFrame:
+    """
+    Build a manifest DataFrame from per-entity key -> hash mappings.
+
+    Args:
+        hashes: Mapping of entity name to its key -> hash mapping
+
+    Returns:
+        Manifest DataFrame
+    """
+    frames = [
+        pd.DataFrame({'entity': entity, 'key': list(entity_hashes), 'hash': list(entity_hashes.values())})
+        for entity, entity_hashes in hashes.items()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[MANIFEST_COLUMNS]
+
+
+class ChangedRecords:
+    """
+    Mapping-like view that only yields records whose content hash changed.
+
+    Iterating ``items()`` hashes every raw record, stores the current hashes in
+    ``hashes`` and yields added or changed records. Once iterated, ``stale_keys``
+    holds the keys to drop from the previous output (changed and deleted records).
+    """
+
+    def __init__(self, raw_data: Mapping[str, Any], previous_hashes: Dict[str, str]):
+        self._raw_data = raw_data
+        self._previous_hashes = previous_hashes
+        self.hashes: Dict[str, str] = {}
+        self.changed = 0
+
+    def _emit(self, key: str, digest: str) -> bool:
+        self.hashes[key] = digest
+        if self._previous_hashes.get(key) == digest:
+            return False
+        self.changed += 1
+        return True
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for record_id, record_data in self._raw_data.items():
+            if self._emit(str(record_id), record_hash(record_data)):
+                yield record_id, record_data
+
+    @property
+    def stale_keys(self) -> Set[str]:
+        deleted = self._previous_hashes.keys() - self.hashes.keys()
+        changed = {
+            key for key, digest in self.hashes.items()
+            if key in self._previous_hashes and self._previous_hashes[key] != digest
+        }
+        return deleted | changed
+
+    @property
+    def deleted(self) -> int:
+        return len(self._previous_hashes.keys() - self.hashes.keys())
+
+    def forget(self, record_ids: Iterable[str]) -> None:
+        """
+        Drop records from the current hashes so the next run processes them again.
+
+        Args:
+            record_ids: Keys of records that could not be processed
+        """
+        for record_id in record_ids:
+            self.hashes.pop(str(record_id), None)
+
+
+class ChangedProspects(ChangedRecords):
+    """
+    ``ChangedRecords`` for prospects, hashed per (prospect_id, codigo).
+
+    Each vaga is yielded with only its changed prospects; the parent ``titulo``
+    and ``modalidade`` are part of every child hash. Malformed vagas (not an
+    object, or ``prospects`` not a list) are always yielded as they are, without
+    a hash, so processing quarantines them on every run until they are fixed.
+    """
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for prospect_id, prospect_data in self._raw_data.items():
+            children = prospect_data.get('prospects') if isinstance(prospect_data, Mapping) else None
+            if not isinstance(prospect_data, Mapping) or not isinstance(children or [], list):
+                self.changed += 1
+                yield prospect_id, prospect_data
+                continue
+
+            parent = {'titulo': prospect_data.get('titulo'), 'modalidade': prospect_data.get('modalidade')}
+            keyed = [
+                (prospect_key(prospect_id, get_path(prospect, ('codigo',))), prospect)
+                for prospect in children or []
+            ]
+            by_key: Dict[str, List[Dict[str, Any]]] = {}
+            for key, prospect in keyed:
+                by_key.setdefault(key, []).append(prospect)
+
+            changed_keys = {
+                key for key, prospects in by_key.items()
+                if self._emit(key, record_hash({**parent, 'prospects': prospects}))
+            }
+            # Keep the original order of the prospects inside the vaga
+            changed = [prospect for key, prospect in keyed if key in changed_keys]
+            if changed:
+                yield prospect_id, {**prospect_data, 'prospects': changed}
+
+
+def frame_keys(df: pd.DataFrame, entity: str) -> pd.Series:
+    """
+    Compute manifest keys for the rows of an intermediate DataFrame.
+
+    Args:
+        df: Intermediate DataFrame
+        entity: Entity name
+
+    Returns:
+        Series of string keys aligned with ``df``
+    """
+    if entity == 'prospects':
+        codigo = df['codigo'].astype(object).where(df['codigo'].notna(), '')
+        return df['prospect_id'].astype(str) + '/' + codigo.astype(str)
+    return df['id'].astype(str)
+
+
+def merge_changes(
+    previous_df: Optional[pd.DataFrame], delta_df: pd.DataFrame, entity: str, stale_keys: Set[str]
+) -> pd.DataFrame:
+    """
+    Replace stale rows of the previous output with freshly processed ones.
+
+    Args:
+        previous_df: Previous intermediate DataFrame (None for a first run)
+        delta_df: Rows processed from added or changed records
+        entity: Entity name
+        stale_keys: Keys of changed and deleted records
+
+    Returns:
+        Merged DataFrame: kept previous rows first, then the processed rows
+    """
+    if previous_df is None:
+        return delta_df
+    kept = previous_df[~frame_keys(previous_df, entity).isin(stale_keys)]
+    # Categories of the previous run would not cover new values; re-optimised later
+    kept = kept.astype({col: object for col in kept.columns if isinstance(kept[col].dtype, pd.CategoricalDtype)})
+    delta_df = delta_df.astype({col: object for col in delta_df.columns if isinstance(delta_df[col].dtype, pd.CategoricalDtype)})
+    if delta_df.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, delta_df], ignore_index=True)
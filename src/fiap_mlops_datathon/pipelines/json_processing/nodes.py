@@ -1,12 +1,54 @@
 import json
 import logging
-from typing import Any, Dict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
+import duckdb
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from fiap_mlops_datathon.datasets import ParquetChunks
+
+from .columnar import ColumnarFrameBuilder, NestedFrameBuilder, blank_string_mask
+from .dates import QUARANTINE_COLUMNS, has_typed_dates, merge_quarantine, parse_date_columns
+from .dead_letter import (
+    DEAD_LETTER_COLUMNS,
+    DeadLetters,
+    apply_record_fixes,
+    build_record_fixes,
+    log_dead_letter_summary,
+)
+from .duckdb_engine import process_json_with_duckdb
+from .incremental import (
+    ChangedProspects,
+    ChangedRecords,
+    build_manifest,
+    manifest_hashes,
+    merge_changes,
+)
+from .parallel import build_frame_sharded, iter_frames_sharded
+from .profiling import DEFAULT_TOP_K, build_profile, profile_table
+from .record_specs import (
+    APPLICANT_FIELDS,
+    PROSPECT_FIELDS,
+    PROSPECT_LIST_KEY,
+    PROSPECT_PARENT_FIELDS,
+    VAGA_FIELDS,
+    FieldSpec,
+)
 
 logger = logging.getLogger(__name__)
 
+# Rows per Parquet row group of the intermediate tables
+DEFAULT_BATCH_SIZE = 10000
+
+# Object columns with a longer average string length are treated as free text
+FREE_TEXT_MIN_AVG_LENGTH = 200
+FREE_TEXT_SAMPLE_SIZE = 1000
+
 
 def load_json_from_text(json_text: str) -> Dict[str, Any]:
     """
@@ -47,301 +89,616 @@ def clean_empty_values(value: Any) -> Any:
         return value
 
 
-def optimize_dataframe_types(df: pd.DataFrame) -> pd.DataFrame:
+def _downcast_integer(series: pd.Series) -> pd.Series:
+    """
+    Downcast an int64 column to the smallest integer type that fits its range.
+
+    Args:
+        series: int64 Series without nulls
+
+    Returns:
+        Downcast Series (unchanged if no smaller type fits)
+    """
+    col_min = series.min()
+    col_max = series.max()
+
+    if col_min >= 0:
+        if col_max < 255:
+            return series.astype('uint8')
+        elif col_max < 65535:
+            return series.astype('uint16')
+        elif col_max < 4294967295:
+            return series.astype('uint32')
+    elif col_min > -128 and col_max < 127:
+        return series.astype('int8')
+    elif col_min > -32768 and col_max < 32767:
+        return series.astype('int16')
+    elif col_min > -2147483648 and col_max < 2147483647:
+        return series.astype('int32')
+    return series
+
+
+def _is_free_text(series: pd.Series, min_avg_length: int) -> bool:
+    """Check the average string length on a sample of the leading non-null values."""
+    sample = series.iloc[:FREE_TEXT_SAMPLE_SIZE].dropna()
+    if sample.empty or pd.api.types.infer_dtype(sample, skipna=True) != 'string':
+        return False
+    return sample.str.len().mean() >= min_avg_length
+
+
+def _unique_ratio(series: pd.Series, non_null_count: int) -> float:
+    """Share of distinct values among non-null cells (1.0 for unhashable values)."""
+    try:
+        return series.nunique() / non_null_count
+    except TypeError:
+        return 1.0
+
+
+def optimize_dataframe_types(
+    df: pd.DataFrame,
+    free_text_min_length: int = FREE_TEXT_MIN_AVG_LENGTH,
+    report_memory: bool = True,
+) -> pd.DataFrame:
     """
     Optimize DataFrame data types to reduce memory usage and handle nulls properly.
-    
+
+    Works column by column on ``df`` itself (no full-frame copy): blank strings
+    become NaN, low-cardinality text becomes ``category`` and integers are
+    downcast. Free-text columns are not considered for category conversion.
+
     Args:
-        df: DataFrame to optimize
-        
+        df: DataFrame to optimize (modified in place)
+        free_text_min_length: Average string length from which an object column
+            is treated as free text and skipped for category detection
+        report_memory: Log per-column memory usage before and after
+
     Returns:
         DataFrame with optimized data types
     """
     logger.info("Optimizing DataFrame data types...")
-    optimized_df = df.copy()
+    memory_report = {}
 
-    # First, replace empty values with proper NaN/None values
-    optimized_df = optimized_df.replace('', np.nan)
-    optimized_df = optimized_df.replace(r'^\s*$', np.nan, regex=True)  # Whitespace-only strings
-
-    for col in optimized_df.columns:
-        col_type = optimized_df[col].dtype
+    for col in df.columns:
+        series = df[col]
+        original = series
+        col_type = series.dtype
+        memory_before = series.memory_usage(index=False, deep=True) if report_memory else 0
 
         # Optimize categorical strings
         if col_type == 'object':
+            # Replace empty and whitespace-only strings with NaN
+            blank = blank_string_mask(series)
+            if blank.any():
+                series = series.mask(blank, np.nan)
+
+            non_null = series.notna()
+            non_null_count = int(non_null.sum())
             # Only convert to category if we have non-null values
-            if optimized_df[col].notna().any():
-                unique_ratio = optimized_df[col].nunique() / optimized_df[col].notna().sum()
-                if unique_ratio < 0.5:  # If less than 50% unique values among non-null
-                    optimized_df[col] = optimized_df[col].astype('category')
+            if non_null_count > 0:
+                if not _is_free_text(series, free_text_min_length) and _unique_ratio(series, non_null_count) < 0.5:
+                    # If less than 50% unique values among non-null
+                    series = series.astype('category')
 
         # Optimize integers (pandas handles nullable integers with Int64, etc.)
-        elif col_type in ['int64', 'float64']:
-            # Check if column has any null values
-            has_nulls = optimized_df[col].isna().any()
-
-            if col_type == 'int64':
-                if has_nulls:
-                    # Use nullable integer types to preserve NaN values
-                    optimized_df[col] = optimized_df[col].astype('Int64')
-                else:
-                    col_min = optimized_df[col].min()
-                    col_max = optimized_df[col].max()
-
-                    if col_min >= 0:
-                        if col_max < 255:
-                            optimized_df[col] = optimized_df[col].astype('uint8')
-                        elif col_max < 65535:
-                            optimized_df[col] = optimized_df[col].astype('uint16')
-                        elif col_max < 4294967295:
-                            optimized_df[col] = optimized_df[col].astype('uint32')
-                    elif col_min > -128 and col_max < 127:
-                        optimized_df[col] = optimized_df[col].astype('int8')
-                    elif col_min > -32768 and col_max < 32767:
-                        optimized_df[col] = optimized_df[col].astype('int16')
-                    elif col_min > -2147483648 and col_max < 2147483647:
-                        optimized_df[col] = optimized_df[col].astype('int32')
+        elif col_type == 'int64':
+            series = _downcast_integer(series)
+
+        if series is not original:
+            df[col] = series
+        if report_memory:
+            memory_after = (
+                series.memory_usage(index=False, deep=True)
+                if series is not original else memory_before
+            )
+            memory_report[col] = (memory_before, memory_after)
+
+    if report_memory and memory_report:
+        per_column = {
+            col: f"{before / 1024**2:.2f} -> {after / 1024**2:.2f}"
+            for col, (before, after) in memory_report.items()
+        }
+        logger.info(f"Column memory in MB (before -> after): {per_column}")
+        total_before = sum(before for before, _ in memory_report.values())
+        total_after = sum(after for _, after in memory_report.values())
+        logger.info(
+            f"DataFrame memory: {total_before / 1024**2:.2f} MB -> {total_after / 1024**2:.2f} MB"
+        )
 
     logger.info("DataFrame optimization completed")
-    return optimized_df
+    return df
 
 
-def process_applicant_record(app_id: str, app_data: Dict[str, Any]) -> Dict[str, Any]:
+def _iter_built_frames(
+    items: Iterable[Tuple[str, Any]],
+    new_builder: Callable[[], Union[ColumnarFrameBuilder, NestedFrameBuilder]],
+    entity: str,
+    chunk_size: Optional[int] = None,
+) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
     """
-    Process a single applicant record with null handling.
-    
+    Extract records into frame builders, flushed every ``chunk_size`` rows.
+
     Args:
-        app_id: Applicant ID
-        app_data: Applicant data dictionary
-        
-    Returns:
-        Processed applicant record
+        items: Iterable of (record id, raw record) pairs
+        new_builder: Callable returning an empty frame builder
+        entity: Entity name, recorded with the records that fail
+        chunk_size: Rows after which the builder is flushed; None builds one frame
+
+    Yields:
+        Tuples of a DataFrame of the rows built since the last flush (a nested
+        record is never split, so it can exceed ``chunk_size``) and the dead
+        letters of the records that failed meanwhile; at least one tuple
     """
-    basic_info = app_data.get('infos_basicas', {})
-    personal_info = app_data.get('informacoes_pessoais', {})
-    professional_info = app_data.get('informacoes_profissionais', {})
-    education_info = app_data.get('formacao_e_idiomas', {})
-
-    record = {
-        'id': app_id,
-        # Basic information
-        'nome': clean_empty_values(basic_info.get('nome')),
-        'email': clean_empty_values(basic_info.get('email')),
-        'telefone': clean_empty_values(basic_info.get('telefone')),
-        'telefone_recado': clean_empty_values(basic_info.get('telefone_recado')),
-        'data_criacao': clean_empty_values(basic_info.get('data_criacao')),
-        'data_atualizacao': clean_empty_values(basic_info.get('data_atualizacao')),
-        'inserido_por': clean_empty_values(basic_info.get('inserido_por')),
-        'codigo_profissional': clean_empty_values(basic_info.get('codigo_profissional')),
-        'objetivo_profissional': clean_empty_values(basic_info.get('objetivo_profissional')),
-
-        # Personal information
-        'cpf': clean_empty_values(personal_info.get('cpf')),
-        'data_nascimento': clean_empty_values(personal_info.get('data_nascimento')),
-        'sexo': clean_empty_values(personal_info.get('sexo')),
-        'estado_civil': clean_empty_values(personal_info.get('estado_civil')),
-        'pcd': clean_empty_values(personal_info.get('pcd')),
-        'endereco': clean_empty_values(personal_info.get('endereco')),
-        'linkedin': clean_empty_values(personal_info.get('url_linkedin')),
-        'facebook': clean_empty_values(personal_info.get('facebook')),
-        'skype': clean_empty_values(personal_info.get('skype')),
-
-        # Professional information
-        'titulo_profissional': clean_empty_values(professional_info.get('titulo_profissional')),
-        'area_atuacao': clean_empty_values(professional_info.get('area_atuacao')),
-        'conhecimentos_tecnicos': clean_empty_values(professional_info.get('conhecimentos_tecnicos')),
-        'certificacoes': clean_empty_values(professional_info.get('certificacoes')),
-        'remuneracao': clean_empty_values(professional_info.get('remuneracao')),
-        'nivel_profissional': clean_empty_values(professional_info.get('nivel_profissional')),
-
-        # Education and languages
-        'nivel_academico': clean_empty_values(education_info.get('nivel_academico')),
-        'nivel_ingles': clean_empty_values(education_info.get('nivel_ingles')),
-        'nivel_espanhol': clean_empty_values(education_info.get('nivel_espanhol')),
-        'outro_idioma': clean_empty_values(education_info.get('outro_idioma')),
-
-        # CV files
-        'cv_pt': clean_empty_values(app_data.get('cv_pt')),
-        'cv_en': clean_empty_values(app_data.get('cv_en'))
-    }
+    builder, dead_letters = new_builder(), DeadLetters(entity)
+    flushed = False
+    for record_id, record_data in items:
+        try:
+            builder.append(record_id, record_data)
+        except Exception as e:
+            dead_letters.add(record_id, record_data, e)
+        if chunk_size is not None and len(builder) >= chunk_size:
+            yield builder.to_frame(), dead_letters.to_frame()
+            builder, dead_letters = new_builder(), DeadLetters(entity)
+            flushed = True
+    if len(builder) or len(dead_letters) or not flushed:
+        yield builder.to_frame(), dead_letters.to_frame()
 
-    return record
 
+def _new_prospects_builder() -> NestedFrameBuilder:
+    """Return a builder with one row per candidate prospect of a vaga."""
+    return NestedFrameBuilder(
+        PROSPECT_PARENT_FIELDS, PROSPECT_LIST_KEY, PROSPECT_FIELDS, id_column='prospect_id'
+    )
 
-def process_vaga_record(vaga_id: str, vaga_data: Dict[str, Any]) -> Dict[str, Any]:
+
+def _build_columnar_frame(
+    items: Iterable[Tuple[str, Any]], fields: FieldSpec, entity: str
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Process a single job position record with null handling.
-    
+    Extract records straight into per-column arrays using a field spec.
+
     Args:
-        vaga_id: Job position ID
-        vaga_data: Job position data dictionary
-        
+        items: Iterable of (record id, raw record) pairs
+        fields: Field spec mapping output columns to nested JSON paths
+        entity: Entity name, recorded with the records that fail
+
     Returns:
-        Processed job position record
+        Tuple of the DataFrame, with one column per field of the spec, and
+        the dead letters of the records that failed
     """
-    try:
-        basic_info = vaga_data.get('informacoes_basicas', {})
-        profile_info = vaga_data.get('perfil_vaga', {})
-        benefits_info = vaga_data.get('beneficios', {})
-
-        record = {
-            'id': vaga_id,
-            # Basic information
-            'titulo_vaga': clean_empty_values(basic_info.get('titulo_vaga')),
-            'cliente': clean_empty_values(basic_info.get('cliente')),
-            'solicitante_cliente': clean_empty_values(basic_info.get('solicitante_cliente')),
-            'empresa_divisao': clean_empty_values(basic_info.get('empresa_divisao')),
-            'requisitante': clean_empty_values(basic_info.get('requisitante')),
-            'analista_responsavel': clean_empty_values(basic_info.get('analista_responsavel')),
-            'tipo_contratacao': clean_empty_values(basic_info.get('tipo_contratacao')),
-            'data_requicisao': clean_empty_values(basic_info.get('data_requicisao')),
-            'limite_contratacao': clean_empty_values(basic_info.get('limite_esperado_para_contratacao')),
-            'vaga_sap': clean_empty_values(basic_info.get('vaga_sap')),
-            'prazo_contratacao': clean_empty_values(basic_info.get('prazo_contratacao')),
-            'objetivo_vaga': clean_empty_values(basic_info.get('objetivo_vaga')),
-            'prioridade_vaga': clean_empty_values(basic_info.get('prioridade_vaga')),
-            'origem_vaga': clean_empty_values(basic_info.get('origem_vaga')),
-
-            # Job profile
-            'pais': clean_empty_values(profile_info.get('pais')),
-            'estado': clean_empty_values(profile_info.get('estado')),
-            'cidade': clean_empty_values(profile_info.get('cidade')),
-            'bairro': clean_empty_values(profile_info.get('bairro')),
-            'local_trabalho': clean_empty_values(profile_info.get('local_trabalho')),
-            'vaga_pcd': clean_empty_values(profile_info.get('vaga_especifica_para_pcd')),
-            'faixa_etaria': clean_empty_values(profile_info.get('faixa_etaria')),
-            'horario_trabalho': clean_empty_values(profile_info.get('horario_trabalho')),
-            'nivel_profissional': clean_empty_values(profile_info.get('nivel profissional')),
-            'nivel_academico': clean_empty_values(profile_info.get('nivel_academico')),
-            'nivel_ingles': clean_empty_values(profile_info.get('nivel_ingles')),
-            'nivel_espanhol': clean_empty_values(profile_info.get('nivel_espanhol')),
-            'outro_idioma': clean_empty_values(profile_info.get('outro_idioma')),
-            'areas_atuacao': clean_empty_values(profile_info.get('areas_atuacao')),
-            'principais_atividades': clean_empty_values(profile_info.get('principais_atividades')),
-            'competencias': clean_empty_values(profile_info.get('competencia_tecnicas_e_comportamentais')),
-            'observacoes': clean_empty_values(profile_info.get('demais_observacoes')),
-            'viagens_requeridas': clean_empty_values(profile_info.get('viagens_requeridas')),
-            'equipamentos_necessarios': clean_empty_values(profile_info.get('equipamentos_necessarios')),
-
-            # Benefits
-            'valor_venda': clean_empty_values(benefits_info.get('valor_venda')),
-            'valor_compra_1': clean_empty_values(benefits_info.get('valor_compra_1')),
-            'valor_compra_2': clean_empty_values(benefits_info.get('valor_compra_2'))
-        }
+    return next(_iter_built_frames(items, partial(ColumnarFrameBuilder, fields), entity))
 
-        return record
 
-    except Exception as e:
-        logger.error(f"Error in process_vaga_record for vaga_id {vaga_id}: {str(e)}")
-        logger.error(f"Vaga data keys: {list(vaga_data.keys()) if isinstance(vaga_data, dict) else 'Not a dict'}")
-        raise
+def _build_prospects_frame(items: Iterable[Tuple[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Build the flattened prospects DataFrame from (vaga id, raw record) pairs.
 
+    Children go straight into column arrays and the parent columns are
+    repeated with array operations instead of being copied into a dict per
+    prospect.
 
-def process_prospect_record(prospect_id: str, prospect_data: Dict[str, Any]) -> list:
-    """
-    Process prospect records with null handling.
-    
     Args:
-        prospect_id: Prospect ID
-        prospect_data: Prospect data dictionary
-        
+        items: Iterable of (vaga id, raw prospects record) pairs
+
     Returns:
-        List of processed prospect records
+        Tuple of the DataFrame, with one row per candidate prospect, and the
+        dead letters of the vagas that failed
     """
-    titulo = clean_empty_values(prospect_data.get('titulo'))
-    modalidade = clean_empty_values(prospect_data.get('modalidade'))
-    prospects = prospect_data.get('prospects', [])
-
-    records = []
-    for prospect in prospects:
-        record = {
-            'prospect_id': prospect_id,
-            'titulo': titulo,
-            'modalidade': modalidade,
-            'nome': clean_empty_values(prospect.get('nome')),
-            'codigo': clean_empty_values(prospect.get('codigo')),
-            'situacao_candidado': clean_empty_values(prospect.get('situacao_candidado')),
-            'data_candidatura': clean_empty_values(prospect.get('data_candidatura')),
-            'ultima_atualizacao': clean_empty_values(prospect.get('ultima_atualizacao')),
-            'comentario': clean_empty_values(prospect.get('comentario')),
-            'recrutador': clean_empty_values(prospect.get('recrutador'))
-        }
-        records.append(record)
-
-    return records
+    return next(_iter_built_frames(items, _new_prospects_builder, 'prospects'))
 
 
 def process_all_json_data(
-    raw_applicants: dict,
-    raw_vagas: dict,
-    raw_prospects: dict
+    raw_applicants: Mapping[str, Any],
+    raw_vagas: Mapping[str, Any],
+    raw_prospects: Mapping[str, Any],
+    processing: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, pd.DataFrame]:
     """
     Process all JSON data into structured DataFrames with proper null handling and optimization.
     
     Args:
-        raw_applicants: Raw applicants JSON data
-        raw_vagas: Raw job positions JSON data
-        raw_prospects: Raw prospects JSON data
-        
+        raw_applicants: Raw applicants JSON data (a dict or a streamed ``JSONRecordStream``)
+        raw_vagas: Raw job positions JSON data (a dict or a streamed ``JSONRecordStream``)
+        raw_prospects: Raw prospects JSON data (a dict or a streamed ``JSONRecordStream``)
+        processing: ``processing`` parameters; ``workers`` > 1 shards the records
+            over a process pool in chunks of ``shard_size`` records
+
     Returns:
-        Dictionary containing processed and optimized DataFrames
+        Dictionary containing processed and optimized DataFrames, with typed
+        date columns, the quarantine of date values that could not be parsed and
+        the quarantine of records that could not be processed at all
     """
     logger.info("Processing all JSON data with null handling...")
-
-    # Process applicants
-    applicants_records = []
-    for app_id, app_data in raw_applicants.items():
-        try:
-            record = process_applicant_record(app_id, app_data)
-            applicants_records.append(record)
-        except Exception as e:
-            logger.error(f"Error processing applicant {app_id}: {str(e)}")
-            continue
-
-    # Process job positions
-    vagas_records = []
-    for vaga_id, vaga_data in raw_vagas.items():
-        try:
-            record = process_vaga_record(vaga_id, vaga_data)
-            vagas_records.append(record)
-        except Exception as e:
-            logger.error(f"Error processing job position {vaga_id}: {str(e)}")
-            continue
-
-    # Process prospects
-    prospects_records = []
-    for prospect_id, prospect_data in raw_prospects.items():
-        try:
-            records = process_prospect_record(prospect_id, prospect_data)
-            prospects_records.extend(records)
-        except Exception as e:
-            logger.error(f"Error processing prospect {prospect_id}: {str(e)}")
-            continue
-
-    # Create DataFrames
-    applicants_df = pd.DataFrame(applicants_records)
-    vagas_df = pd.DataFrame(vagas_records)
-    prospects_df = pd.DataFrame(prospects_records)
+    processing = processing or {}
+    workers = int(processing.get("workers", 1))
+    shard_size = int(processing.get("shard_size", 5000))
+
+    builders = [
+        (raw_applicants, partial(_build_columnar_frame, fields=APPLICANT_FIELDS, entity="applicants")),
+        (raw_vagas, partial(_build_columnar_frame, fields=VAGA_FIELDS, entity="vagas")),
+        (raw_prospects, _build_prospects_frame),
+    ]
+
+    # Records are consumed one at a time, so streamed inputs never need to be
+    # fully resident. With workers > 1, contiguous shards are built in worker
+    # processes and concatenated in input order, so the output is deterministic.
+    if workers > 1:
+        logger.info(f"Processing JSON records with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        built = [
+            build_frame_sharded(
+                raw_data.items(),
+                build_shard,
+                executor=executor,
+                shard_size=shard_size,
+                max_in_flight=2 * workers,
+            )
+            for raw_data, build_shard in builders
+        ]
+    applicants_df, vagas_df, prospects_df = (frame for frame, _ in built)
+    dead_letters = pd.concat([frame_dead_letters for _, frame_dead_letters in built], ignore_index=True)
+    log_dead_letter_summary(dead_letters)
+
+    # Parse date columns before the type optimization turns them into categories
+    applicants_df, applicant_dates_quarantine = parse_date_columns(applicants_df, "applicants")
+    prospects_df, prospect_dates_quarantine = parse_date_columns(prospects_df, "prospects")
 
     # Optimize DataFrames (this will also handle remaining null values properly)
     applicants_df = optimize_dataframe_types(applicants_df)
     vagas_df = optimize_dataframe_types(vagas_df)
     prospects_df = optimize_dataframe_types(prospects_df)
 
-    # Log null statistics for monitoring
+    # Null statistics are computed by the profiling node in one pass
     logger.info(f"Processed applicants: {len(applicants_df)} records")
-    logger.info(f"Applicants null values: {applicants_df.isnull().sum().sum()}")
     logger.info(f"Processed job positions: {len(vagas_df)} records")
-    logger.info(f"Job positions null values: {vagas_df.isnull().sum().sum()}")
     logger.info(f"Processed prospects: {len(prospects_df)} records")
-    logger.info(f"Prospects null values: {prospects_df.isnull().sum().sum()}")
 
     return {
         "intermediate_applicants": applicants_df,
         "intermediate_vagas": vagas_df,
-        "intermediate_prospects": prospects_df
+        "intermediate_prospects": prospects_df,
+        "quarantine_dates": pd.concat(
+            [applicant_dates_quarantine, prospect_dates_quarantine], ignore_index=True
+        ),
+        "quarantine_records": dead_letters,
+    }
+
+
+def process_json_data_chunked(
+    raw_applicants: Mapping[str, Any],
+    raw_vagas: Mapping[str, Any],
+    raw_prospects: Mapping[str, Any],
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+    processing: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Process all JSON data into intermediate tables built ``chunk_size`` rows at a time.
+
+    The frame builders are flushed every ``chunk_size`` rows (every shard of
+    ``shard_size`` records with ``workers`` > 1). Each flushed frame gets its
+    dates parsed and is converted to an Arrow table straight away, so the
+    Python objects of a single chunk are resident instead of those of the
+    whole table, and the writer gets the tables as they were built. The
+    chunks are not type-optimized: Parquet dictionary-encodes their text
+    anyway, and ``optimize_dataframe_types`` needs the whole column.
+
+    Args:
+        raw_applicants: Raw applicants JSON data (a dict or a streamed ``JSONRecordStream``)
+        raw_vagas: Raw job positions JSON data (a dict or a streamed ``JSONRecordStream``)
+        raw_prospects: Raw prospects JSON data (a dict or a streamed ``JSONRecordStream``)
+        chunk_size: Rows per chunk and per Parquet row group
+        processing: ``processing`` parameters (``workers``, ``shard_size``)
+
+    Returns:
+        Same outputs as ``process_all_json_data``, with the intermediate
+        tables as ``ParquetChunks`` of Arrow tables
+    """
+    logger.info(f"Processing all JSON data in chunks of {chunk_size} rows...")
+    processing = processing or {}
+    workers = int(processing.get("workers", 1))
+    shard_size = int(processing.get("shard_size", 5000))
+
+    entities = [
+        ("applicants", raw_applicants, partial(ColumnarFrameBuilder, APPLICANT_FIELDS),
+         partial(_build_columnar_frame, fields=APPLICANT_FIELDS, entity="applicants")),
+        ("vagas", raw_vagas, partial(ColumnarFrameBuilder, VAGA_FIELDS),
+         partial(_build_columnar_frame, fields=VAGA_FIELDS, entity="vagas")),
+        ("prospects", raw_prospects, _new_prospects_builder, _build_prospects_frame),
+    ]
+
+    outputs: Dict[str, Any] = {}
+    dead_letters: List[pd.DataFrame] = []
+    quarantine_dates: List[pd.DataFrame] = []
+    if workers > 1:
+        logger.info(f"Processing JSON records with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        for entity, raw_data, new_builder, build_shard in entities:
+            if executor is None:
+                frames = _iter_built_frames(raw_data.items(), new_builder, entity, chunk_size)
+            else:
+                frames = iter_frames_sharded(
+                    raw_data.items(), build_shard, executor,
+                    shard_size=shard_size, max_in_flight=2 * workers,
+                )
+            tables = []
+            for frame, frame_dead_letters in frames:
+                dead_letters.append(frame_dead_letters)
+                if frame.empty:
+                    # Empty columns have no type to contribute
+                    continue
+                frame, frame_quarantine = parse_date_columns(frame, entity)
+                quarantine_dates.append(frame_quarantine)
+                tables.append(pa.Table.from_pandas(frame, preserve_index=False))
+                del frame
+            if not tables:
+                # An empty table is still written, with its columns
+                frame, _ = build_shard([])
+                frame, _ = parse_date_columns(frame, entity)
+                tables.append(pa.Table.from_pandas(frame, preserve_index=False))
+            rows = sum(table.num_rows for table in tables)
+            logger.info(f"Processed {entity}: {rows} records in {len(tables)} chunks")
+            outputs[f"intermediate_{entity}"] = ParquetChunks.from_tables(tables, chunk_size)
+
+    outputs["quarantine_dates"] = _concat_or_empty(quarantine_dates, QUARANTINE_COLUMNS)
+    outputs["quarantine_records"] = _concat_or_empty(dead_letters, DEAD_LETTER_COLUMNS)
+    log_dead_letter_summary(outputs["quarantine_records"])
+    return outputs
+
+
+def _concat_or_empty(frames: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    """Concatenate the non-empty frames, or return an empty frame with ``columns``."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def process_json_data_duckdb(
+    raw_applicants: Any, raw_vagas: Any, raw_prospects: Any
+) -> Dict[str, Any]:
+    """
+    Process all JSON data with DuckDB's JSON reader instead of pandas.
+
+    The raw inputs must be streamed datasets (``StreamingJSONDataset``) so the
+    files can be handed to DuckDB by path; nothing is parsed in Python.
+
+    Args:
+        raw_applicants: Streamed raw applicants JSON data
+        raw_vagas: Streamed raw job positions JSON data
+        raw_prospects: Streamed raw prospects JSON data
+
+    Returns:
+        Dictionary of lazy DuckDB relations, written to Parquet on save
+    """
+    paths = []
+    for raw_data in (raw_applicants, raw_vagas, raw_prospects):
+        filepath = getattr(raw_data, "filepath", None)
+        if filepath is None:
+            raise ValueError(
+                "The DuckDB engine needs the raw JSON datasets to be "
+                "StreamingJSONDataset entries so they can be read by path"
+            )
+        paths.append(filepath)
+    return process_json_with_duckdb(*paths)
+
+
+def _as_parquet_chunks(outputs: Dict[str, Any], chunk_size: int) -> Dict[str, Any]:
+    """
+    Wrap the intermediate tables so they are written ``chunk_size`` rows at a time.
+
+    Whole DataFrames are only sliced here: this is for the outputs that are
+    built whole anyway (incremental merges and DuckDB relations), the full
+    builds are chunked from the start by ``process_json_data_chunked``.
+
+    Args:
+        outputs: Node outputs keyed by dataset name
+        chunk_size: Rows per chunk and per Parquet row group
+
+    Returns:
+        Same outputs with the intermediate tables as ``ParquetChunks``
+    """
+    chunked = {}
+    for name, data in outputs.items():
+        if not name.startswith("intermediate_"):
+            chunked[name] = data
+        elif isinstance(data, duckdb.DuckDBPyRelation):
+            chunked[name] = ParquetChunks.from_relation(data, chunk_size)
+        else:
+            chunked[name] = ParquetChunks.from_frame(data, chunk_size)
+    return chunked
+
+
+def process_json_data_incremental(
+    raw_applicants: Mapping[str, Any],
+    raw_vagas: Mapping[str, Any],
+    raw_prospects: Mapping[str, Any],
+    previous_applicants: Optional[pd.DataFrame],
+    previous_vagas: Optional[pd.DataFrame],
+    previous_prospects: Optional[pd.DataFrame],
+    previous_manifest: Optional[pd.DataFrame],
+    previous_quarantine_dates: Optional[pd.DataFrame] = None,
+    record_fixes: Optional[pd.DataFrame] = None,
+    processing: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Process only the JSON records that changed since the last run.
+
+    Every raw record is hashed and compared with the manifest of the previous run.
+    Added and changed records go through ``process_all_json_data``; rows of changed
+    and deleted records are dropped from the previous intermediate data and the
+    fresh rows are appended; the date quarantine is merged the same way. Without
+    a previous manifest or output, with previous output whose dates are still
+    text, or with ``full_rebuild``, every record is processed, ``chunk_size``
+    rows at a time (see ``process_json_data_chunked``).
+
+    Records that fail are written to the record quarantine and left out of the
+    manifest, so they are processed again on the next run. Replayed
+    ``record_fixes`` replace the raw records they were written for.
+
+    Args:
+        raw_applicants: Raw applicants JSON data
+        raw_vagas: Raw job positions JSON data
+        raw_prospects: Raw prospects JSON data
+        previous_applicants: Intermediate applicants from the last run, if any
+        previous_vagas: Intermediate job positions from the last run, if any
+        previous_prospects: Intermediate prospects from the last run, if any
+        previous_manifest: Record hash manifest from the last run, if any
+        previous_quarantine_dates: Date quarantine from the last run, if any
+        record_fixes: Corrected payloads of quarantined records, if any
+        processing: ``processing`` parameters (``engine``, ``incremental``, ``full_rebuild``,
+            ``chunk_size``, ...)
+
+    Returns:
+        Dictionary containing the intermediate tables, as ``ParquetChunks`` of
+        ``chunk_size`` rows, the date and record quarantines and the new manifest
+    """
+    processing = processing or {}
+    chunk_size = int(processing.get("chunk_size", DEFAULT_BATCH_SIZE))
+    if processing.get("engine", "pandas") == "duckdb":
+        if record_fixes is not None and not record_fixes.empty:
+            logger.warning("Record fixes are not applied by the DuckDB engine")
+        outputs = process_json_data_duckdb(raw_applicants, raw_vagas, raw_prospects)
+        # DuckDB reads the files as a whole, it has no per-record failures
+        outputs["quarantine_records"] = pd.DataFrame(columns=DEAD_LETTER_COLUMNS)
+        # DuckDB always rebuilds everything, so the next incremental run starts over
+        outputs["json_ingestion_manifest"] = build_manifest({})
+        return _as_parquet_chunks(outputs, chunk_size)
+
+    raw_applicants = apply_record_fixes(raw_applicants, record_fixes, "applicants")
+    raw_vagas = apply_record_fixes(raw_vagas, record_fixes, "vagas")
+    raw_prospects = apply_record_fixes(raw_prospects, record_fixes, "prospects")
+
+    if not processing.get("incremental", False):
+        outputs = process_json_data_chunked(
+            raw_applicants, raw_vagas, raw_prospects, chunk_size, processing
+        )
+        # An empty manifest makes the next incremental run start from scratch
+        outputs["json_ingestion_manifest"] = build_manifest({})
+        return outputs
+
+    previous_frames = {
+        "applicants": previous_applicants,
+        "vagas": previous_vagas,
+        "prospects": previous_prospects,
     }
+    has_previous_state = (
+        previous_manifest is not None
+        and not previous_manifest.empty
+        and all(frame is not None for frame in previous_frames.values())
+        # Output written before dates were typed can't be merged with new rows
+        and all(has_typed_dates(frame, entity) for entity, frame in previous_frames.items())
+    )
+    full_rebuild = processing.get("full_rebuild", False) or not has_previous_state
+    if full_rebuild:
+        logger.info("Running a full rebuild of the intermediate JSON data")
+        previous_manifest = None
+
+    changes = {
+        "applicants": ChangedRecords(raw_applicants, manifest_hashes(previous_manifest, "applicants")),
+        "vagas": ChangedRecords(raw_vagas, manifest_hashes(previous_manifest, "vagas")),
+        "prospects": ChangedProspects(raw_prospects, manifest_hashes(previous_manifest, "prospects")),
+    }
+    if full_rebuild:
+        # Nothing to merge with, so the tables are built chunk by chunk
+        outputs = process_json_data_chunked(
+            changes["applicants"], changes["vagas"], changes["prospects"], chunk_size, processing
+        )
+        _forget_dead_letters(changes, outputs["quarantine_records"])
+        outputs["json_ingestion_manifest"] = build_manifest(
+            {entity: view.hashes for entity, view in changes.items()}
+        )
+        return outputs
+
+    delta = process_all_json_data(
+        changes["applicants"], changes["vagas"], changes["prospects"], processing
+    )
+
+    dead_letters = delta["quarantine_records"]
+    _forget_dead_letters(changes, dead_letters)
+
+    stale_keys = {entity: view.stale_keys for entity, view in changes.items()}
+
+    outputs = {}
+    for entity, view in changes.items():
+        output_name = f"intermediate_{entity}"
+        previous_df = previous_frames[entity]
+        merged = optimize_dataframe_types(
+            merge_changes(previous_df, delta[output_name], entity, stale_keys[entity])
+        )
+        logger.info(
+            f"Incremental {entity}: {view.changed} added or changed, "
+            f"{view.deleted} deleted, {len(merged)} rows"
+        )
+        outputs[output_name] = merged
+
+    outputs["quarantine_dates"] = merge_quarantine(
+        previous_quarantine_dates, delta["quarantine_dates"], stale_keys
+    )
+    # Failed records are never in the manifest, so this is every current failure
+    outputs["quarantine_records"] = dead_letters
+    outputs["json_ingestion_manifest"] = build_manifest(
+        {entity: view.hashes for entity, view in changes.items()}
+    )
+    return _as_parquet_chunks(outputs, chunk_size)
+
+
+def _forget_dead_letters(changes: Mapping[str, ChangedRecords], dead_letters: pd.DataFrame) -> None:
+    """Leave the records that failed out of the manifest, so the next run retries them."""
+    for entity, view in changes.items():
+        view.forget(dead_letters.loc[dead_letters["entity"] == entity, "record_id"])
+
+
+def replay_quarantined_records(
+    fixed_records: pd.DataFrame,
+    quarantine_records: Optional[pd.DataFrame],
+    previous_record_fixes: Optional[pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Turn corrected quarantined records into record fixes for the ingestion node.
+
+    ``fixed_records`` holds the corrected ``payload`` of quarantined records
+    (``entity``, ``record_id``, ``payload``), typically edited from a copy of
+    the quarantine. Each fix is tied to the hash of the raw payload it replaces,
+    so it stops applying once the raw export itself changes.
+
+    Args:
+        fixed_records: Corrected records
+        quarantine_records: Record quarantine of the last ingestion run
+        previous_record_fixes: Record fixes of earlier replays, if any
+
+    Returns:
+        All record fixes, read by ``process_json_data_incremental``
+    """
+    return build_record_fixes(fixed_records, quarantine_records, previous_record_fixes)
+
+
+def profile_intermediate_data(
+    intermediate_applicants: pd.DataFrame,
+    intermediate_vagas: pd.DataFrame,
+    intermediate_prospects: pd.DataFrame,
+    profiling: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Profile the intermediate tables for the ``data/08_reporting`` artifact.
+
+    Args:
+        intermediate_applicants: Intermediate applicants DataFrame
+        intermediate_vagas: Intermediate job positions DataFrame
+        intermediate_prospects: Intermediate prospects DataFrame
+        profiling: ``profiling`` parameters (``top_k``)
+
+    Returns:
+        Profile with null counts, approximate distinct counts, min/max and
+        top-k values per column of every table
+    """
+    top_k = int((profiling or {}).get("top_k", DEFAULT_TOP_K))
+    return build_profile(
+        {
+            "intermediate_applicants": intermediate_applicants,
+            "intermediate_vagas": intermediate_vagas,
+            "intermediate_prospects": intermediate_prospects,
+        },
+        top_k=top_k,
+    )
 
 
 # Additional utility function for Kedro pipeline
@@ -356,9 +713,11 @@ def validate_dataframe_nulls(df: pd.DataFrame, df_name: str) -> pd.DataFrame:
     Returns:
         Same DataFrame (for pipeline chaining)
     """
-    null_counts = df.isnull().sum()
+    profile = profile_table(df, top_k=0)
+    null_counts = pd.Series({column: stats['nulls'] for column, stats in profile['columns'].items()}, dtype='int64')
     total_nulls = null_counts.sum()
-    null_percentage = (total_nulls / (len(df) * len(df.columns))) * 100
+    cells = len(df) * len(df.columns)
+    null_percentage = (total_nulls / cells) * 100 if cells else 0.0
 
     logger.info(f"{df_name} validation:")
     logger.info(f"  Total records: {len(df)}")
@@ -0,0 +1,100 @@
+"""
+Process-pool helpers to build DataFrames from sharded raw JSON records.
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Executor, Future
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RecordItems = List[Tuple[str, Any]]
+
+
+def iter_shards(items: Iterable[Tuple[str, Any]], shard_size: int) -> Iterator[RecordItems]:
+    """
+    Split a stream of (record id, raw record) pairs into contiguous shards.
+
+    Args:
+        items: Iterable of (record id, raw record) pairs
+        shard_size: Maximum number of records per shard
+
+    Yields:
+        Lists of at most ``shard_size`` pairs, in input order
+    """
+    iterator = iter(items)
+    while True:
+        shard = list(islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def build_frame_sharded(
+    items: Iterable[Tuple[str, Any]],
+    build_shard: Callable[[Iterable[Tuple[str, Any]]], Tuple[pd.DataFrame, ...]],
+    executor: Optional[Executor] = None,
+    shard_size: int = 5000,
+    max_in_flight: int = 2,
+) -> Tuple[pd.DataFrame, ...]:
+    """
+    Build DataFrames from raw records, optionally spreading shards over an executor.
+
+    ``build_shard`` returns a tuple of DataFrames (e.g. the rows and the dead
+    letters of its records). Shards are contiguous runs of input records and each
+    partial frame is concatenated with its counterparts in submission order, so
+    the result is identical whatever the number of workers.
+    At most ``max_in_flight`` shards are submitted at once, which bounds memory
+    when ``items`` is a stream.
+
+    Args:
+        items: Iterable of (record id, raw record) pairs
+        build_shard: Picklable function turning an iterable of pairs into a tuple of DataFrames
+        executor: Process pool to run shards on; None builds everything in-process
+        shard_size: Number of records per shard
+        max_in_flight: Maximum number of shards submitted but not yet collected
+
+    Returns:
+        Tuple of DataFrames, each concatenated from its partial frames in input order
+    """
+    if executor is None:
+        return build_shard(items)
+
+    results = list(iter_frames_sharded(items, build_shard, executor, shard_size, max_in_flight))
+    if not results:
+        return build_shard([])
+    logger.info(f"Built {len(results)} shards of up to {shard_size} records")
+    return tuple(pd.concat(frames, ignore_index=True) for frames in zip(*results))
+
+
+def iter_frames_sharded(
+    items: Iterable[Tuple[str, Any]],
+    build_shard: Callable[[Iterable[Tuple[str, Any]]], Tuple[pd.DataFrame, ...]],
+    executor: Executor,
+    shard_size: int = 5000,
+    max_in_flight: int = 2,
+) -> Iterator[Tuple[pd.DataFrame, ...]]:
+    """
+    Build the DataFrames of each shard of raw records on an executor.
+
+    Args:
+        items: Iterable of (record id, raw record) pairs
+        build_shard: Picklable function turning an iterable of pairs into a tuple of DataFrames
+        executor: Process pool to run shards on
+        shard_size: Number of records per shard
+        max_in_flight: Maximum number of shards submitted but not yet collected
+
+    Yields:
+        Tuple of DataFrames of every shard, in input order
+    """
+    pending: Deque[Future] = deque()
+    for shard in iter_shards(items, shard_size):
+        pending.append(executor.submit(build_shard, shard))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
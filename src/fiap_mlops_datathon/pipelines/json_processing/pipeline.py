@@ -5,7 +5,11 @@ This pipeline orchestrates the data processing flow.
 
 from kedro.pipeline import Pipeline, node, pipeline
 
-from .nodes import process_all_json_data
+from .nodes import (
+    process_json_data_incremental,
+    profile_intermediate_data,
+    replay_quarantined_records,
+)
 
 
 def create_json_to_parquet_pipeline(**kwargs) -> Pipeline:
@@ -16,23 +20,72 @@ def create_json_to_parquet_pipeline(**kwargs) -> Pipeline:
         Kedro pipeline for processing JSON files to Parquet format
     """
     return pipeline([
-        # Process and optimize all data in a single node
+        # Process and optimize all data in a single node, only re-processing
+        # records whose content changed when processing.incremental is on
         node(
-            func=process_all_json_data,
+            func=process_json_data_incremental,
             inputs={
                 "raw_applicants": "raw_applicants",
                 "raw_vagas": "raw_vagas",
-                "raw_prospects": "raw_prospects"
+                "raw_prospects": "raw_prospects",
+                "previous_applicants": "previous_intermediate_applicants",
+                "previous_vagas": "previous_intermediate_vagas",
+                "previous_prospects": "previous_intermediate_prospects",
+                "previous_manifest": "previous_json_ingestion_manifest",
+                "previous_quarantine_dates": "previous_quarantine_dates",
+                "record_fixes": "raw_record_fixes",
+                "processing": "params:processing"
             },
             outputs={
                 "intermediate_applicants": "intermediate_applicants",
                 "intermediate_vagas": "intermediate_vagas",
-                "intermediate_prospects": "intermediate_prospects"
+                "intermediate_prospects": "intermediate_prospects",
+                "quarantine_dates": "quarantine_dates",
+                "quarantine_records": "quarantine_records",
+                "json_ingestion_manifest": "json_ingestion_manifest"
             },
             name="process_raw_data_node",
             tags=["processing", "bronze"]
+        ),
+        # Null counts, approximate distinct counts, min/max and top-k values
+        # of every intermediate column, computed in one scan per table
+        node(
+            func=profile_intermediate_data,
+            inputs={
+                "intermediate_applicants": "intermediate_applicants",
+                "intermediate_vagas": "intermediate_vagas",
+                "intermediate_prospects": "intermediate_prospects",
+                "profiling": "params:profiling"
+            },
+            outputs="intermediate_data_profile",
+            name="profile_intermediate_data_node",
+            tags=["processing", "bronze", "reporting"]
+        )
+    ])
+
+def create_replay_pipeline(**kwargs) -> Pipeline:
+    """
+    Create the pipeline that replays fixed quarantined records through ingestion.
+
+    Returns:
+        Kedro pipeline turning quarantine fixes into record fixes, followed by
+        the JSON to Parquet pipeline that applies them
+    """
+    replay = pipeline([
+        node(
+            func=replay_quarantined_records,
+            inputs={
+                "fixed_records": "quarantine_fixes",
+                "quarantine_records": "previous_quarantine_records",
+                "previous_record_fixes": "previous_raw_record_fixes"
+            },
+            outputs="raw_record_fixes",
+            name="replay_quarantined_records_node",
+            tags=["processing", "bronze", "replay"]
         )
     ])
+    return replay + create_json_to_parquet_pipeline()
+
 
 def create_pipeline(**kwargs) -> Pipeline:
     """
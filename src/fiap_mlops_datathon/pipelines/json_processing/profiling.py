@@ -0,0 +1,145 @@
+"""
+One-pass column profiles computed by DuckDB.
+
+Each table is profiled by a single aggregate query: null counts, approximate
+distinct counts (``approx_count_distinct``, a HyperLogLog sketch), min/max and
+approximate top-k values (``approx_top_k``, a space-saving sketch). Memory
+stays bounded by the sketches, so the profile is cheap enough to compute on
+every run. The result is a small JSON-serialisable dictionary.
+"""
+
+import datetime
+import decimal
+import logging
+import math
+from typing import Any, Dict, Mapping, Optional, Union
+
+import duckdb
+import pandas as pd
+
+from fiap_mlops_datathon.duckdb_session import quote_identifier
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 5
+
+# Longer text values (free text min/max and top-k) are cut in the artifact
+MAX_VALUE_LENGTH = 80
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a DuckDB result value into a compact JSON-serialisable value."""
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH] + '...'
+
+
+def profile_table(
+    data: Union[pd.DataFrame, duckdb.DuckDBPyRelation],
+    top_k: int = DEFAULT_TOP_K,
+    connection: Optional[duckdb.DuckDBPyConnection] = None,
+) -> Dict[str, Any]:
+    """
+    Profile every column of a table in a single scan.
+
+    Args:
+        data: DataFrame or DuckDB relation to profile
+        top_k: Number of most frequent values to keep per column (0 to skip)
+        connection: DuckDB connection to register DataFrames on; a new
+            in-memory one by default (relations always use their own)
+
+    Returns:
+        Dictionary with the row count and, per column, its type, null count and
+        percentage, approximate distinct count, min, max and top-k values
+    """
+    if isinstance(data, duckdb.DuckDBPyRelation):
+        return _profile_relation(data, top_k)
+    if len(data.columns) == 0:
+        # DuckDB can't scan a DataFrame without columns
+        return {'rows': len(data), 'columns': {}}
+
+    con = connection or duckdb.connect(database=":memory:")
+    try:
+        return _profile_relation(con.from_df(data), top_k)
+    finally:
+        if connection is None:
+            con.close()
+
+
+def _profile_relation(relation: duckdb.DuckDBPyRelation, top_k: int) -> Dict[str, Any]:
+    # ENUM types spell out every category, only their kind is kept
+    columns = [
+        (name, 'ENUM' if str(column_type).startswith('ENUM(') else str(column_type))
+        for name, column_type in zip(relation.columns, relation.types)
+    ]
+    aggregates = ["count(*)"]
+    for name, _ in columns:
+        column = quote_identifier(name)
+        aggregates += [
+            f"count({column})",
+            f"approx_count_distinct({column})",
+            f"min({column})",
+            f"max({column})",
+        ]
+        if top_k > 0:
+            aggregates.append(f"approx_top_k({column}, {int(top_k)})")
+
+    stats = relation.aggregate(", ".join(aggregates)).fetchone()
+    rows = stats[0]
+    width = 5 if top_k > 0 else 4
+
+    profile_columns = {}
+    for i, (name, column_type) in enumerate(columns):
+        values = stats[1 + i * width:1 + (i + 1) * width]
+        nulls = rows - values[0]
+        profile_columns[name] = {
+            'type': column_type,
+            'nulls': nulls,
+            'null_pct': round(100 * nulls / rows, 2) if rows else 0.0,
+            'distinct_approx': values[1],
+            'min': _json_value(values[2]),
+            'max': _json_value(values[3]),
+        }
+        if top_k > 0:
+            profile_columns[name]['top_k'] = _json_value(values[4])
+    return {'rows': rows, 'columns': profile_columns}
+
+
+def build_profile(
+    tables: Mapping[str, Union[pd.DataFrame, duckdb.DuckDBPyRelation]], top_k: int = DEFAULT_TOP_K
+) -> Dict[str, Any]:
+    """
+    Profile several tables and log a null summary for each of them.
+
+    Args:
+        tables: Mapping of table name to DataFrame or DuckDB relation
+        top_k: Number of most frequent values to keep per column
+
+    Returns:
+        Profile artifact: ``{'tables': {name: table profile}}``
+    """
+    con = duckdb.connect(database=":memory:")
+    try:
+        profiles = {name: profile_table(data, top_k, connection=con) for name, data in tables.items()}
+    finally:
+        con.close()
+
+    for name, profile in profiles.items():
+        null_counts = {column: stats['nulls'] for column, stats in profile['columns'].items()}
+        cells = profile['rows'] * len(null_counts)
+        total_nulls = sum(null_counts.values())
+        null_percentage = 100 * total_nulls / cells if cells else 0.0
+        logger.info(
+            f"Profiled {name}: {profile['rows']} rows, {total_nulls} null values "
+            f"({null_percentage:.2f}%)"
+        )
+    return {'tables': profiles}
@@ -0,0 +1,135 @@
+"""
+Declarative field specifications for the raw JSON exports.
+
+Each table maps an output column to the path of the value inside one raw record.
+Paths are tuples of keys: ``('infos_basicas', 'nome')`` reads
+``record['infos_basicas']['nome']`` and ``('cv_pt',)`` reads ``record['cv_pt']``.
+"""
+
+from typing import Any, Dict, Mapping, Tuple
+
+FieldSpec = Dict[str, Tuple[str, ...]]
+
+APPLICANT_FIELDS: FieldSpec = {
+    # Basic information
+    'nome': ('infos_basicas', 'nome'),
+    'email': ('infos_basicas', 'email'),
+    'telefone': ('infos_basicas', 'telefone'),
+    'telefone_recado': ('infos_basicas', 'telefone_recado'),
+    'data_criacao': ('infos_basicas', 'data_criacao'),
+    'data_atualizacao': ('infos_basicas', 'data_atualizacao'),
+    'inserido_por': ('infos_basicas', 'inserido_por'),
+    'codigo_profissional': ('infos_basicas', 'codigo_profissional'),
+    'objetivo_profissional': ('infos_basicas', 'objetivo_profissional'),
+
+    # Personal information
+    'cpf': ('informacoes_pessoais', 'cpf'),
+    'data_nascimento': ('informacoes_pessoais', 'data_nascimento'),
+    'sexo': ('informacoes_pessoais', 'sexo'),
+    'estado_civil': ('informacoes_pessoais', 'estado_civil'),
+    'pcd': ('informacoes_pessoais', 'pcd'),
+    'endereco': ('informacoes_pessoais', 'endereco'),
+    'linkedin': ('informacoes_pessoais', 'url_linkedin'),
+    'facebook': ('informacoes_pessoais', 'facebook'),
+    'skype': ('informacoes_pessoais', 'skype'),
+
+    # Professional information
+    'titulo_profissional': ('informacoes_profissionais', 'titulo_profissional'),
+    'area_atuacao': ('informacoes_profissionais', 'area_atuacao'),
+    'conhecimentos_tecnicos': ('informacoes_profissionais', 'conhecimentos_tecnicos'),
+    'certificacoes': ('informacoes_profissionais', 'certificacoes'),
+    'remuneracao': ('informacoes_profissionais', 'remuneracao'),
+    'nivel_profissional': ('informacoes_profissionais', 'nivel_profissional'),
+
+    # Education and languages
+    'nivel_academico': ('formacao_e_idiomas', 'nivel_academico'),
+    'nivel_ingles': ('formacao_e_idiomas', 'nivel_ingles'),
+    'nivel_espanhol': ('formacao_e_idiomas', 'nivel_espanhol'),
+    'outro_idioma': ('formacao_e_idiomas', 'outro_idioma'),
+
+    # CV files
+    'cv_pt': ('cv_pt',),
+    'cv_en': ('cv_en',),
+}
+
+VAGA_FIELDS: FieldSpec = {
+    # Basic information
+    'titulo_vaga': ('informacoes_basicas', 'titulo_vaga'),
+    'cliente': ('informacoes_basicas', 'cliente'),
+    'solicitante_cliente': ('informacoes_basicas', 'solicitante_cliente'),
+    'empresa_divisao': ('informacoes_basicas', 'empresa_divisao'),
+    'requisitante': ('informacoes_basicas', 'requisitante'),
+    'analista_responsavel': ('informacoes_basicas', 'analista_responsavel'),
+    'tipo_contratacao': ('informacoes_basicas', 'tipo_contratacao'),
+    'data_requicisao': ('informacoes_basicas', 'data_requicisao'),
+    'limite_contratacao': ('informacoes_basicas', 'limite_esperado_para_contratacao'),
+    'vaga_sap': ('informacoes_basicas', 'vaga_sap'),
+    'prazo_contratacao': ('informacoes_basicas', 'prazo_contratacao'),
+    'objetivo_vaga': ('informacoes_basicas', 'objetivo_vaga'),
+    'prioridade_vaga': ('informacoes_basicas', 'prioridade_vaga'),
+    'origem_vaga': ('informacoes_basicas', 'origem_vaga'),
+
+    # Job profile
+    'pais': ('perfil_vaga', 'pais'),
+    'estado': ('perfil_vaga', 'estado'),
+    'cidade': ('perfil_vaga', 'cidade'),
+    'bairro': ('perfil_vaga', 'bairro'),
+    'local_trabalho': ('perfil_vaga', 'local_trabalho'),
+    'vaga_pcd': ('perfil_vaga', 'vaga_especifica_para_pcd'),
+    'faixa_etaria': ('perfil_vaga', 'faixa_etaria'),
+    'horario_trabalho': ('perfil_vaga', 'horario_trabalho'),
+    'nivel_profissional': ('perfil_vaga', 'nivel profissional'),
+    'nivel_academico': ('perfil_vaga', 'nivel_academico'),
+    'nivel_ingles': ('perfil_vaga', 'nivel_ingles'),
+    'nivel_espanhol': ('perfil_vaga', 'nivel_espanhol'),
+    'outro_idioma': ('perfil_vaga', 'outro_idioma'),
+    'areas_atuacao': ('perfil_vaga', 'areas_atuacao'),
+    'principais_atividades': ('perfil_vaga', 'principais_atividades'),
+    'competencias': ('perfil_vaga', 'competencia_tecnicas_e_comportamentais'),
+    'observacoes': ('perfil_vaga', 'demais_observacoes'),
+    'viagens_requeridas': ('perfil_vaga', 'viagens_requeridas'),
+    'equipamentos_necessarios': ('perfil_vaga', 'equipamentos_necessarios'),
+
+    # Benefits
+    'valor_venda': ('beneficios', 'valor_venda'),
+    'valor_compra_1': ('beneficios', 'valor_compra_1'),
+    'valor_compra_2': ('beneficios', 'valor_compra_2'),
+}
+
+# Prospects are nested: each vaga record holds a list of candidate prospects.
+# Parent fields are repeated on every prospect row, after the ``prospect_id``.
+PROSPECT_LIST_KEY = 'prospects'
+
+PROSPECT_PARENT_FIELDS: FieldSpec = {
+    'titulo': ('titulo',),
+    'modalidade': ('modalidade',),
+}
+
+PROSPECT_FIELDS: FieldSpec = {
+    'nome': ('nome',),
+    'codigo': ('codigo',),
+    'situacao_candidado': ('situacao_candidado',),
+    'data_candidatura': ('data_candidatura',),
+    'ultima_atualizacao': ('ultima_atualizacao',),
+    'comentario': ('comentario',),
+    'recrutador': ('recrutador',),
+}
+
+
+def get_path(record: Mapping[str, Any], path: Tuple[str, ...]) -> Any:
+    """
+    Read a nested value from a raw record, returning None when any key is missing.
+
+    Args:
+        record: Raw record dictionary
+        path: Tuple of keys leading to the value
+
+    Returns:
+        The value at ``path`` or None
+    """
+    value: Any = record
+    for key in path:
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+    return value
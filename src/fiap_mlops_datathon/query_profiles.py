@@ -0,0 +1,284 @@
+"""
+DuckDB query profiles of the SQL nodes.
+
+With ``query_profiling.enabled`` the SQL nodes run their query with DuckDB's
+profiler on and save the JSON profile to ``<directory>/<run>/<query>.json``:
+the query's latency, CPU time, rows and peak buffer memory over the plan, a
+tree of operators with their timing, cardinality and details (join type and
+conditions, estimated cardinality, filters...). Tables written by DuckDB
+itself (``primary_writer: duckdb``) and cached tables are not profiled,
+which is logged. Every run gets its own directory, named by its start time,
+so two runs can be compared to catch plan regressions:
+
+    fiap-mlops-datathon query-profiles list
+    fiap-mlops-datathon query-profiles diff [RUN_A] [RUN_B]
+
+(or ``python -m fiap_mlops_datathon.query_profiles``).
+
+``diff`` compares the two latest runs by default, or a given baseline run
+with the latest one. It reports the plans that
+changed and the queries and operators that got slower or whose cardinality
+moved, and exits with status 1 when a plan changed or a query got slower by
+more than ``--threshold``, so it can gate a CI job.
+"""
+
+import difflib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import click
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+SETTINGS = ("enabled", "directory")
+
+DEFAULT_DIRECTORY = "data/08_reporting/query_profiles"
+
+# Directory of the current run's profiles, None while profiling is disabled
+_run_directory: Optional[Path] = None
+_lock = threading.Lock()
+
+
+def configure(settings: Optional[Mapping[str, Any]], run_id: Optional[str] = None) -> None:
+    """
+    Enable profiling with the ``query_profiling`` parameters, or disable it.
+
+    Args:
+        settings: ``enabled`` and ``directory`` of the profiles
+        run_id: Name of the run's directory; the current time by default
+    """
+    global _run_directory
+    settings = settings or {}
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown query profiling settings: {sorted(unknown)}")
+    if not settings.get("enabled", False):
+        _run_directory = None
+        return
+    run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+    _run_directory = Path(settings.get("directory") or DEFAULT_DIRECTORY) / run_id
+
+
+def skipped(query_name: str, reason: str) -> None:
+    """Log that a query is not profiled while profiling is enabled, and why."""
+    if _run_directory is not None:
+        logger.info(f"No query profile for {query_name}: {reason}")
+
+
+def _file_name(query_name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", query_name).strip("_") + ".json"
+
+
+@contextmanager
+def profiled(con: duckdb.DuckDBPyConnection, query_name: Optional[str]) -> Iterator[None]:
+    """
+    Profile the last statement run on ``con`` in the block and save its profile.
+
+    Profiling settings are per cursor, so concurrent nodes profile their own
+    queries. Nothing is profiled when profiling is disabled or ``query_name``
+    is None, or saved when the block raises.
+
+    Args:
+        con: DuckDB cursor the statement runs on
+        query_name: Name of the profile file
+    """
+    run_directory = _run_directory
+    if run_directory is None or query_name is None:
+        yield
+        return
+
+    con.execute("SET enable_profiling = 'no_output'")
+    try:
+        yield
+        profile = json.loads(con.get_profiling_information(format="json"))
+    finally:
+        con.execute("PRAGMA disable_profiling")
+
+    path = run_directory / _file_name(query_name)
+    with _lock:
+        run_directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+    logger.info(
+        f"Saved query profile of {query_name} to {path} "
+        f"({profile.get('latency', 0.0):.3f}s, {len(operators(profile))} operators)"
+    )
+
+
+def operators(profile: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten the operator tree of a profile, parents before their children.
+
+    Args:
+        profile: JSON profile of one query
+
+    Returns:
+        One dict per operator with its ``depth``, ``operator`` name, ``timing``
+        in seconds, ``cardinality`` (rows produced) and ``details``
+    """
+    flat = []
+
+    def visit(node: Mapping[str, Any], depth: int) -> None:
+        for child in node.get("children", []):
+            flat.append({
+                "depth": depth,
+                "operator": child.get("operator_name") or child.get("operator_type", "?"),
+                "timing": child.get("operator_timing", 0.0),
+                "cardinality": child.get("operator_cardinality", 0),
+                "details": child.get("extra_info", {}),
+            })
+            visit(child, depth + 1)
+
+    visit(profile, 0)
+    return flat
+
+
+def plan_lines(profile: Mapping[str, Any]) -> List[str]:
+    """Return the plan of a profile as indented operator names, one per line."""
+    return [f"{'  ' * op['depth']}{op['operator']}" for op in operators(profile)]
+
+
+def list_runs(directory: str = DEFAULT_DIRECTORY) -> List[Path]:
+    """Return the run directories holding profiles, oldest first."""
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.iterdir() if path.is_dir() and any(path.glob("*.json")))
+
+
+def load_run(run_directory: Path) -> Dict[str, Dict[str, Any]]:
+    """Load the profiles of a run, by query (file name without ``.json``)."""
+    return {
+        path.stem: json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(Path(run_directory).glob("*.json"))
+    }
+
+
+def diff_runs(
+    before: Mapping[str, Mapping[str, Any]],
+    after: Mapping[str, Mapping[str, Any]],
+    threshold: float = 1.5,
+    min_seconds: float = 0.01,
+) -> Tuple[List[str], int]:
+    """
+    Compare the query profiles of two runs.
+
+    Args:
+        before: Profiles of the baseline run, by query
+        after: Profiles of the run to check, by query
+        threshold: Slowdown ratio from which a query or operator is reported
+        min_seconds: Slowdowns smaller than this are timing noise
+
+    Returns:
+        Report lines and the number of regressions: changed plans and
+        queries slower than ``threshold``
+    """
+    lines = []
+    regressions = 0
+
+    def slower(old: float, new: float) -> bool:
+        return new - old >= min_seconds and new >= threshold * old
+
+    for query in sorted(set(before) | set(after)):
+        if query not in after:
+            lines.append(f"{query}: only in the baseline run (skipped or cached?)")
+            continue
+        if query not in before:
+            lines.append(f"{query}: new query")
+            continue
+
+        old, new = before[query], after[query]
+        old_latency, new_latency = old.get("latency", 0.0), new.get("latency", 0.0)
+        summary = f"{query}: {old_latency:.3f}s -> {new_latency:.3f}s"
+        if old.get("rows_returned") != new.get("rows_returned"):
+            summary += f", {old.get('rows_returned')} -> {new.get('rows_returned')} rows"
+        if slower(old_latency, new_latency):
+            regressions += 1
+            summary += " REGRESSION"
+        lines.append(summary)
+
+        old_plan, new_plan = plan_lines(old), plan_lines(new)
+        if old_plan != new_plan:
+            regressions += 1
+            lines.append("  plan changed:")
+            lines.extend(
+                f"    {line}" for line in difflib.unified_diff(old_plan, new_plan, lineterm="", n=1)
+                if not line.startswith(("---", "+++"))
+            )
+            continue
+
+        # Same plan: operators line up one to one
+        for i, (old_op, new_op) in enumerate(zip(operators(old), operators(new))):
+            name = f"#{i} {old_op['operator']}"
+            if slower(old_op["timing"], new_op["timing"]):
+                lines.append(f"  {name} slower: {old_op['timing']:.3f}s -> {new_op['timing']:.3f}s")
+            if old_op["cardinality"] != new_op["cardinality"]:
+                lines.append(f"  {name} rows: {old_op['cardinality']} -> {new_op['cardinality']}")
+
+    return lines, regressions
+
+
+@click.group(name="query-profiles")
+@click.option("--directory", default=DEFAULT_DIRECTORY, show_default=True,
+              help="Profiles directory")
+@click.pass_context
+def main(ctx: click.Context, directory: str) -> None:
+    """Inspect and compare DuckDB query profiles."""
+    ctx.obj = directory
+
+
+@main.command(name="list")
+@click.pass_obj
+def list_command(directory: str) -> None:
+    """List the profiled runs."""
+    for run in list_runs(directory):
+        profiles = load_run(run)
+        latency = sum(profile.get("latency", 0.0) for profile in profiles.values())
+        click.echo(f"{run.name}: {len(profiles)} queries, {latency:.3f}s")
+
+
+@main.command()
+@click.argument("runs", nargs=-1)
+@click.option("--threshold", type=float, default=1.5, show_default=True,
+              help="Slowdown ratio to report")
+@click.option("--min-seconds", type=float, default=0.01, show_default=True,
+              help="Ignore smaller slowdowns")
+@click.pass_obj
+def diff(directory: str, runs: Tuple[str, ...], threshold: float, min_seconds: float) -> None:
+    """
+    Compare two runs, the two latest by default.
+
+    RUNS are the baseline and checked run directories or names; a single run
+    is the baseline of the latest one. Exits with status 1 on regressions.
+    """
+    if len(runs) > 2:
+        raise click.UsageError("diff takes at most two runs")
+    profiled_runs = list_runs(directory)
+    selected = [Path(run) if Path(run).is_dir() else Path(directory) / run for run in runs]
+    if not selected:
+        selected = profiled_runs[-2:]
+    elif len(selected) == 1 and profiled_runs:
+        selected.append(profiled_runs[-1])
+    if len(selected) < 2:
+        raise click.UsageError(
+            f"need two profiled runs, found {len(profiled_runs)} in {directory}"
+        )
+    baseline, checked = selected
+    lines, regressions = diff_runs(load_run(baseline), load_run(checked), threshold, min_seconds)
+    click.echo(f"{baseline.name} -> {checked.name}")
+    for line in lines:
+        click.echo(line)
+    click.echo(f"{regressions} regression(s)")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
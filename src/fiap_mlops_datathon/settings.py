@@ -3,10 +3,22 @@ from the Kedro defaults. For further information, including these default values
 https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 
 # Instantiated project hooks.
-# For example, after creating a hooks.py and defining a ProjectHooks class there, do
-# from fiap_mlops_datathon.hooks import ProjectHooks
 # Hooks are executed in a Last-In-First-Out (LIFO) order.
-# HOOKS = (ProjectHooks(),)
+from fiap_mlops_datathon.hooks import (  # noqa: E402
+    DuckDBHooks,
+    NodeTimingHooks,
+    QueryProfilingHooks,
+    SQLCacheHooks,
+    SQLTemplateHooks,
+)
+
+HOOKS = (
+    DuckDBHooks(),
+    SQLTemplateHooks(),
+    SQLCacheHooks(),
+    QueryProfilingHooks(),
+    NodeTimingHooks(),
+)
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
@@ -0,0 +1,252 @@
+"""
+Content-addressed cache of the SQL node outputs.
+
+A SQL node whose query text, DuckDB version and settings, output settings
+and input files are all unchanged since an earlier run would write the very
+same Parquet file again. Those components are hashed into a cache key; on a
+hit the node returns a ``CachedParquet`` instead of running its query, and
+``DuckDBParquetDataset`` links the cached file into place. On a miss the
+output is stored in the cache once its dataset has saved it (``SQLCacheHooks``).
+
+Input files are fingerprinted by their size and Parquet footer (schema, row
+group offsets and statistics) rather than their modification time, so an
+input rewritten with identical content, e.g. a primary table recomputed
+from unchanged data, still hits. Entries live in ``directory`` as
+``<key>.parquet`` with a ``<key>.json`` sidecar whose modification time is
+the last use; the least recently used entries are evicted once the cache
+exceeds ``max_size_mb``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import duckdb
+from kedro.io import DataCatalog
+from kedro.io.core import get_filepath_str
+from kedro_datasets.pandas import ParquetDataset
+
+from fiap_mlops_datathon import duckdb_session
+from fiap_mlops_datathon.datasets import CachedParquet
+
+logger = logging.getLogger(__name__)
+
+SETTINGS = ("enabled", "directory", "max_size_mb")
+
+# Bumped whenever the key components change
+CACHE_VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+def parquet_fingerprint(path: PathLike) -> Optional[str]:
+    """
+    Fingerprint a Parquet file, or the files of a partitioned directory.
+
+    Args:
+        path: Parquet file or directory
+
+    Returns:
+        Hex digest of the file sizes and footers, or None if nothing exists at ``path``
+    """
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(path.rglob("*.parquet"))
+    elif path.is_file():
+        files = [path]
+    else:
+        return None
+
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        size = file.stat().st_size
+        digest.update(str(file.relative_to(path) if file != path else "").encode("utf-8"))
+        digest.update(size.to_bytes(8, "little"))
+        with open(file, "rb") as f:
+            # A Parquet file ends with its footer, the footer length and "PAR1"
+            f.seek(max(size - 8, 0))
+            footer_length = int.from_bytes(f.read(4), "little")
+            f.seek(max(size - 8 - footer_length, 0))
+            digest.update(f.read(footer_length))
+    return digest.hexdigest()
+
+
+class SQLCache:
+    """Directory of cached Parquet outputs with LRU eviction by disk budget."""
+
+    def __init__(self, directory: PathLike, max_size_mb: float = 2048):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_size_mb * 1024**2)
+        self._lock = threading.Lock()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.directory / f"{key}.parquet", self.directory / f"{key}.json"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the cached file of ``key``, marking it as used, or None."""
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            # An entry modified behind the cache's back is dropped
+            if parquet_fingerprint(data_path) != meta.get("fingerprint"):
+                self._remove(key)
+                return None
+            os.utime(meta_path)
+        return data_path
+
+    def store(self, key: str, source: PathLike) -> None:
+        """Add the Parquet file ``source`` as the entry of ``key`` and evict over budget."""
+        source = Path(source)
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = data_path.with_suffix(".tmp")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                shutil.copy2(source, tmp_path)
+            os.replace(tmp_path, data_path)
+            meta = {
+                "fingerprint": parquet_fingerprint(data_path),
+                "size": data_path.stat().st_size,
+                "source": str(source),
+                "stored_at": time.time(),
+            }
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            self._evict()
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            if path.exists():
+                path.unlink()
+
+    def _evict(self) -> None:
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            try:
+                size = json.loads(meta_path.read_text(encoding="utf-8"))["size"]
+            except (OSError, ValueError, KeyError):
+                size = 0
+            entries.append((meta_path.stat().st_mtime, meta_path.stem, size))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            logger.info(f"Evicted SQL cache entry {key} ({size / 1024**2:.2f} MB)")
+
+
+_cache: Optional[SQLCache] = None
+# Local Parquet datasets of the catalog: filepath and save_args
+_datasets: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+# Output dataset name -> key of the result its node computed, stored once saved
+_pending: Dict[str, str] = {}
+_pending_lock = threading.Lock()
+
+
+def configure(settings: Optional[Mapping[str, Any]]) -> None:
+    """Enable the cache with the ``sql_cache`` parameters, or disable it."""
+    global _cache
+    settings = settings or {}
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown SQL cache settings: {sorted(unknown)}")
+    if not settings.get("enabled", False):
+        _cache = None
+        return
+    _cache = SQLCache(
+        settings.get("directory") or "data/09_cache/sql", settings.get("max_size_mb") or 2048
+    )
+
+
+def register_catalog(catalog: DataCatalog) -> None:
+    """Record the local Parquet datasets of ``catalog``, the inputs and outputs the cache knows."""
+    global _datasets
+    datasets = {}
+    for name in catalog.list():
+        dataset = catalog._get_dataset(name)
+        if isinstance(dataset, ParquetDataset) and dataset._protocol == "file":
+            filepath = get_filepath_str(dataset._get_load_path(), dataset._protocol)
+            datasets[name] = (filepath, dict(dataset._save_args))
+    _datasets = datasets
+
+
+def cache_key(
+    sql_query: str, inputs: Iterable[str], output: str, options: Mapping[str, Any]
+) -> Optional[str]:
+    """
+    Compute the cache key of a SQL node, if its inputs and output can be cached.
+
+    Args:
+        sql_query: SQL text (template) of the node
+        inputs: Names of the datasets the query reads
+        output: Name of the dataset the result is saved to
+        options: Settings changing the written file (writer, chunk size...)
+
+    Returns:
+        Hex digest, or None when the cache is disabled or a dataset is not a
+        local Parquet dataset of the catalog
+    """
+    if _cache is None or output not in _datasets:
+        return None
+    fingerprints = {}
+    for name in sorted(set(inputs)):
+        if name not in _datasets:
+            return None
+        fingerprints[name] = parquet_fingerprint(_datasets[name][0])
+    components = {
+        "version": CACHE_VERSION,
+        "sql": sql_query,
+        "duckdb": duckdb.__version__,
+        "duckdb_settings": duckdb_session.settings(),
+        "options": dict(options),
+        "output": output,
+        "save_args": _datasets[output][1],
+        "inputs": fingerprints,
+    }
+    payload = json.dumps(components, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def lookup(key: Optional[str]) -> Optional[CachedParquet]:
+    """Return the cached output of ``key`` if there is one."""
+    if key is None or _cache is None:
+        return None
+    path = _cache.lookup(key)
+    return None if path is None else CachedParquet(path)
+
+
+def expect(output: str, key: Optional[str]) -> None:
+    """Store the output of ``output`` under ``key`` once its dataset has saved it."""
+    if key is None:
+        return
+    with _pending_lock:
+        _pending[output] = key
+
+
+def saved(dataset_name: str) -> None:
+    """Store a freshly saved output expected by ``expect``."""
+    with _pending_lock:
+        key = _pending.pop(dataset_name, None)
+    if key is None or _cache is None:
+        return
+    _cache.store(key, _datasets[dataset_name][0])
+    logger.info(f"Stored {dataset_name} in the SQL cache as {key}")
+
+
+def discard_pending() -> None:
+    """Forget the outputs expected by a run that failed."""
+    with _pending_lock:
+        _pending.clear()
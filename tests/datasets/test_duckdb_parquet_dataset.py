@@ -0,0 +1,112 @@
+"""
+Tests for DuckDBParquetDataset chunked writes.
+"""
+import duckdb
+import pytest
+import pandas as pd
+import pyarrow.parquet as pq
+
+from fiap_mlops_datathon.datasets import DuckDBParquetDataset, ParquetChunks
+
+
+def _row_groups(filepath) -> list:
+    metadata = pq.ParquetFile(filepath).metadata
+    return [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+
+
+class TestParquetChunks:
+    def test_frame_chunks_are_row_groups(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        df = pd.DataFrame({
+            "id": range(250),
+            # All null in the last chunk: the schema comes from the whole frame
+            "nome": ["a"] * 200 + [None] * 50,
+            "nivel": pd.Categorical(["junior", "senior"] * 125),
+        })
+        dataset = DuckDBParquetDataset(filepath=str(filepath), save_args={"engine": "pyarrow"})
+
+        dataset.save(ParquetChunks.from_frame(df, chunk_size=100))
+
+        assert _row_groups(filepath) == [100, 100, 50]
+        pd.testing.assert_frame_equal(dataset.load(), df)
+
+    def test_empty_frame_keeps_schema(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        df = pd.DataFrame({"id": pd.Series([], dtype="int64")})
+        dataset = DuckDBParquetDataset(filepath=str(filepath))
+
+        dataset.save(ParquetChunks.from_frame(df, chunk_size=100))
+
+        assert list(dataset.load().columns) == ["id"]
+
+
+class TestCompression:
+    def test_relation_copy_uses_compression_level(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        dataset = DuckDBParquetDataset(
+            filepath=str(filepath),
+            save_args={"compression": "zstd", "compression_level": 9, "engine": "pyarrow"},
+        )
+
+        dataset.save(duckdb.sql("SELECT range AS id FROM range(5000)"))
+
+        column = pq.ParquetFile(filepath).metadata.row_group(0).column(0)
+        assert column.compression == "ZSTD"
+        assert len(dataset.load()) == 5000
+
+    def test_relation_copy_warns_about_ignored_bloom_filters(self, tmp_path, caplog):
+        dataset = DuckDBParquetDataset(
+            filepath=str(tmp_path / "table.parquet"),
+            save_args={"write_page_index": True, "bloom_filter_options": {"id": {"ndv": 10}}},
+        )
+
+        dataset.save(duckdb.sql("SELECT range AS id FROM range(10)"))
+
+        assert "ignores save_args ['bloom_filter_options', 'write_page_index']" in caplog.text
+
+    def test_chunks_use_column_encodings(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        df = pd.DataFrame({"score": [0.5, 1.5] * 50, "nivel": ["junior", "senior"] * 50})
+        dataset = DuckDBParquetDataset(
+            filepath=str(filepath),
+            save_args={
+                "compression": "zstd",
+                "use_dictionary": ["nivel"],
+                "column_encoding": {"score": "BYTE_STREAM_SPLIT"},
+            },
+        )
+
+        dataset.save(ParquetChunks.from_frame(df, chunk_size=100))
+
+        row_group = pq.ParquetFile(filepath).metadata.row_group(0)
+        assert "BYTE_STREAM_SPLIT" in row_group.column(0).encodings
+        assert "RLE_DICTIONARY" in row_group.column(1).encodings
+
+
+class TestAtomicWrites:
+    def test_failed_chunked_save_keeps_the_previous_file(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        dataset = DuckDBParquetDataset(filepath=str(filepath))
+        previous = pd.DataFrame({"id": range(10)})
+        dataset.save(ParquetChunks.from_frame(previous, chunk_size=5))
+
+        def failing_chunks():
+            yield pd.DataFrame({"id": range(5)})
+            raise RuntimeError("upstream failure")
+
+        with pytest.raises(Exception, match="upstream failure"):
+            dataset.save(ParquetChunks(failing_chunks, chunk_size=5))
+
+        pd.testing.assert_frame_equal(dataset.load(), previous)
+        assert [path.name for path in tmp_path.iterdir()] == ["table.parquet"]
+
+    def test_failed_relation_copy_keeps_the_previous_file(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        dataset = DuckDBParquetDataset(filepath=str(filepath))
+        dataset.save(duckdb.sql("SELECT range AS id FROM range(10)"))
+
+        with pytest.raises(Exception, match="Could not convert"):
+            dataset.save(duckdb.sql("SELECT CAST('x' || range AS INTEGER) AS id FROM range(10)"))
+
+        assert len(dataset.load()) == 10
+        assert [path.name for path in tmp_path.iterdir()] == ["table.parquet"]
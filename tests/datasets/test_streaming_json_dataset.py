@@ -0,0 +1,46 @@
+"""
+Tests for StreamingJSONDataset's incremental parser.
+"""
+import json
+
+import pytest
+from kedro.io import DatasetError
+
+from fiap_mlops_datathon.datasets import StreamingJSONDataset
+
+RECORDS = {
+    "1": {"nome": "Ana", "cv_pt": "experiência em python " * 5, "nota": 12345.678},
+    "2": {"nome": "Bruno \"Bê\" \\ Silva", "tags": ["a", "b"], "ativo": True},
+    "3": {},
+}
+
+
+def _stream(tmp_path, text, chunk_size):
+    filepath = tmp_path / "records.json"
+    filepath.write_text(text, encoding="utf-8")
+    return StreamingJSONDataset(filepath=str(filepath), chunk_size=chunk_size).load()
+
+
+class TestStreamingJSONDataset:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+    def test_small_chunks_parse_values_spanning_refills(self, tmp_path, chunk_size):
+        text = json.dumps(RECORDS, ensure_ascii=False, indent=2)
+        # A string value that starts in one chunk and ends in a later one
+        assert chunk_size < len(RECORDS["1"]["cv_pt"])
+
+        stream = _stream(tmp_path, text + "\n", chunk_size)
+
+        assert dict(stream.items()) == RECORDS
+        assert list(stream.keys()) == ["1", "2", "3"]
+
+    @pytest.mark.parametrize("chunk_size", [1, 4, 1 << 20])
+    def test_trailing_garbage_raises(self, tmp_path, chunk_size):
+        stream = _stream(tmp_path, json.dumps(RECORDS) + ' {"4": {}}', chunk_size)
+
+        with pytest.raises(DatasetError, match="Unexpected data after the JSON document"):
+            list(stream.items())
+
+    def test_empty_object_and_truncated_document(self, tmp_path):
+        assert list(_stream(tmp_path, " {} \n", 1).items()) == []
+        with pytest.raises(DatasetError, match="Unexpected end of JSON document"):
+            list(_stream(tmp_path, json.dumps(RECORDS)[:-1], 3).items())
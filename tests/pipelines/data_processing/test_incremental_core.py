@@ -0,0 +1,123 @@
+"""
+Tests for the incremental core join.
+"""
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from fiap_mlops_datathon.pipelines.data_processing import nodes
+from fiap_mlops_datathon.pipelines.data_processing.incremental_core import record_manifest
+
+CORE_SQL = (
+    Path(nodes.__file__).parent / "materialize_primary" / "core_applicants_jobs_prospects.sql"
+).read_text(encoding="utf-8")
+
+VAGA_COLUMNS = [
+    "titulo_vaga", "cliente", "vaga_sap", "nivel_profissional_vaga", "nivel_academico_vaga",
+    "nivel_ingles_vaga", "nivel_espanhol_vaga", "areas_atuacao", "principais_atividades",
+    "competencias", "estado", "cidade",
+]
+APPLICANT_COLUMNS = [
+    "email", "area_atuacao", "nivel_profissional_candidato", "nivel_academico_candidato",
+    "nivel_ingles_candidato", "nivel_espanhol_candidato", "conhecimentos_tecnicos", "cv_pt",
+]
+PROCESSING = {"incremental": True, "dtype_backend": "pyarrow"}
+
+
+def primary_tables(applicant_names, updated):
+    # Vaga 4 has no prospects and never changes
+    vagas = pd.DataFrame({"vaga_id": [1, 2, 3, 4], **{c: "x" for c in VAGA_COLUMNS}})
+    prospects = pd.DataFrame({
+        "prospect_id": [1, 1, 2, 3],
+        "codigo": [10, 11, 11, 12],
+        "nome_candidato": ["A", "B", "B", "C"],
+        "situacao_candidado": ["Prospect", "Contratado", "Prospect", "Prospect"],
+        "data_candidatura": pd.to_datetime(["2021-01-01"] * 4),
+        "ultima_atualizacao": pd.to_datetime(["2021-02-01", "2021-02-01", "2021-02-01", updated]),
+        "comentario": "",
+        "recrutador": "R",
+    })
+    applicants = pd.DataFrame({
+        "prospect_codigo": [10, 11, 12], "nome": applicant_names, **{c: "y" for c in APPLICANT_COLUMNS}
+    })
+    return {"primary_prospects": prospects, "primary_vagas": vagas, "primary_applicants": applicants}
+
+
+def manifest(applicant_11_hash):
+    return pd.DataFrame({
+        "entity": ["vagas", "applicants", "applicants", "prospects"],
+        "key": ["1", "10", "11", "3/12"],
+        "hash": ["h1", "h10", applicant_11_hash, "h312"],
+    })
+
+
+def previous_manifest(records, previous):
+    """Record hashes of the previous run with the build entries of its core."""
+    return pd.concat([records, previous["primary_core_manifest"]], ignore_index=True)
+
+
+class TestIncrementalCore:
+    def test_recomputes_changed_vagas_only(self, caplog):
+        caplog.set_level(logging.INFO, logger=nodes.__name__)
+        before = primary_tables(["A", "B", "C"], "2021-02-01")
+        previous = nodes.process_core_primary(CORE_SQL, **before, processing=PROCESSING)
+        # Applicant 11 (vagas 1 and 2) changes and prospect 12 (vaga 3) is updated
+        after = primary_tables(["A", "B2", "C"], "2021-03-01")
+
+        merged = nodes.process_core_primary(
+            CORE_SQL,
+            **after,
+            processing=PROCESSING,
+            previous_primary_core=previous["primary_core"],
+            json_ingestion_manifest=manifest("new"),
+            previous_core_manifest=previous_manifest(manifest("old"), previous),
+        )
+
+        rebuilt = nodes.process_core_primary(CORE_SQL, **after, processing=PROCESSING)
+        pd.testing.assert_frame_equal(merged["primary_core"], rebuilt["primary_core"])
+        assert "recomputing 3 vagas" in caplog.text
+        assert record_manifest(merged["primary_core_manifest"]).equals(manifest("new"))
+
+    def test_rebuilds_when_previous_core_has_other_types(self, caplog):
+        caplog.set_level(logging.INFO, logger=nodes.__name__)
+        tables = primary_tables(["A", "B", "C"], "2021-02-01")
+        previous = nodes.process_core_primary(CORE_SQL, **tables, processing=PROCESSING)
+        # Written before the keys were typed as integers
+        previous_core = previous["primary_core"].astype({"vaga_id": str})
+
+        rebuilt = nodes.process_core_primary(
+            CORE_SQL,
+            **tables,
+            processing=PROCESSING,
+            previous_primary_core=previous_core,
+            json_ingestion_manifest=manifest("h11"),
+            previous_core_manifest=previous_manifest(manifest("h11"), previous),
+        )
+
+        assert "different columns, rebuilding the whole core join" in caplog.text
+        assert len(rebuilt["primary_core"]) == len(previous_core)
+
+    def test_rebuilds_when_the_core_sql_changes(self, caplog):
+        caplog.set_level(logging.INFO, logger=nodes.__name__)
+        tables = primary_tables(["A", "B", "C"], "2021-02-01")
+        previous = nodes.process_core_primary(CORE_SQL, **tables, processing=PROCESSING)
+        # Same columns, other targets: no record changed, yet every vaga is affected
+        edited_sql = CORE_SQL.replace("LIKE '%Contratado%'", "LIKE '%Prospect%'")
+
+        merged = nodes.process_core_primary(
+            edited_sql,
+            **tables,
+            processing=PROCESSING,
+            previous_primary_core=previous["primary_core"],
+            json_ingestion_manifest=manifest("h11"),
+            previous_core_manifest=previous_manifest(manifest("h11"), previous),
+        )
+
+        rebuilt = nodes.process_core_primary(edited_sql, **tables, processing=PROCESSING)
+        assert "built with another sql, rebuilding the whole core join" in caplog.text
+        pd.testing.assert_frame_equal(merged["primary_core"], rebuilt["primary_core"])
+        assert not merged["primary_core"]["target_contratado"].equals(
+            previous["primary_core"]["target_contratado"]
+        )
+        assert not merged["primary_core_manifest"].equals(previous["primary_core_manifest"])
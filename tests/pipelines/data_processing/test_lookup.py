@@ -0,0 +1,117 @@
+"""
+Tests for the primary table lookups.
+"""
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fiap_mlops_datathon.pipelines.data_processing.lookup import (
+    PRIMARY_CORE,
+    candidate_history,
+    lookup_bytes_read,
+    lookup_rows,
+    prospects_for_vaga,
+    table_filepath,
+)
+
+
+def _write_prospects(filepath) -> None:
+    table = pa.table({
+        "prospect_id": pa.array([1000 + i // 10 for i in range(100)], pa.int32()),
+        "codigo": pa.array([31000 + i % 7 for i in range(100)], pa.int32()),
+        "situacao_candidado": ["Prospect"] * 100,
+    })
+    pq.write_table(
+        table,
+        filepath,
+        row_group_size=10,
+        write_page_index=True,
+        bloom_filter_options={"prospect_id": {"ndv": 10}, "codigo": {"ndv": 10}},
+    )
+
+
+def _write_core(filepath, bloom_filters=True) -> None:
+    # Sorted by vaga_id then codigo, as materialize_primary/core_applicants_jobs_prospects.sql
+    table = pa.table({
+        "vaga_id": pa.array([1000 + i // 10 for i in range(20000)], pa.int32()),
+        "codigo": pa.array([31000 + (i * 37) % 10000 for i in range(20000)], pa.int32()),
+        "cv_pt": [f"cv {i} " * 20 for i in range(20000)],
+    }).sort_by([("vaga_id", "ascending"), ("codigo", "ascending")])
+    pq.write_table(
+        table,
+        filepath,
+        row_group_size=1000,
+        write_page_index=True,
+        bloom_filter_options={"vaga_id": {"ndv": 1000}, "codigo": {"ndv": 1000}} if bloom_filters else None,
+    )
+
+
+class TestLookup:
+    def test_lookups_return_matching_rows(self, tmp_path):
+        filepath = str(tmp_path / "prospects.parquet")
+        _write_prospects(filepath)
+
+        assert prospects_for_vaga(1003, filepath)["codigo"].tolist() == [
+            31000 + i % 7 for i in range(30, 40)
+        ]
+        assert set(candidate_history("31002", filepath)["prospect_id"]) == {
+            1000 + i // 10 for i in range(2, 100, 7)
+        }
+        assert lookup_rows(filepath, {"prospect_id": 1003, "codigo": 31002}, ["codigo"]).shape == (2, 1)
+
+    def test_lookups_keep_arrow_buffers_unless_asked_for_numpy(self, tmp_path):
+        filepath = str(tmp_path / "prospects.parquet")
+        _write_prospects(filepath)
+
+        arrow_backed = prospects_for_vaga(1003, filepath)
+        converted = prospects_for_vaga(1003, filepath, dtype_backend="numpy")
+
+        assert arrow_backed["codigo"].dtype == pd.ArrowDtype(pa.int32())
+        assert converted["codigo"].dtype == "int32"
+        pd.testing.assert_frame_equal(arrow_backed.astype(converted.dtypes), converted)
+
+    def test_bloom_filters_exclude_row_groups(self, tmp_path):
+        filepath = str(tmp_path / "prospects.parquet")
+        _write_prospects(filepath)
+
+        excluded = duckdb.sql(
+            f"SELECT bool_and(bloom_filter_excludes) "
+            f"FROM parquet_bloom_probe('{filepath}', 'prospect_id', 1003) WHERE row_group_id <> 3"
+        ).fetchone()[0]
+        assert excluded
+
+    def test_core_lookups_by_codigo_are_pruned_by_bloom_filters(self, tmp_path):
+        filepath = str(tmp_path / "core.parquet")
+        without_bloom_filters = str(tmp_path / "core_plain.parquet")
+        _write_core(filepath)
+        _write_core(without_bloom_filters, bloom_filters=False)
+
+        history = candidate_history(31074, filepath, table=PRIMARY_CORE)
+        assert history["codigo"].tolist() == [31074, 31074]
+        assert set(history["vaga_id"]) == {1000, 2000}
+        assert len(prospects_for_vaga(1000, filepath, table=PRIMARY_CORE)) == 10
+
+        # codigo is not sorted: without bloom filters every row group is read
+        pruned = lookup_bytes_read(filepath, {"codigo": 31074})
+        scanned = lookup_bytes_read(without_bloom_filters, {"codigo": 31074})
+        assert pruned < scanned / 2
+
+    def test_default_file_comes_from_the_catalog(self, tmp_path, monkeypatch):
+        for env in ("base", "local"):
+            (tmp_path / "conf" / env).mkdir(parents=True)
+        (tmp_path / "conf" / "base" / "catalog.yml").write_text(
+            "primary_prospects:\n"
+            "  type: pandas.ParquetDataset\n"
+            "  filepath: data/03_primary/other_prospects.parquet\n"
+        )
+        (tmp_path / "data" / "03_primary").mkdir(parents=True)
+        _write_prospects(tmp_path / "data" / "03_primary" / "other_prospects.parquet")
+        monkeypatch.chdir(tmp_path)
+        table_filepath.cache_clear()
+
+        try:
+            assert table_filepath("primary_prospects").endswith("data/03_primary/other_prospects.parquet")
+            assert len(prospects_for_vaga(1003)) == 10
+        finally:
+            table_filepath.cache_clear()
@@ -0,0 +1,81 @@
+"""
+Tests for the data_processing pipeline nodes.
+"""
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from fiap_mlops_datathon.datasets import DuckDBParquetDataset
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_sql_to_parquet
+
+INTERMEDIATE = pd.DataFrame({
+    "id": [str(i) for i in range(5000)],
+    # Low-cardinality text is a category from the intermediate layer on
+    "nivel": pd.Categorical(["Júnior", "Pleno", "Sênior", "Pleno"] * 1250),
+    "area": ["TI", "RH"] * 2500,
+})
+SQL = "SELECT id, nivel FROM intermediate_data ORDER BY nivel, id"
+
+
+class TestSQLWriters:
+    def test_duckdb_writer_copies_relation(self, tmp_path):
+        filepath = tmp_path / "table.parquet"
+        dataset = DuckDBParquetDataset(filepath=str(filepath))
+
+        output = process_sql_to_parquet(SQL, INTERMEDIATE, chunk_size=2048, writer="duckdb")
+        dataset.save(output)
+
+        metadata = pq.ParquetFile(filepath).metadata
+        assert metadata.created_by.startswith("DuckDB")
+        assert metadata.row_group(0).num_rows == 2048
+        expected = duckdb.sql(SQL.replace("intermediate_data", "INTERMEDIATE")).df()
+        # DuckDB writes ENUM columns as plain text
+        expected["nivel"] = expected["nivel"].astype(object)
+        pd.testing.assert_frame_equal(dataset.load(), expected)
+
+    def test_arrow_writer_keeps_categories(self):
+        df = process_sql_to_parquet(SQL, INTERMEDIATE)
+
+        assert isinstance(df["nivel"].dtype, pd.CategoricalDtype)
+
+    @pytest.mark.parametrize("chunk_size", [None, 1000])
+    @pytest.mark.parametrize("dtype_backend", ["numpy", "pyarrow"])
+    def test_rebuilt_and_listed_columns_are_dictionary_encoded(
+        self, tmp_path, caplog, chunk_size, dtype_backend
+    ):
+        dataset = DuckDBParquetDataset(filepath=str(tmp_path / "table.parquet"))
+        sql = "SELECT id, coalesce(nivel, 'Outro') AS nivel, area FROM intermediate_data ORDER BY id"
+
+        with caplog.at_level("INFO"):
+            output = process_sql_to_parquet(
+                sql, INTERMEDIATE, chunk_size=chunk_size,
+                dtype_backend=dtype_backend, enum_columns=["area"],
+            )
+            dataset.save(output)
+
+        df = dataset.load()
+        assert not isinstance(df["id"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["nivel"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["area"].dtype, pd.CategoricalDtype)
+        assert df["nivel"].tolist() == INTERMEDIATE.sort_values("id")["nivel"].tolist()
+        assert "Categorical columns memory" in caplog.text
+
+    def test_pyarrow_backend_round_trips(self, tmp_path):
+        dataset = DuckDBParquetDataset(
+            filepath=str(tmp_path / "table.parquet"), load_args={"dtype_backend": "pyarrow"}
+        )
+
+        df = process_sql_to_parquet(SQL, INTERMEDIATE, dtype_backend="pyarrow")
+        dataset.save(df)
+
+        assert df["id"].dtype == pd.ArrowDtype(pa.string())
+        assert isinstance(df["nivel"].dtype, pd.CategoricalDtype)
+        assert pd.read_parquet(dataset._filepath)["nivel"].dtype == df["nivel"].dtype
+        reloaded = process_sql_to_parquet(SQL, dataset.load(), dtype_backend="pyarrow")
+        pd.testing.assert_frame_equal(reloaded, df)
+
+    def test_unknown_writer(self):
+        with pytest.raises(ValueError, match="Unknown SQL writer"):
+            process_sql_to_parquet(SQL, INTERMEDIATE, writer="spark")
@@ -0,0 +1,131 @@
+"""
+Tests for the Hive-partitioned prospects layout.
+"""
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pytest
+from kedro.io import DatasetError
+
+from fiap_mlops_datathon.datasets import DuckDBParquetDataset
+from fiap_mlops_datathon.pipelines.data_processing.partitions import (
+    date_window_predicate,
+    partition_prospects,
+    read_partitioned_sql,
+)
+from fiap_mlops_datathon.pipelines.data_processing.sql_templates import render_sql
+
+# Morris has 3 prospects in March 2021 and 1 in May 2021, Nelson 1 in March
+PROSPECTS_SQL = """
+SELECT * FROM (VALUES
+    ('1', 'Morris', TIMESTAMP '2021-03-02', '2021-03'),
+    ('2', 'Morris', TIMESTAMP '2021-03-20', '2021-03'),
+    ('3', 'Morris', TIMESTAMP '2021-03-31', '2021-03'),
+    ('4', 'Morris', TIMESTAMP '2021-05-10', '2021-05'),
+    ('5', 'Nelson', TIMESTAMP '2021-03-15', '2021-03')
+) AS t(codigo, cliente, data_candidatura, ano_mes)
+"""
+
+
+def write_partitioned(path, min_partition_rows):
+    dataset = DuckDBParquetDataset(
+        filepath=str(path), save_args={"partition_by": ["cliente", "periodo"]}
+    )
+    dataset.save(partition_prospects(PROSPECTS_SQL, min_partition_rows=min_partition_rows))
+    return path
+
+
+@pytest.fixture
+def partitioned_path(tmp_path):
+    return write_partitioned(tmp_path / "prospects_partitioned", min_partition_rows=2)
+
+
+class TestPartitionedProspects:
+    def test_small_months_are_compacted_per_year(self, partitioned_path):
+        partitions = sorted(
+            str(path.parent.relative_to(partitioned_path))
+            for path in partitioned_path.glob("**/*.parquet")
+        )
+
+        assert partitions == [
+            "cliente=Morris/periodo=2021",
+            "cliente=Morris/periodo=2021-03",
+            "cliente=Nelson/periodo=2021",
+        ]
+
+    @pytest.mark.parametrize("ano_mes", ["2021-03", "2021-05"])
+    def test_month_filter_is_unchanged_by_compaction(self, tmp_path, ano_mes):
+        query = "SELECT codigo, ano_mes FROM {} WHERE ano_mes = '" + ano_mes + "' ORDER BY codigo"
+        monthly = write_partitioned(tmp_path / "monthly", min_partition_rows=1)
+        compacted = write_partitioned(tmp_path / "compacted", min_partition_rows=2)
+
+        expected = duckdb.sql(query.format(f"({PROSPECTS_SQL})")).fetchall()
+        assert expected
+        assert duckdb.sql(query.format(read_partitioned_sql(str(monthly)))).fetchall() == expected
+        assert duckdb.sql(query.format(read_partitioned_sql(str(compacted)))).fetchall() == expected
+
+    def test_date_window_prunes_partitions(self, partitioned_path):
+        source = read_partitioned_sql(str(partitioned_path))
+        query = (
+            f"SELECT codigo FROM {source} WHERE cliente = 'Morris' "
+            f"AND {date_window_predicate('2021-05-01', '2021-05-31')}"
+        )
+
+        assert duckdb.sql(query).fetchall() == [("4",)]
+        plan = duckdb.sql(f"EXPLAIN ANALYZE {query}").fetchall()[0][1]
+        assert "Total Files Read: 1" in plan
+
+    @pytest.mark.parametrize(
+        "where, expected, files_read",
+        [
+            ("ano_mes = '2021-05'", [("4",)], 2),
+            ("ano_mes = '2021-05' AND cliente = 'Morris'", [("4",)], 1),
+            ("p.ano_mes IN ('2021-03') AND p.cliente = 'Morris'", [("1",), ("2",), ("3",)], 2),
+            ("data_candidatura >= DATE '2021-04-01'", [("4",)], 2),
+            ("ano_mes BETWEEN '2021-04' AND '2022-01'", [("4",)], 2),
+            ("ano_mes = '2021-05' OR cliente = 'Nelson'", [("4",), ("5",)], 3),
+        ],
+    )
+    def test_template_filters_prune_partitions(self, partitioned_path, where, expected, files_read):
+        tables = {"primary_prospects_partitioned": read_partitioned_sql(str(partitioned_path))}
+        query = render_sql(
+            f"SELECT codigo FROM {{{{ primary_prospects_partitioned }}}} p WHERE {where} ORDER BY codigo",
+            tables=tables,
+        )
+
+        assert duckdb.sql(query).fetchall() == expected
+        plan = duckdb.sql(f"EXPLAIN ANALYZE {query}").fetchall()[0][1]
+        assert f"Total Files Read: {files_read}" in plan
+
+    def test_joined_scans_prune_on_qualified_filters_only(self, partitioned_path):
+        tables = {"primary_prospects_partitioned": read_partitioned_sql(str(partitioned_path))}
+        template = (
+            "SELECT p.codigo FROM {{ primary_prospects_partitioned }} p "
+            "JOIN (SELECT '2021-03' AS ano_mes) m ON true WHERE "
+        )
+
+        pruned = render_sql(template + "p.ano_mes = '2021-05'", tables=tables)
+        unpruned = render_sql(template + "m.ano_mes = '2021-05'", tables=tables)
+
+        assert "(SELECT * FROM read_parquet" in pruned
+        assert "(SELECT * FROM read_parquet" not in unpruned
+
+    def test_partitioned_layout_loads_with_its_dtype_backend(self, partitioned_path):
+        save_args = {"partition_by": ["cliente", "periodo"]}
+        arrow_backed = DuckDBParquetDataset(
+            filepath=str(partitioned_path), save_args=save_args, load_args={"dtype_backend": "pyarrow"}
+        ).load()
+        converted = DuckDBParquetDataset(filepath=str(partitioned_path), save_args=save_args).load()
+
+        assert arrow_backed["codigo"].dtype == pd.ArrowDtype(pa.string())
+        assert arrow_backed["periodo"].dtype == pd.ArrowDtype(pa.string())
+        assert converted["codigo"].dtype == object
+        assert len(arrow_backed) == len(converted) == 5
+
+    def test_only_relations_can_be_partitioned(self, tmp_path):
+        dataset = DuckDBParquetDataset(
+            filepath=str(tmp_path / "partitioned"), save_args={"partition_by": ["cliente"]}
+        )
+
+        with pytest.raises(DatasetError, match="partition"):
+            dataset.save(duckdb.sql(PROSPECTS_SQL).df())
@@ -0,0 +1,79 @@
+"""
+Tests for the silver layer SQL.
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from fiap_mlops_datathon.pipelines.data_processing import nodes
+from fiap_mlops_datathon.pipelines.json_processing.dead_letter import DEAD_LETTER_COLUMNS
+
+SILVER_SQL = Path(nodes.__file__).parent / "materialize_silver"
+
+
+class TestSilverProspects:
+    def test_types_and_keeps_latest_update_per_vaga_and_codigo(self):
+        intermediate = pd.DataFrame({
+            "prospect_id": ["2", "1", "1", "1"],
+            "codigo": ["10", "11", "10", "10"],
+            "situacao_candidado": ["Inscrito", "Inscrito", "Inscrito", "Contratado"],
+            "data_candidatura": pd.to_datetime(["2021-01-01"] * 4),
+            "ultima_atualizacao": pd.to_datetime(
+                ["2021-01-01", "2021-01-01", "2021-01-02", "2021-01-05"]
+            ),
+        })
+
+        silver = nodes.process_prospects_silver(
+            (SILVER_SQL / "prospects.sql").read_text(encoding="utf-8"),
+            intermediate,
+            {"dtype_backend": "pyarrow"},
+        )
+
+        assert silver[["prospect_id", "codigo"]].values.tolist() == [[1, 10], [1, 11], [2, 10]]
+        assert str(silver["prospect_id"].dtype) == "int32[pyarrow]"
+        assert str(silver["ultima_atualizacao"].dtype) == "date32[day][pyarrow]"
+        assert silver["situacao_candidado"].tolist() == ["Contratado", "Inscrito", "Inscrito"]
+        assert isinstance(silver["situacao_candidado"].dtype, pd.CategoricalDtype)
+
+
+class TestMalformedKeys:
+    def test_rows_with_malformed_keys_are_quarantined(self):
+        intermediate_prospects = pd.DataFrame({
+            "prospect_id": ["1", "1", "x1", None],
+            "codigo": ["10", "1O", "11", "12"],
+            "situacao_candidado": ["Inscrito"] * 4,
+            "data_candidatura": pd.to_datetime(["2021-01-01"] * 4),
+            "ultima_atualizacao": pd.to_datetime(["2021-01-01"] * 4),
+        })
+        intermediate_vagas = pd.DataFrame({
+            "id": ["1", "v2"],
+            "data_requicisao": ["01-01-2021", "01-01-2021"],
+            "limite_contratacao": ["00-00-0000", "01-02-2021"],
+        })
+        intermediate_applicants = pd.DataFrame({
+            "id": ["10"],
+            "data_nascimento": pd.to_datetime(["1990-01-01"]),
+            "data_atualizacao": ["01-01-2021 10:00:00"],
+        })
+
+        silver = nodes.process_prospects_silver(
+            (SILVER_SQL / "prospects.sql").read_text(encoding="utf-8"), intermediate_prospects
+        )
+        vagas = nodes.process_vagas_silver(
+            (SILVER_SQL / "vagas.sql").read_text(encoding="utf-8"), intermediate_vagas
+        )
+        quarantine = nodes.quarantine_malformed_keys(
+            intermediate_vagas, intermediate_prospects, intermediate_applicants
+        )
+
+        assert silver[["prospect_id", "codigo"]].values.tolist() == [[1, 10]]
+        assert vagas["id"].tolist() == [1]
+        assert list(quarantine.columns) == DEAD_LETTER_COLUMNS
+        assert quarantine[["entity", "record_id", "error_code", "error"]].values.tolist() == [
+            ["vagas", "v2", "invalid_key", "id is not an integer: v2"],
+            ["prospects", "1/1O", "invalid_key", "codigo is not an integer: 1O"],
+            ["prospects", "x1/11", "invalid_key", "prospect_id is not an integer: x1"],
+            ["prospects", "/12", "invalid_key", "prospect_id is missing"],
+        ]
+        assert json.loads(quarantine["payload"].iloc[1])["codigo"] == "1O"
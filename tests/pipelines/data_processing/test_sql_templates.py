@@ -0,0 +1,54 @@
+"""
+Tests for the catalog-driven SQL templates.
+"""
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_sql_to_parquet
+from fiap_mlops_datathon.pipelines.data_processing.sql_templates import (
+    parquet_table_sql,
+    project_tables,
+    referenced_datasets,
+    render_sql,
+)
+
+SQL = "SELECT v.id, count(*) AS n FROM {{ vagas }} v JOIN {{prospects}} p ON p.id = v.id GROUP BY ALL ORDER BY ALL"
+VAGAS = pd.DataFrame({"id": ["1", "2"]})
+PROSPECTS = pd.DataFrame({"id": ["1", "1", "2"]})
+
+
+class TestSQLTemplates:
+    def test_registered_inputs_win_over_files(self):
+        tables = {"vagas": "read_parquet('vagas.parquet')", "prospects": "read_parquet('p.parquet')"}
+
+        rendered = render_sql(SQL, relations=["vagas"], tables=tables)
+
+        assert referenced_datasets(SQL) == ["vagas", "prospects"]
+        assert 'FROM "vagas" v JOIN read_parquet(\'p.parquet\') p' in rendered
+
+    def test_unknown_dataset_is_rejected(self):
+        with pytest.raises(ValueError, match="'prospects'"):
+            render_sql(SQL, relations=["vagas"], tables={})
+
+    def test_inputs_are_read_from_memory_or_file(self, tmp_path, monkeypatch):
+        PROSPECTS.to_parquet(tmp_path / "prospects.parquet")
+        monkeypatch.setattr(
+            "fiap_mlops_datathon.pipelines.data_processing.sql_templates._tables",
+            {"prospects": parquet_table_sql(str(tmp_path / "prospects.parquet"))},
+        )
+
+        df = process_sql_to_parquet(SQL, inputs={"vagas": VAGAS, "prospects": None})
+
+        assert df.to_dict("list") == {"id": ["1", "2"], "n": [2, 1]}
+
+    def test_partitioned_datasets_are_read_as_hive_directories(self):
+        conf_source = Path(__file__).resolve().parents[3] / "conf"
+
+        tables = project_tables(str(conf_source), env="base")
+
+        assert tables["primary_prospects_partitioned"].startswith(
+            "read_parquet('data/03_primary/prospects_partitioned/**/*.parquet', hive_partitioning = true"
+        )
+        assert tables["primary_prospects"] == "read_parquet('data/03_primary/prospects.parquet')"
@@ -0,0 +1,362 @@
+"""
+Tests for the json_processing pipeline nodes.
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from fiap_mlops_datathon.datasets import StreamingJSONDataset
+from fiap_mlops_datathon.pipelines.json_processing import duckdb_engine, profiling
+from fiap_mlops_datathon.pipelines.json_processing.nodes import (
+    optimize_dataframe_types,
+    process_all_json_data,
+    process_json_data_duckdb,
+    process_json_data_incremental,
+    profile_intermediate_data,
+    replay_quarantined_records,
+    validate_dataframe_nulls,
+)
+
+APPLICANTS = {
+    "31000": {
+        "infos_basicas": {"nome": "Ana", "email": "ana@example.com", "telefone": "  "},
+        "informacoes_pessoais": {"data_nascimento": "12-03-1990", "sexo": ""},
+        "informacoes_profissionais": {"nivel_profissional": "Sênior"},
+        "formacao_e_idiomas": {"nivel_ingles": "Avançado"},
+        "cv_pt": "experiência em python",
+        "cv_en": "",
+    },
+    "31001": {
+        "infos_basicas": {"nome": "Bruno", "data_criacao": "10-11-2021 07:29:49"},
+        "informacoes_pessoais": {"data_nascimento": "0000-00-00"},
+        "cv_pt": "\t",
+    },
+}
+
+VAGAS = {
+    "1000": {
+        "informacoes_basicas": {"titulo_vaga": "Analista", "cliente": "Morris", "vaga_sap": "Não"},
+        "perfil_vaga": {"nivel profissional": "Pleno", "estado": "São Paulo"},
+        "beneficios": {"valor_venda": "-"},
+    },
+    "1001": {"informacoes_basicas": {"titulo_vaga": "Dev"}},
+}
+
+PROSPECTS = {
+    "1000": {
+        "titulo": "Analista",
+        "modalidade": "",
+        "prospects": [
+            {"nome": "Ana", "codigo": "31000", "situacao_candidado": "Inscrito", "comentario": " ",
+             "data_candidatura": "03-05-2021", "ultima_atualizacao": "2021-05-04"},
+            {"nome": "Bruno", "codigo": "31001", "situacao_candidado": "Contratado pela Decision"},
+            {"nome": "Ana", "codigo": "31000", "situacao_candidado": "Desistiu"},
+        ],
+    },
+    "1001": {"titulo": "Dev", "modalidade": "CLT", "prospects": []},
+    "1002": {"titulo": "QA", "prospects": [{"nome": "Carla", "codigo": "31002", "data_candidatura": "31-02-2021"}]},
+}
+
+
+@pytest.fixture
+def raw_streams(tmp_path):
+    streams = []
+    for name, data in [("applicants", APPLICANTS), ("vagas", VAGAS), ("prospects", PROSPECTS)]:
+        filepath = tmp_path / f"{name}.json"
+        filepath.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        streams.append(StreamingJSONDataset(filepath=str(filepath)).load())
+    return streams
+
+
+def _chunks_frame(chunks) -> pd.DataFrame:
+    """Concatenate the chunks (DataFrames or Arrow tables) an intermediate table is written as."""
+    return pd.concat(
+        [chunk if isinstance(chunk, pd.DataFrame) else chunk.to_pandas() for chunk in chunks],
+        ignore_index=True,
+    )
+
+
+def _as_plain_objects(df: pd.DataFrame) -> pd.DataFrame:
+    """Compare values only, once the dtypes have been checked."""
+    df = df.astype(object)
+    return df.where(df.notna(), None).reset_index(drop=True)
+
+
+class TestDuckDBEngine:
+    def test_matches_pandas_engine(self, raw_streams):
+        expected = process_all_json_data(APPLICANTS, VAGAS, PROSPECTS)
+        relations = process_json_data_duckdb(*raw_streams)
+
+        # Well-formed inputs: nothing to quarantine, and DuckDB has no per-record failures
+        assert expected.pop("quarantine_records").empty
+        assert set(relations) == set(expected)
+        for name, relation in relations.items():
+            actual, reference = relation.df(), expected[name]
+            assert list(actual.columns) == list(reference.columns)
+            # Too few rows for category columns: both engines keep text as object
+            pd.testing.assert_series_equal(actual.dtypes, reference.dtypes, obj=name)
+            if name == "quarantine_dates":
+                # The quarantine has no row order
+                actual = actual.sort_values(list(actual.columns))
+                reference = reference.sort_values(list(reference.columns))
+            pd.testing.assert_frame_equal(_as_plain_objects(actual), _as_plain_objects(reference))
+
+    def test_rejects_files_over_the_object_size_limit(self, raw_streams, monkeypatch):
+        monkeypatch.setattr(duckdb_engine, "MAX_JSON_OBJECT_SIZE", 10)
+        with pytest.raises(ValueError, match="use the pandas engine"):
+            process_json_data_duckdb(*raw_streams)
+
+    def test_requires_streamed_inputs(self):
+        with pytest.raises(ValueError, match="StreamingJSONDataset"):
+            process_json_data_duckdb(APPLICANTS, VAGAS, PROSPECTS)
+
+
+class TestDateParsing:
+    def test_dates_are_typed_and_bad_values_quarantined(self):
+        outputs = process_all_json_data(APPLICANTS, VAGAS, PROSPECTS)
+
+        prospects = outputs["intermediate_prospects"]
+        assert pd.api.types.is_datetime64_any_dtype(prospects["data_candidatura"])
+        # A value in another known format is still parsed
+        assert prospects.loc[0, "ultima_atualizacao"] == pd.Timestamp("2021-05-04")
+        assert outputs["quarantine_dates"].to_dict("records") == [
+            {"entity": "applicants", "key": "31001", "column": "data_nascimento", "value": "0000-00-00"},
+            {"entity": "prospects", "key": "1002/31002", "column": "data_candidatura", "value": "31-02-2021"},
+        ]
+
+
+class TestDeadLetters:
+    MALFORMED_APPLICANTS = {**APPLICANTS, "31003": ["not", "an", "object"]}
+    MALFORMED_PROSPECTS = {**PROSPECTS, "1003": {"titulo": "Ops", "prospects": {"codigo": "31003"}}}
+
+    def _run(self, record_fixes=None):
+        outputs = process_json_data_incremental(
+            self.MALFORMED_APPLICANTS, VAGAS, self.MALFORMED_PROSPECTS,
+            None, None, None, None, record_fixes=record_fixes,
+        )
+        return {
+            name: _chunks_frame(output) if name.startswith("intermediate_") else output
+            for name, output in outputs.items()
+        }
+
+    def test_malformed_records_are_quarantined_not_ingested(self):
+        outputs = self._run()
+
+        quarantine = outputs["quarantine_records"]
+        assert quarantine[["entity", "record_id", "error_code"]].to_dict("records") == [
+            {"entity": "applicants", "record_id": "31003", "error_code": "invalid_structure"},
+            {"entity": "prospects", "record_id": "1003", "error_code": "invalid_type"},
+        ]
+        assert json.loads(quarantine.loc[0, "payload"]) == ["not", "an", "object"]
+        assert "31003" not in set(outputs["intermediate_applicants"]["id"])
+        # Failed records stay out of the manifest so the next run retries them
+        assert "31003" not in set(outputs["json_ingestion_manifest"]["key"])
+
+    def test_replayed_fixes_are_ingested(self):
+        quarantine = self._run()["quarantine_records"]
+        fixed = pd.DataFrame([{
+            "entity": "applicants",
+            "record_id": "31003",
+            "payload": {"infos_basicas": {"nome": "Davi"}},
+        }])
+
+        record_fixes = replay_quarantined_records(fixed, quarantine, None)
+        outputs = self._run(record_fixes)
+
+        applicants = outputs["intermediate_applicants"].set_index("id")
+        assert applicants.loc["31003", "nome"] == "Davi"
+        assert outputs["quarantine_records"]["record_id"].tolist() == ["1003"]
+
+
+class TestParallelProcessing:
+    @pytest.mark.parametrize("workers, shard_size", [(1, 1), (2, 1), (2, 2), (3, 5000)])
+    def test_output_does_not_depend_on_workers_or_shards(self, workers, shard_size):
+        applicants = {**APPLICANTS, "31003": ["not", "an", "object"]}
+        expected = process_all_json_data(applicants, VAGAS, PROSPECTS)
+
+        outputs = process_all_json_data(
+            applicants, VAGAS, PROSPECTS, {"workers": workers, "shard_size": shard_size}
+        )
+
+        assert set(outputs) == set(expected)
+        for name, output in outputs.items():
+            pd.testing.assert_frame_equal(output, expected[name])
+        assert outputs["quarantine_records"]["record_id"].tolist() == ["31003"]
+
+
+class TestChunkedIngestion:
+    def test_builders_are_flushed_every_chunk_size_rows(self):
+        applicants = {**APPLICANTS, "31003": ["not", "an", "object"]}
+        expected = process_all_json_data(applicants, VAGAS, PROSPECTS)
+
+        outputs = process_json_data_incremental(
+            applicants, VAGAS, PROSPECTS, None, None, None, None,
+            processing={"incremental": False, "chunk_size": 2},
+        )
+
+        # A vaga is never split: its 3 prospects make the first chunk
+        assert [table.num_rows for table in outputs["intermediate_prospects"]] == [3, 1]
+        assert [table.num_rows for table in outputs["intermediate_applicants"]] == [2]
+        for name in ("intermediate_applicants", "intermediate_vagas", "intermediate_prospects"):
+            chunks = outputs[name]
+            assert chunks.chunk_size == 2
+            pd.testing.assert_frame_equal(
+                _as_plain_objects(_chunks_frame(chunks)), _as_plain_objects(expected[name])
+            )
+        for name in ("quarantine_dates", "quarantine_records"):
+            pd.testing.assert_frame_equal(outputs[name], expected[name])
+
+
+class TestOptimizeDataframeTypes:
+    def test_dtypes_and_memory(self, caplog):
+        df = pd.DataFrame({
+            "nivel": ["Júnior", "Pleno", "Sênior", " "] * 250,
+            "cv_pt": ["experiência " * 30 + str(i % 2) for i in range(1000)],
+            "nome": [f"Candidato {i}" for i in range(1000)],
+            "pequeno": range(1000),
+            "negativo": [-1, 1] * 500,
+            "grande": [0, 2**40] * 500,
+            "nota": [0.5] * 1000,
+        })
+        memory_before = df.memory_usage(index=False, deep=True)
+
+        with caplog.at_level("INFO"):
+            optimized = optimize_dataframe_types(df)
+
+        assert optimized is df
+        assert {col: str(dtype) for col, dtype in optimized.dtypes.items()} == {
+            "nivel": "category",
+            # Free text is never a category, even with only two distinct values
+            "cv_pt": "object",
+            "nome": "object",
+            "pequeno": "uint16",
+            "negativo": "int8",
+            "grande": "int64",
+            "nota": "float64",
+        }
+        assert optimized["nivel"].isna().sum() == 250
+        assert list(optimized["nivel"].cat.categories) == ["Júnior", "Pleno", "Sênior"]
+        memory_after = optimized.memory_usage(index=False, deep=True)
+        assert memory_after["nivel"] < memory_before["nivel"] / 10
+        assert memory_after["pequeno"] == memory_before["pequeno"] / 4
+        assert memory_after["cv_pt"] == memory_before["cv_pt"]
+        assert "Column memory in MB (before -> after)" in caplog.text
+
+
+class TestIncrementalIngestion:
+    KEYS = {
+        "intermediate_applicants": ["id"],
+        "intermediate_vagas": ["id"],
+        "intermediate_prospects": ["prospect_id", "codigo", "situacao_candidado"],
+        "quarantine_dates": ["entity", "key", "column"],
+        "json_ingestion_manifest": ["entity", "key"],
+    }
+
+    @staticmethod
+    def _run(raw, previous=None, full_rebuild=False):
+        previous = previous or {}
+        outputs = process_json_data_incremental(
+            *raw,
+            previous.get("intermediate_applicants"),
+            previous.get("intermediate_vagas"),
+            previous.get("intermediate_prospects"),
+            previous.get("json_ingestion_manifest"),
+            previous.get("quarantine_dates"),
+            processing={"incremental": True, "full_rebuild": full_rebuild},
+        )
+        return {
+            name: _chunks_frame(output) if name.startswith("intermediate_") else output
+            for name, output in outputs.items()
+        }
+
+    def _sorted(self, name, df):
+        return _as_plain_objects(df.sort_values(self.KEYS[name]))
+
+    def test_matches_full_rebuild_after_edits_adds_and_deletes(self):
+        first = self._run((APPLICANTS, VAGAS, PROSPECTS))
+        applicants = {
+            "31000": {**APPLICANTS["31000"], "cv_pt": "experiência em sql"},
+            "31004": {"infos_basicas": {"nome": "Eva"}, "informacoes_pessoais": {"data_nascimento": "99-99-1999"}},
+        }
+        vagas = {"1001": VAGAS["1001"], "1002": {"informacoes_basicas": {"titulo_vaga": "QA"}}}
+        prospects = {
+            "1000": {**PROSPECTS["1000"], "prospects": PROSPECTS["1000"]["prospects"][:1]},
+            "1002": PROSPECTS["1002"],
+            "1003": {"titulo": "Ops", "prospects": [{"nome": "Davi", "codigo": "31004"}]},
+        }
+        raw = (applicants, vagas, prospects)
+
+        incremental = self._run(raw, previous=first)
+        rebuilt = self._run(raw, full_rebuild=True)
+
+        assert set(incremental) == set(rebuilt)
+        for name in self.KEYS:
+            assert list(incremental[name].columns) == list(rebuilt[name].columns)
+            pd.testing.assert_frame_equal(
+                self._sorted(name, incremental[name]), self._sorted(name, rebuilt[name])
+            )
+        assert set(incremental["intermediate_applicants"]["id"]) == {"31000", "31004"}
+        assert incremental["json_ingestion_manifest"].groupby("entity").size().to_dict() == {
+            "applicants": 2, "prospects": 3, "vagas": 2,
+        }
+
+
+class TestProfiling:
+    VAGAS_FRAME = pd.DataFrame({
+        "id": ["1", "2", "3", "4"],
+        "cliente": pd.Categorical(["A", "A", "B", None]),
+        "valor": [1.5, None, 3.0, 2.0],
+        "data_requicisao": pd.to_datetime(["2021-01-01", None, "2021-03-01", "2021-02-01"]),
+        "cv": ["x" * 100, None, None, None],
+    })
+
+    def test_report_keys_and_values(self):
+        report = profile_intermediate_data(
+            self.VAGAS_FRAME.iloc[:2], self.VAGAS_FRAME, self.VAGAS_FRAME.iloc[:0], {"top_k": 2}
+        )
+
+        assert json.loads(json.dumps(report)) == report
+        tables = report["tables"]
+        assert list(tables) == ["intermediate_applicants", "intermediate_vagas", "intermediate_prospects"]
+        assert tables["intermediate_prospects"]["rows"] == 0
+        assert tables["intermediate_prospects"]["columns"]["valor"]["null_pct"] == 0.0
+
+        vagas = tables["intermediate_vagas"]
+        assert vagas["rows"] == 4
+        assert vagas["columns"]["cliente"] == {
+            "type": "ENUM", "nulls": 1, "null_pct": 25.0, "distinct_approx": 2,
+            "min": "A", "max": "B", "top_k": ["A", "B"],
+        }
+        assert vagas["columns"]["valor"] == {
+            "type": "DOUBLE", "nulls": 1, "null_pct": 25.0, "distinct_approx": 3,
+            "min": 1.5, "max": 3.0, "top_k": [1.5, 3.0],
+        }
+        assert vagas["columns"]["data_requicisao"]["min"] == "2021-01-01T00:00:00"
+        # Long text is cut in the artifact
+        assert vagas["columns"]["cv"]["max"] == "x" * 80 + "..."
+        assert vagas["columns"]["cv"]["null_pct"] == 75.0
+
+    def test_profile_table_closes_the_connection_it_opens(self, monkeypatch):
+        opened = []
+        connect = profiling.duckdb.connect
+
+        def tracked_connect(*args, **kwargs):
+            opened.append(connect(*args, **kwargs))
+            return opened[-1]
+
+        monkeypatch.setattr(profiling.duckdb, "connect", tracked_connect)
+        validate_dataframe_nulls(self.VAGAS_FRAME, "vagas")
+
+        assert len(opened) == 1
+        with pytest.raises(profiling.duckdb.ConnectionException):
+            opened[0].execute("SELECT 1")
+
+    def test_top_k_can_be_skipped(self):
+        report = profile_intermediate_data(
+            self.VAGAS_FRAME, self.VAGAS_FRAME, self.VAGAS_FRAME, {"top_k": 0}
+        )
+
+        assert set(report["tables"]["intermediate_vagas"]["columns"]["id"]) == {
+            "type", "nulls", "null_pct", "distinct_approx", "min", "max",
+        }
@@ -0,0 +1,39 @@
+"""
+Tests for the shared DuckDB database of the SQL nodes.
+"""
+import pandas as pd
+import pytest
+
+from fiap_mlops_datathon.duckdb_session import DuckDBSession
+from fiap_mlops_datathon.pipelines.data_processing.categoricals import dictionary_columns
+
+
+class TestDuckDBSession:
+    def test_settings_apply_to_every_cursor(self):
+        session = DuckDBSession({"threads": 2, "memory_limit": "512MB", "temp_directory": None})
+        try:
+            con = session.cursor()
+            assert con.sql("SELECT current_setting('threads')").fetchone()[0] == 2
+            assert session.cursor().sql("SELECT current_setting('memory_limit')").fetchone()[0] == "488.2 MiB"
+        finally:
+            session.close()
+
+    def test_cursors_keep_their_objects_private(self):
+        session = DuckDBSession()
+        try:
+            first, second = session.cursor(), session.cursor()
+            first.register("intermediate_data", pd.DataFrame({"nivel": pd.Categorical(["a", "b"])}))
+            second.register("intermediate_data", pd.DataFrame({"nivel": ["c", "d"]}))
+
+            # Same relation name on both cursors
+            query = "SELECT * FROM intermediate_data"
+            assert dictionary_columns(first, query, enum_columns=["nivel"]) == []
+            assert dictionary_columns(second, query, enum_columns=["nivel"]) == ["nivel"]
+            assert list(first.sql(query).df()["nivel"].cat.categories) == ["a", "b"]
+            assert second.sql(query).df()["nivel"].tolist() == ["c", "d"]
+        finally:
+            session.close()
+
+    def test_unknown_settings_are_rejected(self):
+        with pytest.raises(ValueError, match="threds"):
+            DuckDBSession({"threds": 2})
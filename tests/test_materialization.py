@@ -0,0 +1,70 @@
+"""
+Tests for the freshness-aware materialization of the SQL tables.
+"""
+import os
+
+import pytest
+from kedro.pipeline import node, pipeline
+
+from fiap_mlops_datathon.materialization import sql_tables, stale_tables
+
+
+def identity(*args):
+    return args[-1]
+
+
+@pytest.fixture
+def project(tmp_path):
+    sql = {
+        "sql_silver_vagas": "SELECT * FROM {{ intermediate_vagas }}",
+        "sql_vagas": "SELECT * FROM {{ silver_vagas }}",
+        "sql_core": "SELECT * FROM {{ primary_vagas }}, {{ intermediate_prospects }}",
+    }
+    paths = {name: tmp_path / f"{name}.sql" for name in sql}
+    for name, query in sql.items():
+        paths[name].write_text(query)
+    for name in ("intermediate_vagas", "intermediate_prospects", "silver_vagas", "primary_vagas", "primary_core"):
+        paths[name] = tmp_path / f"{name}.parquet"
+
+    nodes = pipeline([
+        node(identity, ["sql_silver_vagas", "intermediate_vagas"], "silver_vagas", name="silver"),
+        node(identity, ["sql_vagas", "silver_vagas", "params:processing"], "primary_vagas", name="vagas"),
+        node(identity, ["sql_core", "primary_vagas"], "primary_core", name="core"),
+    ])
+    return sql_tables(nodes, paths, [paths[name] for name in sql]), paths
+
+
+def write(paths, *names, mtime):
+    for name in names:
+        paths[name].touch()
+        os.utime(paths[name], (mtime, mtime))
+
+
+class TestStaleTables:
+    def test_builds_missing_tables_in_dependency_order(self, project):
+        tables, paths = project
+        write(paths, "intermediate_vagas", "intermediate_prospects", mtime=1_000)
+
+        assert tables["core"]["inputs"] == ["primary_vagas", "intermediate_prospects"]
+        assert list(stale_tables(tables, paths)) == ["silver", "vagas", "core"]
+
+    def test_rebuilds_tables_downstream_of_a_changed_input(self, project):
+        tables, paths = project
+        for name in ("sql_silver_vagas", "sql_vagas", "sql_core"):
+            os.utime(paths[name], (1_000, 1_000))
+        write(paths, "intermediate_vagas", "intermediate_prospects", mtime=1_000)
+        write(paths, "silver_vagas", "primary_vagas", "primary_core", mtime=2_000)
+        assert stale_tables(tables, paths) == {}
+
+        write(paths, "intermediate_prospects", mtime=3_000)
+        assert list(stale_tables(tables, paths)) == ["core"]
+
+        write(paths, "intermediate_vagas", mtime=3_000)
+        assert stale_tables(tables, paths) == {
+            "silver": f"{paths['intermediate_vagas']} changed",
+            "vagas": "depends on silver",
+            "core": "depends on vagas",
+        }
+        assert list(stale_tables(tables, paths, targets=["primary_vagas"])) == ["silver", "vagas"]
+        with pytest.raises(ValueError, match="Unknown SQL tables"):
+            stale_tables(tables, paths, targets=["gold_vagas"])
@@ -0,0 +1,27 @@
+"""
+Tests for the critical path of node timings.
+"""
+from fiap_mlops_datathon.node_timing import critical_path
+
+# The primary_processing DAG: three independent tables, then the core join
+DEPENDENCIES = {
+    "prospects": [],
+    "vagas": [],
+    "applicants": [],
+    "core": ["prospects", "vagas", "applicants"],
+}
+
+
+class TestCriticalPath:
+    def test_follows_the_slowest_dependency(self):
+        durations = {"prospects": 2.0, "vagas": 1.0, "applicants": 3.0, "core": 4.0}
+
+        assert critical_path(durations, DEPENDENCIES) == (["applicants", "core"], 7.0)
+
+    def test_independent_slow_node_is_the_path(self):
+        durations = {"prospects": 9.0, "vagas": 1.0, "applicants": 3.0, "core": 4.0}
+
+        assert critical_path(durations, DEPENDENCIES) == (["prospects", "core"], 13.0)
+
+    def test_no_nodes_run(self):
+        assert critical_path({}, DEPENDENCIES) == ([], 0.0)
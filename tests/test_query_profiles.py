@@ -0,0 +1,105 @@
+"""
+Tests for the DuckDB query profiles of the SQL nodes.
+"""
+import json
+import logging
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from fiap_mlops_datathon import query_profiles
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_sql_to_parquet
+
+VAGAS = pd.DataFrame({"vaga_id": ["1", "2", "3"], "cliente": ["A", "A", "B"]})
+
+
+def profile(latency, operator_tree):
+    return {"latency": latency, "rows_returned": 3, "children": [operator_tree]}
+
+
+def scan(timing=0.001, cardinality=3):
+    return {
+        "operator_name": "TABLE_SCAN", "operator_timing": timing,
+        "operator_cardinality": cardinality, "children": [],
+    }
+
+
+@pytest.fixture
+def profiles_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_profiles, "_run_directory", None)
+    query_profiles.configure(
+        {"enabled": True, "directory": str(tmp_path / "profiles")}, run_id="run1"
+    )
+    return tmp_path / "profiles"
+
+
+class TestQueryProfiles:
+    def test_sql_node_saves_its_profile(self, profiles_directory):
+        process_sql_to_parquet(
+            "SELECT cliente, count(*) AS vagas FROM {{ intermediate_vagas }} GROUP BY cliente",
+            query_name="primary_clientes",
+            inputs={"intermediate_vagas": VAGAS},
+        )
+
+        saved = json.loads((profiles_directory / "run1" / "primary_clientes.json").read_text())
+        names = [op["operator"] for op in query_profiles.operators(saved)]
+        assert "HASH_GROUP_BY" in names
+        assert query_profiles.list_runs(str(profiles_directory)) == [profiles_directory / "run1"]
+
+    def test_disabled_profiling_saves_nothing(self, profiles_directory):
+        query_profiles.configure({"enabled": False})
+        process_sql_to_parquet(
+            "SELECT * FROM {{ intermediate_vagas }}",
+            query_name="primary_vagas",
+            inputs={"intermediate_vagas": VAGAS},
+        )
+        assert not profiles_directory.exists()
+
+    def test_duckdb_writer_logs_the_skipped_profile(self, profiles_directory, caplog):
+        caplog.set_level(logging.INFO, logger=query_profiles.__name__)
+        process_sql_to_parquet(
+            "SELECT * FROM {{ intermediate_vagas }}",
+            query_name="primary_vagas",
+            inputs={"intermediate_vagas": VAGAS},
+            writer="duckdb",
+        )
+
+        assert "No query profile for primary_vagas: written by DuckDB" in caplog.text
+        assert not profiles_directory.exists()
+
+    def test_cli_diff_exits_with_the_regressions(self, tmp_path):
+        for run, latency in (("run1", 0.1), ("run2", 0.5)):
+            (tmp_path / run).mkdir()
+            (tmp_path / run / "vagas.json").write_text(json.dumps(profile(latency, scan())))
+
+        result = CliRunner().invoke(query_profiles.main, ["--directory", str(tmp_path), "diff"])
+
+        assert result.exit_code == 1
+        assert result.output.splitlines() == [
+            "run1 -> run2", "vagas: 0.100s -> 0.500s REGRESSION", "1 regression(s)"
+        ]
+        listed = CliRunner().invoke(query_profiles.main, ["--directory", str(tmp_path), "list"])
+        assert listed.output.splitlines() == ["run1: 1 queries, 0.100s", "run2: 1 queries, 0.500s"]
+
+    def test_diff_flags_plan_changes_and_slower_queries(self):
+        join = {
+            "operator_name": "HASH_JOIN", "operator_timing": 0.01,
+            "operator_cardinality": 3, "children": [scan(), scan()],
+        }
+        before = {"core": profile(0.1, join), "vagas": profile(0.1, scan())}
+        after = {
+            "core": profile(0.1, {**join, "operator_name": "NESTED_LOOP_JOIN"}),
+            "vagas": profile(0.5, scan(timing=0.4, cardinality=6)),
+        }
+
+        lines, regressions = query_profiles.diff_runs(before, after)
+
+        assert regressions == 2
+        assert "  plan changed:" in lines
+        assert "    +NESTED_LOOP_JOIN" in lines
+        assert "vagas: 0.100s -> 0.500s REGRESSION" in lines
+        assert "  #0 TABLE_SCAN rows: 3 -> 6" in lines
+        assert query_profiles.diff_runs(before, before) == (
+            ["core: 0.100s -> 0.100s", "vagas: 0.100s -> 0.100s"], 0
+        )
@@ -0,0 +1,82 @@
+"""
+Tests for the content-addressed cache of SQL node outputs.
+"""
+import os
+
+import pandas as pd
+import pytest
+from kedro.io import DataCatalog
+
+from fiap_mlops_datathon import sql_cache
+from fiap_mlops_datathon.datasets import CachedParquet, DuckDBParquetDataset
+from fiap_mlops_datathon.pipelines.data_processing.nodes import process_vagas_silver
+
+VAGAS_SQL = "SELECT id AS vaga_id, titulo FROM {{ intermediate_vagas }} ORDER BY vaga_id"
+VAGAS = pd.DataFrame({"id": ["2", "1"], "titulo": ["Dev", "QA"]})
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    for name in ("_cache", "_datasets", "_pending"):
+        monkeypatch.setattr(sql_cache, name, getattr(sql_cache, name))
+    sql_cache.configure({"enabled": True, "directory": str(tmp_path / "cache")})
+    catalog = DataCatalog({
+        "intermediate_vagas": DuckDBParquetDataset(filepath=str(tmp_path / "intermediate.parquet")),
+        "silver_vagas": DuckDBParquetDataset(filepath=str(tmp_path / "silver.parquet")),
+    })
+    sql_cache.register_catalog(catalog)
+    catalog.save("intermediate_vagas", VAGAS)
+    return catalog
+
+
+def run_vagas_node(catalog):
+    output = process_vagas_silver(VAGAS_SQL, catalog.load("intermediate_vagas"))
+    catalog.save("silver_vagas", output)
+    sql_cache.saved("silver_vagas")
+    return output
+
+
+class TestSQLCache:
+    def test_fingerprint_ignores_rewrites_of_the_same_data(self, tmp_path):
+        path = tmp_path / "table.parquet"
+        VAGAS.to_parquet(path)
+        fingerprint = sql_cache.parquet_fingerprint(path)
+        os.utime(path, (0, 0))
+        VAGAS.to_parquet(path)
+
+        assert sql_cache.parquet_fingerprint(path) == fingerprint
+        VAGAS.iloc[:1].to_parquet(path)
+        assert sql_cache.parquet_fingerprint(path) != fingerprint
+        assert sql_cache.parquet_fingerprint(tmp_path / "missing.parquet") is None
+
+    def test_unchanged_node_reuses_its_output(self, catalog):
+        first = run_vagas_node(catalog)
+        second = run_vagas_node(catalog)
+
+        assert not isinstance(first, CachedParquet)
+        assert isinstance(second, CachedParquet)
+        assert catalog.load("silver_vagas")["vaga_id"].tolist() == ["1", "2"]
+
+        catalog.save("intermediate_vagas", VAGAS.iloc[:1])
+        assert not isinstance(run_vagas_node(catalog), CachedParquet)
+        assert catalog.load("silver_vagas")["vaga_id"].tolist() == ["2"]
+
+        # Overwriting the linked output left the first cache entry intact
+        catalog.save("intermediate_vagas", VAGAS)
+        assert isinstance(run_vagas_node(catalog), CachedParquet)
+        assert catalog.load("silver_vagas")["vaga_id"].tolist() == ["1", "2"]
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        source = tmp_path / "table.parquet"
+        VAGAS.to_parquet(source)
+        size_mb = source.stat().st_size / 1024**2
+        cache = sql_cache.SQLCache(tmp_path / "cache", max_size_mb=2.5 * size_mb)
+
+        cache.store("a", source)
+        cache.store("b", source)
+        os.utime(tmp_path / "cache" / "b.json", (1, 1))
+        assert cache.lookup("a") is not None
+        cache.store("c", source)
+
+        assert cache.lookup("b") is None
+        assert cache.lookup("a") is not None and cache.lookup("c") is not None